@@ -1,12 +1,255 @@
+import matplotlib
 import matplotlib.pyplot as plt
-import matplotlib.patches as patches
-import sys
+from matplotlib.collections import PolyCollection
+import argparse
+import glob
+import heapq
+import mmap
+import os
+import struct
+from array import array
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from collections import defaultdict
+from collections.abc import Mapping
+from itertools import groupby, islice, repeat
 import numpy as np
 
+# Símbolo dos ciclos ociosos na sequência de execução
+OCIOSO = '__'
+
+# Limites do diagrama em execuções longas
+LARGURA_MAXIMA = 40         # polegadas
+ALTURA_MAXIMA = 20          # polegadas
+DPI = 300
+PIXELS_MAXIMOS = 6000       # largura máxima da imagem, em pixels
+LIMITE_DETALHES = 50        # tarefas acima das quais textos e hachuras de cada tarefa são omitidos
+PIXELS_POR_CICLO_CONTORNO = 5  # largura mínima de um ciclo para desenhar contornos nas barras
+MAXIMO_ROTULOS = 500        # rótulos de tarefas nas barras de execução
+MAXIMO_ROTULOS_Y = 60       # rótulos de tarefas no eixo Y
+LIMITE_SEQUENCIA = 200      # ciclos da sequência de execução impressos no resumo
+
+# Leitura dos arquivos de saída
+BYTES_POR_BLOCO = 1 << 20   # trecho da sequência de execução lido de cada vez
+
+# Cabeçalho do arquivo de rastro binário, no formato definido em src/rastro.py: mágico, versão,
+# total de ciclos e números de segmentos, de tarefas e de ids
+MAGICO_RASTRO = b"ESCR"
+VERSAO_RASTRO = 1
+CABECALHO_RASTRO = struct.Struct("<4sIqqqq")
+
+# Formatos de imagem aceitos e resolução das prévias
+FORMATOS = ('png', 'jpg', 'svg', 'pdf')
+DPI_PREVIA = 72
+
+class ExecutionSequence:
+    """
+    Sequência de execução codificada por comprimento de corrida: cada segmento de ciclos
+    consecutivos da mesma tarefa é guardado uma única vez, como o código inteiro da tarefa
+    (-1 nos ciclos ociosos), o ciclo inicial e a duração. Pode ser percorrida ciclo a ciclo como
+    a lista de ids lida antes do arquivo, sem expandi-la na memória.
+    """
+    def __init__(self, codigos, inicios, duracoes, nomes):
+        """
+        Args:
+            codigos (ndarray): Código da tarefa de cada segmento, ou -1 se ocioso
+            inicios (ndarray): Ciclo inicial de cada segmento
+            duracoes (ndarray): Duração de cada segmento
+            nomes (list): Id da tarefa de cada código
+        """
+        self.codigos = codigos
+        self.inicios = inicios
+        self.duracoes = duracoes
+        self.nomes = nomes
+
+    def __len__(self):
+        return int(self.inicios[-1] + self.duracoes[-1]) if len(self.duracoes) else 0
+
+    def segments(self):
+        """
+        Percorre os segmentos da sequência.
+        
+        Returns:
+            iterator: Tuplas (id da tarefa ou None se ocioso, início, duração)
+        """
+        for codigo, inicio, duracao in zip(self.codigos.tolist(), self.inicios.tolist(),
+                                           self.duracoes.tolist()):
+            yield (self.nomes[codigo] if codigo >= 0 else None), inicio, duracao
+
+    def __iter__(self):
+        for task, _, duracao in self.segments():
+            yield from repeat(task if task is not None else OCIOSO, duracao)
+
+class TaskData(Mapping):
+    """
+    Dados das tarefas (ingresso, finalização, turnaround e waiting), lidos apenas no primeiro
+    acesso e guardados em um array compacto. Cada acesso a uma tarefa devolve um dicionário como o
+    usado antes, montado na hora.
+    """
+    CAMPOS = ('ingresso', 'finalizacao', 'turnaround', 'waiting')
+
+    def __init__(self, carregar):
+        """
+        Args:
+            carregar (callable): Função que lê as tarefas e retorna (ids, array com uma linha
+                por tarefa e uma coluna por campo de CAMPOS)
+        """
+        self._carregar = carregar
+        self._ids = None
+
+    def _carrega(self):
+        if self._ids is None:
+            self._ids, self._valores = self._carregar()
+            self._indices = {task: i for i, task in enumerate(self._ids)}
+        return self._ids
+
+    def __getitem__(self, task_id):
+        self._carrega()
+        return dict(zip(self.CAMPOS, self._valores[self._indices[task_id]].tolist()))
+
+    def __contains__(self, task_id):
+        self._carrega()
+        return task_id in self._indices
+
+    def __iter__(self):
+        return iter(self._carrega())
+
+    def __len__(self):
+        return len(self._carrega())
+
+def _map_file(filename):
+    """
+    Abre o arquivo mapeado em memória, ou lido por inteiro quando o mapeamento não é possível
+    (arquivos vazios, por exemplo).
+    
+    Args:
+        filename (str): Caminho do arquivo
+        
+    Returns:
+        mmap ou bytes: Conteúdo do arquivo
+    """
+    with open(filename, 'rb') as file:
+        try:
+            return mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        except (ValueError, OSError):
+            return file.read()
+
+def _parse_timeline(dados, fim):
+    """
+    Lê a linha da sequência de execução em blocos de BYTES_POR_BLOCO. Os ids de cada bloco são
+    convertidos em códigos inteiros e os ciclos consecutivos de cada tarefa são agrupados em
+    segmentos com numpy. Um id cortado no fim de um bloco é completado no bloco seguinte, e um
+    segmento que atravessa blocos é estendido.
+    
+    Args:
+        dados (mmap): Conteúdo do arquivo de saída
+        fim (int): Posição do fim da primeira linha
+        
+    Returns:
+        ExecutionSequence: Sequência de execução
+    """
+    # Código de cada id na ordem em que aparece; os ciclos ociosos têm o código 0 até o final
+    indices = {OCIOSO.encode(): 0}
+    codigo = indices.setdefault
+    codigos, duracoes = [], []
+    resto = b''
+    posicao = 0
+    while posicao < fim:
+        bloco = resto + dados[posicao:min(posicao + BYTES_POR_BLOCO, fim)]
+        posicao += BYTES_POR_BLOCO
+        resto = b''
+        if posicao < fim:
+            corte = bloco.rfind(b';')
+            bloco, resto = (bloco[:corte], bloco[corte + 1:]) if corte >= 0 else (b'', bloco)
+        bloco = bloco.strip(b'\r;')
+        if not bloco:
+            continue
+        ciclos = np.array([codigo(task, len(indices)) for task in bloco.split(b';')], dtype=np.int64)
+        
+        # Início de cada segmento do bloco: o primeiro ciclo e cada troca de tarefa
+        trocas = np.flatnonzero(ciclos[1:] != ciclos[:-1]) + 1
+        inicios_bloco = np.concatenate(([0], trocas))
+        duracoes_bloco = np.diff(np.append(inicios_bloco, len(ciclos)))
+        codigos_bloco = ciclos[inicios_bloco]
+        if codigos and codigos[-1][-1] == codigos_bloco[0]:
+            duracoes[-1][-1] += duracoes_bloco[0]
+            codigos_bloco, duracoes_bloco = codigos_bloco[1:], duracoes_bloco[1:]
+        if len(codigos_bloco):
+            codigos.append(codigos_bloco)
+            duracoes.append(duracoes_bloco)
+    
+    codigos = np.concatenate(codigos) - 1 if codigos else np.zeros(0, dtype=np.int64)
+    duracoes = np.concatenate(duracoes) if duracoes else np.zeros(0, dtype=np.int64)
+    inicios = np.cumsum(duracoes) - duracoes
+    nomes = [task.decode() for task in islice(indices, 1, None)]
+    return ExecutionSequence(codigos, inicios, duracoes, nomes)
+
+def _task_loader(filename, inicio, fim):
+    """
+    Cria a função que lê as linhas das tarefas do arquivo de saída quando elas forem usadas.
+    
+    Args:
+        filename (str): Caminho do arquivo de saída
+        inicio (int): Posição da primeira linha de tarefa
+        fim (int): Posição do fim da última linha de tarefa
+        
+    Returns:
+        callable: Função que retorna (ids, valores), como esperado por TaskData
+    """
+    def carregar():
+        ids = []
+        valores = array('q')
+        with open(filename, 'rb') as file:
+            file.seek(inicio)
+            restantes = fim - inicio
+            for linha in file:
+                restantes -= len(linha)
+                partes = linha.strip().split(b';')
+                if len(partes) == 5:
+                    ids.append(partes[0].decode())
+                    valores.extend(map(int, partes[1:]))
+                if restantes <= 0:
+                    break
+        return ids, np.frombuffer(valores, dtype=np.int64).reshape(-1, len(TaskData.CAMPOS))
+    return carregar
+
+def _parse_trace(dados):
+    """
+    Lê um arquivo de rastro binário gerado pelo simulador (src/rastro.py), cujos registros são
+    inteiros de 64 bits lidos diretamente como arrays.
+    
+    Args:
+        dados (mmap): Conteúdo do arquivo de rastro
+        
+    Returns:
+        tuple: (sequencia_execucao, dados_tarefas, tempos_medios)
+    """
+    _, versao, _, num_segmentos, num_tarefas, num_ids = CABECALHO_RASTRO.unpack_from(dados)
+    if versao != VERSAO_RASTRO:
+        raise ValueError(f"Rastro na versão {versao}, esperada a versão {VERSAO_RASTRO}.")
+    inicio = CABECALHO_RASTRO.size
+    segmentos = np.frombuffer(dados, dtype='<i8', count=3 * num_segmentos, offset=inicio).reshape(-1, 3)
+    inicio += segmentos.nbytes
+    tarefas = np.frombuffer(dados, dtype='<i8', count=8 * num_tarefas, offset=inicio).reshape(-1, 8)
+    inicio += tarefas.nbytes
+    posicoes = np.frombuffer(dados, dtype='<i8', count=num_ids + 1, offset=inicio).tolist()
+    inicio += 8 * (num_ids + 1)
+    nomes = [dados[inicio + a:inicio + b].decode() for a, b in zip(posicoes, posicoes[1:])]
+
+    sequencia = ExecutionSequence(segmentos[:, 0].copy(), segmentos[:, 1].copy(),
+                                  segmentos[:, 2].copy(), nomes)
+    # Colunas do registro: id, ingresso, início, fim, duração, prioridade, turnaround e espera
+    valores = tarefas[:, [1, 3, 6, 7]].astype(np.int64)
+    dados_tarefas = TaskData(lambda: (nomes[:num_tarefas], valores))
+    tempos_medios = (round(float(valores[:, 2].mean()), 1), round(float(valores[:, 3].mean()), 1)) \
+        if num_tarefas else (0.0, 0.0)
+    return sequencia, dados_tarefas, tempos_medios
+
 def parse_output_file(filename):
     """
-    Lê o arquivo de saída do escalonador e extrai as informações necessárias.
+    Lê o arquivo de saída do escalonador e extrai as informações necessárias, sem carregar o texto
+    inteiro na memória. O arquivo é mapeado em memória e a sequência de execução é lida em blocos,
+    já codificada em segmentos; as linhas das tarefas só são lidas quando usadas. Também aceita
+    o arquivo de rastro binário (.bin) gerado com --rastro.
     
     Args:
         filename (str): Caminho para o arquivo de saída
@@ -14,33 +257,31 @@ def parse_output_file(filename):
     Returns:
         tuple: (sequencia_execucao, dados_tarefas, tempos_medios)
     """
-    with open(filename, 'r') as file:
-        lines = file.readlines()
-    
-    # Primeira linha: sequência de execução
-    sequencia_execucao = lines[0].strip().split(';')
-    
-    # Linhas intermediárias: dados das tarefas
-    dados_tarefas = {}
-    for i in range(1, len(lines) - 1):
-        partes = lines[i].strip().split(';')
-        task_id = partes[0]
-        ingresso = int(partes[1])
-        finalizacao = int(partes[2])
-        turnaround = int(partes[3])
-        waiting = int(partes[4])
+    dados = _map_file(filename)
+    try:
+        if dados[:len(MAGICO_RASTRO)] == MAGICO_RASTRO:
+            return _parse_trace(dados)
+        
+        # Primeira linha: sequência de execução
+        fim_sequencia = dados.find(b'\n')
+        if fim_sequencia < 0:
+            raise ValueError("Arquivo de saída incompleto.")
+        sequencia_execucao = _parse_timeline(dados, fim_sequencia)
         
-        dados_tarefas[task_id] = {
-            'ingresso': ingresso,
-            'finalizacao': finalizacao,
-            'turnaround': turnaround,
-            'waiting': waiting
-        }
-    
-    # Última linha: tempos médios
-    tempos_medios = lines[-1].strip().split(';')
-    turnaround_medio = float(tempos_medios[0])
-    waiting_medio = float(tempos_medios[1])
+        # Última linha: tempos médios
+        fim = len(dados)
+        while fim > 0 and dados[fim - 1:fim] in (b'\n', b'\r', b' '):
+            fim -= 1
+        inicio_medias = dados.rfind(b'\n', 0, fim) + 1
+        tempos_medios = dados[inicio_medias:fim].decode().strip().split(';')
+        turnaround_medio = float(tempos_medios[0])
+        waiting_medio = float(tempos_medios[1])
+    finally:
+        if isinstance(dados, mmap.mmap):
+            dados.close()
+    
+    # Linhas intermediárias: dados das tarefas, lidas sob demanda
+    dados_tarefas = TaskData(_task_loader(filename, fim_sequencia + 1, inicio_medias))
     
     return sequencia_execucao, dados_tarefas, (turnaround_medio, waiting_medio)
 
@@ -57,102 +298,211 @@ def generate_colors(num_tasks):
     colors = plt.cm.tab10(np.linspace(0, 1, num_tasks))
     return colors
 
-def create_gantt_chart(sequencia_execucao, dados_tarefas, tempos_medios, output_filename='gantt_chart.png'):
+def merge_segments(sequencia_execucao):
     """
-    Cria o diagrama de Gantt baseado na sequência de execução.
+    Agrupa os ciclos consecutivos de uma mesma tarefa em segmentos. Uma ExecutionSequence já
+    está agrupada e seus segmentos são usados diretamente. Nas simulações com vários núcleos, cada
+    ciclo lista as tarefas de todos os núcleos separadas por vírgula, e cada uma delas ganha seu
+    segmento; os ciclos consecutivos de uma tarefa são unidos mesmo quando os outros núcleos
+    trocam de tarefa.
     
     Args:
-        sequencia_execucao (list): Lista com a sequência de tarefas executadas
+        sequencia_execucao (ExecutionSequence ou list): Sequência de tarefas executadas
+        
+    Returns:
+        dict: Mapeamento de tarefa para a lista de segmentos (início, duração), em ordem
+    """
+    segmentos = defaultdict(list)
+    
+    def adiciona(task, inicio, duracao):
+        for nucleo in task.split(',') if ',' in task else (task,):
+            if nucleo == OCIOSO:
+                continue
+            anteriores = segmentos[nucleo]
+            if anteriores and sum(anteriores[-1]) == inicio:
+                anteriores[-1] = (anteriores[-1][0], anteriores[-1][1] + duracao)
+            else:
+                anteriores.append((inicio, duracao))
+    
+    if isinstance(sequencia_execucao, ExecutionSequence):
+        for task, inicio, duracao in sequencia_execucao.segments():
+            if task is not None:
+                adiciona(task, inicio, duracao)
+        return segmentos
+    inicio = 0
+    for task, grupo in groupby(sequencia_execucao):
+        duracao = len(list(grupo))
+        if task:
+            adiciona(task, inicio, duracao)
+        inicio += duracao
+    return segmentos
+
+def simplify_segments(segmentos, resolucao):
+    """
+    Une os segmentos separados por intervalos menores que a resolução, que não seriam visíveis
+    no diagrama. Assim, o número de segmentos desenhados por tarefa fica limitado pela largura
+    da imagem em pixels, e não pelo número de ciclos.
+    
+    Args:
+        segmentos (list): Segmentos (início, duração) de uma tarefa, em ordem
+        resolucao (float): Menor intervalo visível, em ciclos
+        
+    Returns:
+        list: Segmentos simplificados
+    """
+    if resolucao <= 1 or not segmentos:
+        return segmentos
+    simplificados = [list(segmentos[0])]
+    for inicio, duracao in segmentos[1:]:
+        ultimo = simplificados[-1]
+        if inicio - (ultimo[0] + ultimo[1]) < resolucao:
+            ultimo[1] = inicio + duracao - ultimo[0]
+        else:
+            simplificados.append([inicio, duracao])
+    return simplificados
+
+def _bars_collection(barras, cores, altura, **kwargs):
+    """
+    Cria uma única coleção de retângulos para todas as barras, em vez de um patch por barra.
+    
+    Args:
+        barras (list): Tuplas (início, duração, posição y) de cada barra
+        cores (ndarray): Cores RGBA, uma linha por barra
+        altura (float): Altura das barras
+        **kwargs: Propriedades da coleção (bordas, transparência, hachura)
+        
+    Returns:
+        PolyCollection: Coleção com um retângulo por barra
+    """
+    barras = np.asarray(barras, dtype=float).reshape(-1, 3)
+    x0 = barras[:, 0]
+    x1 = barras[:, 0] + barras[:, 1]
+    y0 = barras[:, 2] - altura/2
+    y1 = barras[:, 2] + altura/2
+    vertices = np.stack([np.column_stack(v) for v in ((x0, y0), (x0, y1), (x1, y1), (x1, y0))], axis=1)
+    return PolyCollection(vertices, facecolors=cores, **kwargs)
+
+def create_gantt_chart(sequencia_execucao, dados_tarefas, tempos_medios, output_filename='gantt_chart.png',
+                       dpi=DPI, show=True):
+    """
+    Cria o diagrama de Gantt baseado na sequência de execução. Os ciclos consecutivos de cada
+    tarefa são desenhados como um único segmento, e todas as barras de cada tipo são desenhadas
+    em uma só coleção. Em execuções longas, a largura da figura é limitada, segmentos separados
+    por menos de um pixel são unidos e os rótulos que não cabem nas barras são omitidos.
+    
+    Args:
+        sequencia_execucao (ExecutionSequence): Sequência de tarefas executadas
         dados_tarefas (dict): Dicionário com informações das tarefas
         tempos_medios (tuple): Tupla com tempos médios (turnaround, waiting)
-        output_filename (str): Nome do arquivo de saída da imagem
+        output_filename (str): Nome do arquivo de saída da imagem; a extensão define o formato
+        dpi (int): Resolução máxima da imagem, ainda limitada por PIXELS_MAXIMOS
+        show (bool): Se True, exibe o diagrama em uma janela após salvá-lo
     """
-    # Identifica todas as tarefas únicas
-    tarefas_unicas = list(set(sequencia_execucao))
-    tarefas_unicas.sort()  # Ordena para consistência visual
+    total_ciclos = len(sequencia_execucao)
+    segmentos = merge_segments(sequencia_execucao)
+
+    # Identifica todas as tarefas únicas (ciclos ociosos não são tarefas)
+    tarefas_unicas = sorted(set(segmentos) | set(dados_tarefas))  # Ordena para consistência visual
+    num_tarefas = len(tarefas_unicas)
+    detalhado = num_tarefas <= LIMITE_DETALHES
     
-    # Gera cores para cada tarefa
-    colors = generate_colors(len(tarefas_unicas))
-    color_map = {task: colors[i] for i, task in enumerate(tarefas_unicas)}
+    # Gera cores para cada tarefa (a linha i é a cor da tarefa na posição y = i)
+    colors = generate_colors(num_tarefas)
     
-    # Configuração da figura
-    fig, ax = plt.subplots(figsize=(max(12, len(sequencia_execucao) * 0.5), 8))
+    # Configuração da figura, com largura e resolução limitadas em execuções longas
+    largura = min(max(12, total_ciclos * 0.5), LARGURA_MAXIMA)
+    altura = min(max(8, num_tarefas * 0.3), ALTURA_MAXIMA)
+    dpi = min(dpi, PIXELS_MAXIMOS / largura)
+    fig, ax = plt.subplots(figsize=(largura, altura))
+    
+    # Menor intervalo visível, em ciclos: a largura de um pixel. Contornos só são desenhados
+    # quando cada ciclo tem alguns pixels de largura; antes disso, cobririam as barras
+    resolucao = total_ciclos / (largura * dpi) if total_ciclos else 1
+    contornos = resolucao <= 1 / PIXELS_POR_CICLO_CONTORNO
     
     # Altura de cada barra de tarefa
     bar_height = 0.6
     y_positions = {task: i for i, task in enumerate(tarefas_unicas)}
+    com_dados = [task for task in tarefas_unicas if task in dados_tarefas]
+    # Ingresso e finalização de cada tarefa, consultados uma única vez
+    ingressos, finalizacoes = [], []
+    for task in com_dados:
+        info = dados_tarefas[task]
+        ingressos.append(info['ingresso'])
+        finalizacoes.append(info['finalizacao'])
     
     # Primeiro, desenha o período total (chegada até finalização) para cada tarefa
-    for task in tarefas_unicas:
-        info = dados_tarefas[task]
-        ingresso = info['ingresso']
-        finalizacao = info['finalizacao']
-        
-        # Barra de fundo (período total no sistema) - mais clara
-        rect_total = patches.Rectangle(
-            (ingresso, y_positions[task] - bar_height/2),
-            finalizacao - ingresso,  # Duração total no sistema
-            bar_height,
-            linewidth=1,
-            edgecolor='gray',
-            facecolor=color_map[task],
-            alpha=0.3,  # Mais transparente para mostrar o período total
-            hatch='///'  # Padrão para distinguir do tempo de execução
-        )
-        ax.add_patch(rect_total)
-        
-        # Adiciona texto indicando o período total
-        ax.text(ingresso + (finalizacao - ingresso)/2, y_positions[task] + bar_height/2 + 0.1, 
-               f'Total: {finalizacao - ingresso}', 
-               ha='center', va='bottom', fontsize=7, style='italic', color='gray')
+    periodos = [(ingresso, finalizacao - ingresso, y_positions[task])
+                for task, ingresso, finalizacao in zip(com_dados, ingressos, finalizacoes)]
+    ax.add_collection(_bars_collection(
+        periodos, colors[[y_positions[task] for task in com_dados]].reshape(-1, 4), bar_height,
+        linewidths=1 if contornos else 0.3,
+        edgecolors='gray' if contornos else 'face',  # Contorno da própria cor em barras finas
+        alpha=0.3,  # Mais transparente para mostrar o período total
+        hatch='///' if detalhado else None  # Padrão para distinguir do tempo de execução
+    ), autolim=False)  # Os limites dos eixos são definidos abaixo
+    
+    # Adiciona texto indicando o período total
+    if detalhado:
+        for inicio, duracao, y_pos in periodos:
+            ax.text(inicio + duracao/2, y_pos + bar_height/2 + 0.1,
+                   f'Total: {duracao}',
+                   ha='center', va='bottom', fontsize=7, style='italic', color='gray')
     
     # Depois, desenha as barras de execução efetiva
-    for clock_time, task in enumerate(sequencia_execucao):
-        if task:  # Verifica se há uma tarefa executando
-            rect = patches.Rectangle(
-                (clock_time, y_positions[task] - bar_height/2),
-                1,  # Largura de 1 unidade de tempo
-                bar_height,
-                linewidth=2,
-                edgecolor='black',
-                facecolor=color_map[task],
-                alpha=0.9  # Mais opaco para destacar a execução
-            )
-            ax.add_patch(rect)
-            
-            # Adiciona o nome da tarefa no centro da barra de execução
-            ax.text(clock_time + 0.5, y_positions[task], task, 
-                   ha='center', va='center', fontsize=8, fontweight='bold', color='white')
+    # Em execuções longas, cada barra tem ao menos um pixel de largura para continuar visível
+    execucoes = []
+    minimo = resolucao if not contornos else 0
+    for task in tarefas_unicas:
+        for inicio, duracao in simplify_segments(segmentos.get(task, []), resolucao):
+            execucoes.append((inicio, max(duracao, minimo), y_positions[task]))
+    ax.add_collection(_bars_collection(
+        execucoes, colors[[y_pos for _, _, y_pos in execucoes]].reshape(-1, 4), bar_height,
+        linewidths=2 if contornos else 0.3,
+        edgecolors='black' if contornos else 'face',
+        alpha=0.9  # Mais opaco para destacar a execução
+    ), autolim=False)
+    
+    # Adiciona o nome da tarefa no centro das barras de execução em que ele cabe, limitando o
+    # número de rótulos às barras mais largas
+    pontos_por_ciclo = largura * 72 * 0.8 / max(total_ciclos, 1)  # Largura aproximada dos eixos
+    rotulaveis = [(duracao, inicio, y_pos) for inicio, duracao, y_pos in execucoes
+                  if duracao * pontos_por_ciclo >= len(tarefas_unicas[y_pos]) * 6 + 2]
+    if len(rotulaveis) > MAXIMO_ROTULOS:
+        rotulaveis = heapq.nlargest(MAXIMO_ROTULOS, rotulaveis)
+    for duracao, inicio, y_pos in rotulaveis:
+        ax.text(inicio + duracao/2, y_pos, tarefas_unicas[y_pos],
+               ha='center', va='center', fontsize=8, fontweight='bold', color='white')
     
     # Adiciona linhas verticais mostrando chegada e finalização de cada tarefa
-    for task in tarefas_unicas:
-        info = dados_tarefas[task]
-        y_pos = y_positions[task]
-        
-        # Linha de chegada (verde)
-        ax.axvline(x=info['ingresso'], ymin=(y_pos-0.4)/len(tarefas_unicas), 
-                  ymax=(y_pos+0.4)/len(tarefas_unicas), color='green', linewidth=2, alpha=0.7)
-        ax.text(info['ingresso'], y_pos - bar_height/2 - 0.2, 'Chegada', 
-               ha='center', va='top', fontsize=6, color='green', rotation=90)
-        
-        # Linha de finalização (vermelho)
-        ax.axvline(x=info['finalizacao'], ymin=(y_pos-0.4)/len(tarefas_unicas), 
-                  ymax=(y_pos+0.4)/len(tarefas_unicas), color='red', linewidth=2, alpha=0.7)
-        ax.text(info['finalizacao'], y_pos - bar_height/2 - 0.2, 'Fim', 
-               ha='center', va='top', fontsize=6, color='red', rotation=90)
+    y_dados = np.array([y_positions[task] for task in com_dados], dtype=float)
+    
+    # Linhas de chegada (verde) e de finalização (vermelho). Com muitas tarefas, elas cobririam as
+    # barras, e as extremidades dos períodos totais já indicam esses momentos
+    if detalhado:
+        ax.vlines(ingressos, y_dados - 0.4, y_dados + 0.4, color='green', linewidth=2, alpha=0.7)
+        ax.vlines(finalizacoes, y_dados - 0.4, y_dados + 0.4, color='red', linewidth=2, alpha=0.7)
+        for task in com_dados:
+            info = dados_tarefas[task]
+            y_pos = y_positions[task]
+            ax.text(info['ingresso'], y_pos - bar_height/2 - 0.2, 'Chegada', 
+                   ha='center', va='top', fontsize=6, color='green', rotation=90)
+            ax.text(info['finalizacao'], y_pos - bar_height/2 - 0.2, 'Fim', 
+                   ha='center', va='top', fontsize=6, color='red', rotation=90)
     
     # Configuração dos eixos
-    ax.set_xlim(0, len(sequencia_execucao))
-    ax.set_ylim(-0.5, len(tarefas_unicas) - 0.5)
+    ax.set_xlim(0, total_ciclos)
+    ax.set_ylim(-0.5, num_tarefas - 0.5)
     
     # Configuração do eixo X (tempo)
     ax.set_xlabel('Tempo (unidades de clock)', fontsize=12, fontweight='bold')
-    ax.set_xticks(range(0, len(sequencia_execucao) + 1, max(1, len(sequencia_execucao) // 20)))
+    ax.set_xticks(range(0, total_ciclos + 1, max(1, total_ciclos // 20)))
     
-    # Configuração do eixo Y (tarefas)
+    # Configuração do eixo Y (tarefas), com no máximo MAXIMO_ROTULOS_Y rótulos
+    passo_y = max(1, -(-num_tarefas // MAXIMO_ROTULOS_Y))
     ax.set_ylabel('Tarefas', fontsize=12, fontweight='bold')
-    ax.set_yticks(range(len(tarefas_unicas)))
-    ax.set_yticklabels(tarefas_unicas)
+    ax.set_yticks(range(0, num_tarefas, passo_y))
+    ax.set_yticklabels(tarefas_unicas[::passo_y])
     
     # Grade para melhor visualização
     ax.grid(True, axis='x', alpha=0.3, linestyle='--')
@@ -168,14 +518,16 @@ def create_gantt_chart(sequencia_execucao, dados_tarefas, tempos_medios, output_
             verticalalignment='top', bbox=dict(boxstyle='round', facecolor='wheat', alpha=0.8),
             fontsize=10)
     
-    # Adiciona legenda com informações detalhadas das tarefas
+    # Adiciona legenda com informações detalhadas das tarefas (só as primeiras, se forem muitas)
     legend_text = "Informações das Tarefas:\n"
-    for task in tarefas_unicas:
+    for task in com_dados[:LIMITE_DETALHES]:
         info = dados_tarefas[task]
         legend_text += f"{task}: Ingresso={info['ingresso']}, "
         legend_text += f"Finalização={info['finalizacao']}, "
         legend_text += f"Turnaround={info['turnaround']}, "
         legend_text += f"Waiting={info['waiting']}\n"
+    if len(com_dados) > LIMITE_DETALHES:
+        legend_text += f"... e mais {len(com_dados) - LIMITE_DETALHES} tarefas\n"
     
     # Adiciona caixa de texto com informações das tarefas
     ax.text(0.98, 0.02, legend_text.strip(), transform=ax.transAxes,
@@ -187,18 +539,21 @@ def create_gantt_chart(sequencia_execucao, dados_tarefas, tempos_medios, output_
     plt.tight_layout()
     
     # Salva o diagrama
-    plt.savefig(output_filename, dpi=300, bbox_inches='tight')
+    plt.savefig(output_filename, dpi=dpi, bbox_inches='tight' if detalhado else None)
     print(f"Diagrama de Gantt salvo como: {output_filename}")
     
-    # Mostra o diagrama
-    plt.show()
+    # Mostra o diagrama, ou libera a figura quando não há janela
+    if show:
+        plt.show()
+    else:
+        plt.close(fig)
 
 def print_execution_summary(sequencia_execucao, dados_tarefas, tempos_medios):
     """
     Imprime um resumo da execução.
     
     Args:
-        sequencia_execucao (list): Lista com a sequência de tarefas executadas
+        sequencia_execucao (ExecutionSequence): Sequência de tarefas executadas
         dados_tarefas (dict): Dicionário com informações das tarefas
         tempos_medios (tuple): Tupla com tempos médios
     """
@@ -216,12 +571,18 @@ def print_execution_summary(sequencia_execucao, dados_tarefas, tempos_medios):
     print(f"{'Tarefa':<8} {'Ingresso':<10} {'Finalização':<12} {'Turnaround':<12} {'Waiting':<8}")
     print("-" * 60)
     
-    for task_id, info in sorted(dados_tarefas.items()):
+    for task_id, info in sorted(dados_tarefas.items())[:LIMITE_DETALHES]:
         print(f"{task_id:<8} {info['ingresso']:<10} {info['finalizacao']:<12} "
               f"{info['turnaround']:<12} {info['waiting']:<8}")
+    if len(dados_tarefas) > LIMITE_DETALHES:
+        print(f"... e mais {len(dados_tarefas) - LIMITE_DETALHES} tarefas")
     
     print("\nSequência de execução:")
     print("-" * 60)
+    total_ciclos = len(sequencia_execucao)
+    if total_ciclos > LIMITE_SEQUENCIA:
+        print(f"(primeiros {LIMITE_SEQUENCIA} de {total_ciclos} ciclos)")
+    sequencia_execucao = list(islice(sequencia_execucao, LIMITE_SEQUENCIA))
     sequence_str = " -> ".join(sequencia_execucao)
     # Se a sequência for muito longa, quebra em linhas
     if len(sequence_str) > 80:
@@ -233,16 +594,142 @@ def print_execution_summary(sequencia_execucao, dados_tarefas, tempos_medios):
     else:
         print(sequence_str)
 
+def output_name(filename, formato='png'):
+    """
+    Retorna o nome da imagem gerada a partir de um arquivo de saída, na mesma pasta dele.
+    
+    Args:
+        filename (str): Caminho do arquivo de saída do escalonador
+        formato (str): Extensão da imagem
+        
+    Returns:
+        str: Caminho da imagem, no formato gantt_<nome_arquivo>.<formato>
+    """
+    pasta, nome = os.path.split(filename)
+    return os.path.join(pasta, f"gantt_{os.path.splitext(nome)[0]}.{formato}")
+
+def is_up_to_date(filename, imagem):
+    """
+    Verifica se a imagem já existe e é mais recente que o arquivo de saída que a originou.
+    
+    Args:
+        filename (str): Caminho do arquivo de saída do escalonador
+        imagem (str): Caminho da imagem
+        
+    Returns:
+        bool: True se a imagem não precisa ser gerada novamente
+    """
+    return os.path.isfile(imagem) and os.path.getmtime(imagem) >= os.path.getmtime(filename)
+
+def render_file(filename, formato='png', dpi=DPI, force=False):
+    """
+    Gera a imagem de um arquivo de saída sem exibi-la, pulando-a se já estiver atualizada.
+    Usada pelos processos do modo em lote.
+    
+    Args:
+        filename (str): Caminho do arquivo de saída do escalonador
+        formato (str): Extensão da imagem
+        dpi (int): Resolução máxima da imagem
+        force (bool): Se True, gera a imagem mesmo que esteja atualizada
+        
+    Returns:
+        tuple: (caminho da imagem, True se foi gerada ou False se foi pulada)
+    """
+    imagem = output_name(filename, formato)
+    if not force and is_up_to_date(filename, imagem):
+        return imagem, False
+    sequencia_execucao, dados_tarefas, tempos_medios = parse_output_file(filename)
+    create_gantt_chart(sequencia_execucao, dados_tarefas, tempos_medios, imagem, dpi, show=False)
+    return imagem, True
+
+def _init_worker():
+    """
+    Inicializa um processo do modo em lote com o backend Agg, que não depende de uma tela.
+    """
+    plt.switch_backend('Agg')
+
+def render_batch(arquivos, formato='png', dpi=DPI, force=False, processos=None):
+    """
+    Gera as imagens de vários arquivos de saída em paralelo, em um pool de processos (por padrão,
+    um por núcleo), sem exibi-las. Cada processo importa o matplotlib uma única vez e gera várias
+    imagens. Erros em um arquivo são informados sem interromper os demais.
+    
+    Args:
+        arquivos (list): Caminhos dos arquivos de saída do escalonador
+        formato (str): Extensão das imagens
+        dpi (int): Resolução máxima das imagens
+        force (bool): Se True, gera também as imagens já atualizadas
+        processos (int): Número de processos simultâneos
+        
+    Returns:
+        dict: Mapeamento de arquivo para (caminho da imagem, gerada) ou para a mensagem de erro
+    """
+    resultados = {}
+    with ProcessPoolExecutor(max_workers=processos, initializer=_init_worker) as pool:
+        futuros = {pool.submit(render_file, filename, formato, dpi, force): filename
+                   for filename in arquivos}
+        for futuro in as_completed(futuros):
+            filename = futuros[futuro]
+            try:
+                resultados[filename] = imagem, gerada = futuro.result()
+            except Exception as e:
+                resultados[filename] = str(e)
+                print(f"Erro ao processar o arquivo '{filename}': {e}")
+                continue
+            if not gerada:
+                print(f"Diagrama de Gantt atualizado, não gerado novamente: {imagem}")
+    return resultados
+
+def expand_files(padroes):
+    """
+    Expande os padrões glob (como saida_*.txt) informados na linha de comando, mantendo a ordem
+    e descartando repetições. Padrões sem correspondência são mantidos como caminhos.
+    
+    Args:
+        padroes (list): Caminhos ou padrões glob
+        
+    Returns:
+        list: Caminhos dos arquivos
+    """
+    arquivos = []
+    for padrao in padroes:
+        arquivos.extend(sorted(glob.glob(padrao)) or [padrao])
+    return list(dict.fromkeys(arquivos))
+
 def main():
     """
-    Função principal do programa.
+    Função principal do programa. Com um único arquivo, imprime o resumo e exibe o diagrama, como
+    antes; com vários arquivos (ou --sem-janela), gera as imagens em lote, sem tela.
     """
-    if len(sys.argv) != 2:
-        print("Uso: python gantt_generator.py <arquivo_saida>")
-        print("Exemplo: python gantt_generator.py resultado_fcfs.txt")
+    parser = argparse.ArgumentParser(
+        usage="python gantt_generator.py <arquivos_saida...> [--formato png|jpg|svg|pdf] [--dpi N] "
+              "[--previa] [--processos N] [--forcar] [--sem-janela]")
+    parser.add_argument("arquivos", nargs="+", help="arquivos de saída ou padrões como 'saida_*.txt'")
+    parser.add_argument("--formato", choices=FORMATOS, default='png',
+                        help="formato das imagens (padrão: png)")
+    parser.add_argument("--dpi", type=int, default=DPI, help=f"resolução máxima (padrão: {DPI})")
+    parser.add_argument("--previa", action="store_true",
+                        help=f"prévia rápida: resolução de {DPI_PREVIA} DPI, salvo se --dpi for informado")
+    parser.add_argument("--processos", type=int,
+                        help="processos simultâneos no modo em lote (padrão: número de núcleos)")
+    parser.add_argument("--forcar", action="store_true",
+                        help="gera também as imagens mais recentes que o arquivo de saída")
+    parser.add_argument("--sem-janela", action="store_true",
+                        help="não exibe o diagrama, mesmo com um único arquivo")
+    args = parser.parse_args()
+    
+    dpi = DPI_PREVIA if args.previa and args.dpi == DPI else args.dpi
+    if dpi < 1 or (args.processos is not None and args.processos < 1):
+        print("Erro: A resolução e o número de processos devem ser inteiros positivos.")
+        return
+    
+    arquivos = expand_files(args.arquivos)
+    if len(arquivos) > 1 or args.sem_janela:
+        matplotlib.use('Agg')
+        render_batch(arquivos, args.formato, dpi, args.forcar, args.processos)
         return
     
-    filename = sys.argv[1]
+    filename = arquivos[0]
     
     try:
         # Lê e processa o arquivo
@@ -252,8 +739,8 @@ def main():
         print_execution_summary(sequencia_execucao, dados_tarefas, tempos_medios)
         
         # Gera o diagrama de Gantt
-        output_name = f"gantt_{filename.replace('.txt', '')}.png"
-        create_gantt_chart(sequencia_execucao, dados_tarefas, tempos_medios, output_name)
+        create_gantt_chart(sequencia_execucao, dados_tarefas, tempos_medios,
+                           output_name(filename, args.formato), dpi)
         
     except FileNotFoundError:
         print(f"Erro: Arquivo '{filename}' não encontrado.")
@@ -261,4 +748,4 @@ def main():
         print(f"Erro ao processar o arquivo: {e}")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,232 @@
+import argparse
+import gc
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+import classes as c
+import gerador
+import simulador
+from emissor import carregar_tarefas
+from escalonador import Escalonador, NUCLEOS_PADRAO
+
+# Medição de desempenho do escalonador. Cada algoritmo é executado sobre cargas geradas pelo
+# gerador.py (sempre com a mesma semente) em vários tamanhos e níveis de ocupação da CPU, com um ou
+# mais núcleos. Só o laço da simulação é cronometrado: a leitura das tarefas e a criação do
+# Escalonador ficam de fora. Os resultados podem ser gravados como referência e comparados em
+# execuções futuras, apontando as regressões. Requer o pacote numpy, usado pelo gerador.
+
+USO = ("python bench.py [--algoritmos fcfs,rr,...] [--tamanhos N1,N2,...] [--cargas leve,alta,saturada] "
+       "[--nucleos N1,N2,...] [--repeticoes N] [--pasta DIR] [--salva CAMINHO] [--compara CAMINHO] "
+       "[--tolerancia X]")
+
+# Ocupação média da CPU de cada nível de carga (tarefas por ciclo vezes duração média, dividido
+# pelo número de núcleos). Acima de 1, as tarefas chegam mais rápido do que são concluídas e a fila
+# de prontas cresce ao longo da execução, o que exercita as filas com milhares de tarefas.
+CARGAS = {"leve": 0.5, "alta": 0.9, "saturada": 1.5}
+
+TAMANHOS_PADRAO = [1_000, 10_000, 100_000]
+DURACAO_MEDIA = 5
+SEMENTE = 0
+
+# Métricas comparadas com a referência, em que um valor maior é pior
+METRICAS_REGRESSAO = ("us_por_decisao", "memoria_pico_kib")
+
+def gera_carga(pasta:str, tamanho:int, carga:str, num_nucleos:int=NUCLEOS_PADRAO) -> str:
+    '''Gera (ou reaproveita, se já existir na pasta) o arquivo de entrada de um tamanho e nível de
+    carga e retorna seu caminho. Com vários núcleos, as tarefas chegam proporcionalmente mais
+    rápido, para que a ocupação de cada núcleo seja a do nível de carga.'''
+    sufixo = f"_{num_nucleos}n" if num_nucleos > 1 else ""
+    caminho = os.path.join(pasta, f"carga_{carga}_{tamanho}{sufixo}.bin")
+    if not os.path.isfile(caminho):
+        cenario = gerador.Cenario(taxa=CARGAS[carga] * num_nucleos / DURACAO_MEDIA,
+                                  duracao_media=DURACAO_MEDIA)
+        gerador.gera(caminho, tamanho, cenario, SEMENTE, binario=True)
+    return caminho
+
+def _prepara(entrada:str, algoritmo:c.Algoritmo,
+             num_nucleos:int=NUCLEOS_PADRAO) -> tuple[Escalonador, c.AgendaTarefas]:
+    '''Cria um Escalonador silencioso e a agenda com as tarefas da entrada, fora da medição.'''
+    return (Escalonador(algoritmo, verboso=False, num_nucleos=num_nucleos),
+            c.AgendaTarefas(carregar_tarefas(entrada)))
+
+def mede(entrada:str, algoritmo:c.Algoritmo, repeticoes:int=5,
+         num_nucleos:int=NUCLEOS_PADRAO) -> dict:
+    '''Mede a simulação da entrada com o algoritmo e o número de núcleos. O tempo é o menor entre
+    as repetições, que é o menos afetado por interferências, e dele saem os ciclos simulados e as
+    decisões de escalonamento por segundo. O CPython não conta as alocações sem instrumentar o
+    interpretador, então a memória é descrita por três substitutos: o pico de memória alocada
+    durante a simulação, medido com tracemalloc em uma execução extra (separada porque o
+    rastreamento deixa tudo mais lento); os blocos ainda alocados ao fim da simulação
+    (sys.getallocatedblocks, que conta blocos retidos); e as coletas do coletor de lixo, disparadas
+    a cada tantos objetos alocados e não liberados. Os dois últimos são os menores entre as
+    repetições.'''
+    tempos, blocos_retidos, coletas_gc = [], [], []
+    info_saida = None
+    for _ in range(repeticoes):
+        # O resultado da repetição anterior é liberado antes da contagem de blocos, e não durante
+        info_saida = None
+        escalonador, agenda = _prepara(entrada, algoritmo, num_nucleos)
+        coletas = sum(estatistica["collections"] for estatistica in gc.get_stats())
+        blocos = sys.getallocatedblocks()
+        inicio = time.perf_counter()
+        info_saida = simulador.executa(escalonador, agenda)
+        tempos.append(time.perf_counter() - inicio)
+        blocos_retidos.append(sys.getallocatedblocks() - blocos)
+        coletas_gc.append(sum(estatistica["collections"] for estatistica in gc.get_stats()) - coletas)
+    tempo = min(tempos)
+
+    escalonador, agenda = _prepara(entrada, algoritmo, num_nucleos)
+    tracemalloc.start()
+    base = tracemalloc.get_traced_memory()[0]
+    simulador.executa(escalonador, agenda)
+    pico = tracemalloc.get_traced_memory()[1] - base
+    tracemalloc.stop()
+
+    # Cada ciclo com tarefa pronta é uma decisão de escalonamento; os ciclos ociosos são pulados
+    decisoes = info_saida.total_ciclos * info_saida.num_nucleos - info_saida.ciclos_ociosos_nucleos()
+    turnaround = sum(t.fim_exe - t.ingresso for t in info_saida.tarefas_em_ordem()) # type: ignore
+    return {
+        "tempo_s": round(tempo, 4),
+        "ciclos": info_saida.total_ciclos,
+        "ciclos_por_s": round(info_saida.total_ciclos / tempo) if tempo else None,
+        "decisoes": decisoes,
+        "decisoes_por_s": round(decisoes / tempo) if tempo else None,
+        "us_por_decisao": round(1e6 * tempo / decisoes, 3) if decisoes else None,
+        # Pela lei de Little, o número médio de tarefas no sistema (na fila de prontas ou em
+        # execução) é a soma dos turnarounds dividida pela duração da execução
+        "profundidade_media": round(turnaround / info_saida.total_ciclos, 1) if info_saida.total_ciclos else 0,
+        "memoria_pico_kib": round(pico / 1024, 1),
+        "blocos_retidos": min(blocos_retidos),
+        "coletas_gc": min(coletas_gc),
+    }
+
+def executa_bench(algoritmos:list[c.Algoritmo], tamanhos:list[int], cargas:list[str],
+                  repeticoes:int=5, pasta:str|None=None, nucleos:list[int]|None=None) -> list[dict]:
+    '''Mede todas as combinações de número de núcleos, carga, tamanho e algoritmo e retorna uma
+    linha por combinação (por padrão, só com um núcleo). As cargas são geradas na pasta informada,
+    ou em uma pasta temporária.'''
+    with tempfile.TemporaryDirectory(prefix="escalonamento_bench_") as temporaria:
+        pasta = pasta or temporaria
+        linhas = []
+        largura = len(str(max(nucleos or [1])))  # alinha a coluna de núcleos
+        for num_nucleos in nucleos or [1]:
+            for carga in cargas:
+                for tamanho in tamanhos:
+                    entrada = gera_carga(pasta, tamanho, carga, num_nucleos)
+                    for algoritmo in algoritmos:
+                        linha = {"algoritmo": algoritmo.name, "tarefas": tamanho, "carga": carga,
+                                 "nucleos": num_nucleos,
+                                 **mede(entrada, algoritmo, repeticoes, num_nucleos)}
+                        print(f"[Bench] {num_nucleos:>{largura}}n {carga:<9}{tamanho:>9} {algoritmo.name:<6}"
+                              f"{linha['ciclos_por_s']:>12} ciclos/s"
+                              f"{linha['decisoes_por_s']:>12} decisões/s"
+                              f"{linha['us_por_decisao']:>10} us/decisão"
+                              f"{linha['memoria_pico_kib']:>12} KiB")
+                        linhas.append(linha)
+    return linhas
+
+def ambiente() -> dict:
+    '''Descreve o ambiente da medição, gravado junto da referência.'''
+    return {"python": platform.python_version(), "implementacao": platform.python_implementation(),
+            "sistema": platform.platform(), "processador": platform.processor() or platform.machine()}
+
+def grava_referencia(linhas:list[dict], caminho:str, repeticoes:int):
+    '''Grava os resultados como referência em um arquivo JSON.'''
+    with open(caminho, "w") as arquivo:
+        json.dump({"ambiente": ambiente(), "repeticoes": repeticoes, "resultados": linhas},
+                  arquivo, indent=2)
+
+def compara(linhas:list[dict], caminho:str, tolerancia:float=0.2) -> list[str]:
+    '''Compara os resultados com os de uma referência gravada e retorna a descrição das regressões:
+    combinações em que alguma métrica de METRICAS_REGRESSAO piorou mais que a tolerância (fração do
+    valor da referência). Combinações ausentes da referência são ignoradas; nas referências gravadas
+    antes da opção --nucleos, todas as combinações são de um núcleo.'''
+    with open(caminho, "r") as arquivo:
+        referencia = json.load(arquivo)
+    anteriores = {(r["algoritmo"], r["tarefas"], r["carga"], r.get("nucleos", 1)): r
+                  for r in referencia["resultados"]}
+
+    regressoes = []
+    for linha in linhas:
+        anterior = anteriores.get((linha["algoritmo"], linha["tarefas"], linha["carga"],
+                                   linha["nucleos"]))
+        if anterior is None:
+            continue
+        for metrica in METRICAS_REGRESSAO:
+            atual, base = linha[metrica], anterior.get(metrica)
+            if atual is None or not base:
+                continue
+            variacao = atual / base - 1
+            if variacao > tolerancia:
+                regressoes.append(f"{linha['algoritmo']} com {linha['tarefas']} tarefas ({linha['carga']}, "
+                                  f"{linha['nucleos']} núcleos): {metrica} {base} -> {atual} "
+                                  f"(+{variacao:.0%})")
+    return regressoes
+
+def _lista(texto:str, conversao, nome:str) -> list:
+    '''Converte uma lista separada por vírgulas, encerrando com uma mensagem de erro se algum item
+    for inválido.'''
+    try:
+        return [conversao(item.strip()) for item in texto.split(",")]
+    except (KeyError, ValueError):
+        print(f"Erro: Valor inválido em {nome}: '{texto}'.")
+        sys.exit(1)
+
+def main():
+    parser = argparse.ArgumentParser(usage=USO)
+    parser.add_argument("--algoritmos", default=",".join(a.name for a in c.Algoritmo),
+                        help="algoritmos separados por vírgula (padrão: todos)")
+    parser.add_argument("--tamanhos", default=",".join(map(str, TAMANHOS_PADRAO)),
+                        help="números de tarefas separados por vírgula (padrão: 1000,10000,100000)")
+    parser.add_argument("--cargas", default=",".join(CARGAS),
+                        help="níveis de ocupação da CPU separados por vírgula (padrão: leve,alta,saturada)")
+    parser.add_argument("--nucleos", default=str(NUCLEOS_PADRAO),
+                        help="números de núcleos da CPU simulada separados por vírgula (padrão: 1)")
+    parser.add_argument("--repeticoes", type=int, default=5,
+                        help="execuções cronometradas por combinação; vale a mais rápida (padrão: 5)")
+    parser.add_argument("--pasta", help="pasta onde as cargas geradas são guardadas e reaproveitadas")
+    parser.add_argument("--salva", help="caminho para gravar os resultados como referência, em JSON")
+    parser.add_argument("--compara", help="referência gravada com --salva para apontar regressões")
+    parser.add_argument("--tolerancia", type=float, default=0.2,
+                        help="piora relativa tolerada antes de apontar uma regressão (padrão: 0.2, "
+                             "já que execuções curtas variam bastante de uma medição para outra)")
+    args = parser.parse_args()
+
+    algoritmos = _lista(args.algoritmos, lambda nome: c.Algoritmo[nome.lower()], "--algoritmos")
+    tamanhos = _lista(args.tamanhos, int, "--tamanhos")
+    cargas = _lista(args.cargas, str, "--cargas")
+    nucleos = _lista(args.nucleos, int, "--nucleos")
+    if any(carga not in CARGAS for carga in cargas):
+        print(f"Erro: Nível de carga inválido. Opções: {', '.join(CARGAS)}.")
+        sys.exit(1)
+    if min(tamanhos) < 1 or min(nucleos) < 1 or args.repeticoes < 1 or args.tolerancia < 0:
+        print("Erro: Tamanhos, núcleos e repetições devem ser positivos e a tolerância não pode ser "
+              "negativa.")
+        sys.exit(1)
+    if args.compara is not None and not os.path.isfile(args.compara):
+        print(f"Erro: Arquivo de referência '{args.compara}' não encontrado.")
+        sys.exit(1)
+    if args.pasta is not None:
+        os.makedirs(args.pasta, exist_ok=True)
+
+    linhas = executa_bench(algoritmos, tamanhos, cargas, args.repeticoes, args.pasta, nucleos)
+
+    if args.salva is not None:
+        grava_referencia(linhas, args.salva, args.repeticoes)
+        print(f"[Bench] Referência gravada em '{args.salva}'.")
+
+    if args.compara is not None:
+        regressoes = compara(linhas, args.compara, args.tolerancia)
+        if regressoes:
+            print(f"\n[Bench] {len(regressoes)} regressões em relação a '{args.compara}':")
+            for regressao in regressoes:
+                print(f"  {regressao}")
+            sys.exit(1)
+        print(f"\n[Bench] Nenhuma regressão em relação a '{args.compara}'.")
+
+if __name__ == "__main__":
+    main()
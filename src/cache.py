@@ -0,0 +1,178 @@
+import hashlib
+import json
+import os
+import shutil
+import classes as c
+from escalonador import QUANTUM_PADRAO, FATOR_ENVELHECIMENTO_PADRAO, NUCLEOS_PADRAO
+
+# Cache em disco dos resultados de simulações. Cada resultado é identificado por uma chave que
+# resume tudo o que o determina: o conteúdo do arquivo de entrada (não o seu nome), o algoritmo, os
+# parâmetros que o algoritmo usa e a versão do código do escalonador. A entrada do cache é uma pasta
+# com os arquivos gerados pela execução (saida.txt, resumo.json, metricas.json), que podem ser
+# acrescentados aos poucos. Quando o cache passa do limite de tamanho, as entradas usadas há mais
+# tempo são removidas (LRU).
+
+# Pasta do cache, configurável pela variável de ambiente ESCALONAMENTO_CACHE
+RAIZ_PADRAO = os.environ.get("ESCALONAMENTO_CACHE",
+                             os.path.join(os.path.expanduser("~"), ".cache", "escalonamento"))
+LIMITE_PADRAO = 1 << 30  # 1 GiB
+
+# Fração do limite que o cache ocupa após uma limpeza, para que as gravações seguintes não
+# precisem varrê-lo de novo
+FRACAO_APOS_LIMPEZA = 0.9
+
+# Arquivos cujo conteúdo define a versão do escalonador: qualquer alteração neles invalida o cache.
+# Incluem todos os módulos que produzem os arquivos guardados: a simulação nos dois modos de
+# execução, a comunicação entre os processos, o rastro, as métricas e o resumo do lote.
+ARQUIVOS_VERSAO = ("classes.py", "escalonador.py", "simulador.py", "emissor.py", "leitura.py",
+                   "clock.py", "socket_utils.py", "protocolo.py", "rastro.py", "metricas.py",
+                   "lote.py")
+
+_versao:str|None = None
+
+def versao_escalonador() -> str:
+    '''Retorna um hash do código que determina o resultado das simulações.'''
+    global _versao
+    if _versao is None:
+        resumo = hashlib.sha256()
+        pasta = os.path.dirname(os.path.abspath(__file__))
+        for nome in ARQUIVOS_VERSAO:
+            with open(os.path.join(pasta, nome), "rb") as arquivo:
+                resumo.update(arquivo.read())
+        _versao = resumo.hexdigest()
+    return _versao
+
+def hash_arquivo(caminho:str) -> str:
+    '''Retorna o SHA-256 do conteúdo do arquivo, lido em blocos.'''
+    resumo = hashlib.sha256()
+    with open(caminho, "rb") as arquivo:
+        while bloco := arquivo.read(1 << 20):
+            resumo.update(bloco)
+    return resumo.hexdigest()
+
+class CacheResultados:
+    '''Cache de resultados em uma pasta, com remoção das entradas menos usadas recentemente quando o
+    tamanho total passa de limite_bytes. O uso de uma entrada é registrado na data de modificação
+    da sua pasta. Os arquivos são gravados com substituição atômica, de modo que vários processos
+    podem usar o mesmo cache ao mesmo tempo. O tamanho total é medido na primeira gravação e
+    depois apenas atualizado a cada gravação deste processo; o cache só é varrido de novo quando
+    essa estimativa passa do limite.'''
+    def __init__(self, raiz:str=RAIZ_PADRAO, limite_bytes:int=LIMITE_PADRAO) -> None:
+        '''Construtor da classe. A pasta é criada se não existir.'''
+        self.raiz = raiz
+        self.limite_bytes = limite_bytes
+        self.tamanho_total:int|None = None  # estimativa, medida na primeira gravação
+        os.makedirs(raiz, exist_ok=True)
+
+    def chave(self, entrada:str, algoritmo:c.Algoritmo, quantum:int=QUANTUM_PADRAO,
+              fator_envelhecimento:int=FATOR_ENVELHECIMENTO_PADRAO, hash_entrada:str|None=None,
+              num_nucleos:int=NUCLEOS_PADRAO) -> str:
+        '''Calcula a chave de uma execução. Só entram na chave os parâmetros usados pelo algoritmo,
+        para que, por exemplo, o FCFS com qualquer quantum tenha o mesmo resultado em cache. O
+        número de núcleos só entra quando for maior que 1, o que mantém as chaves já gravadas. O
+        hash da entrada pode ser informado para evitar reler o arquivo.'''
+        parametros:dict[str, int] = {}
+        if algoritmo == c.Algoritmo.rr:
+            parametros["quantum"] = quantum
+        elif algoritmo == c.Algoritmo.priod:
+            parametros["fator_envelhecimento"] = fator_envelhecimento
+        if num_nucleos > 1:
+            parametros["nucleos"] = num_nucleos
+        identificacao = json.dumps({
+            "entrada": hash_entrada or hash_arquivo(entrada),
+            "algoritmo": algoritmo.name,
+            "parametros": parametros,
+            "versao": versao_escalonador(),
+        }, sort_keys=True)
+        return hashlib.sha256(identificacao.encode()).hexdigest()
+
+    def _pasta(self, chave:str) -> str:
+        '''Pasta da entrada com a chave informada.'''
+        return os.path.join(self.raiz, chave[:2], chave)
+
+    def busca(self, chave:str, *arquivos:str) -> bool:
+        '''Retorna True se a entrada existe e tem todos os arquivos pedidos, registrando o uso.'''
+        pasta = self._pasta(chave)
+        if not all(os.path.isfile(os.path.join(pasta, nome)) for nome in arquivos):
+            return False
+        try:
+            os.utime(pasta)
+        except FileNotFoundError:  # removida por outro processo
+            return False
+        return True
+
+    def copia(self, chave:str, nome:str, destino:str):
+        '''Copia um arquivo da entrada para o destino.'''
+        shutil.copyfile(os.path.join(self._pasta(chave), nome), destino)
+
+    def le_json(self, chave:str, nome:str):
+        '''Lê um arquivo JSON da entrada.'''
+        with open(os.path.join(self._pasta(chave), nome), "r") as arquivo:
+            return json.load(arquivo)
+
+    def _caminhos(self, chave:str, nome:str) -> tuple[str, str]:
+        '''Cria a pasta da entrada e retorna o caminho final de um arquivo e um caminho temporário,
+        exclusivo deste processo, para gravá-lo antes da substituição.'''
+        pasta = self._pasta(chave)
+        os.makedirs(pasta, exist_ok=True)
+        final = os.path.join(pasta, nome)
+        return final, f"{final}.{os.getpid()}.tmp"
+
+    def _substitui(self, temporario:str, final:str):
+        '''Move o arquivo temporário para o caminho final, atualizando o tamanho total do cache, e
+        remove entradas antigas se ele passar do limite.'''
+        acrescimo = os.path.getsize(temporario)
+        try:
+            acrescimo -= os.path.getsize(final)
+        except FileNotFoundError:
+            pass
+        os.replace(temporario, final)
+        if self.tamanho_total is None:
+            self.limita()
+            return
+        self.tamanho_total += acrescimo
+        if self.tamanho_total > self.limite_bytes:
+            self.limita()
+
+    def guarda_arquivo(self, chave:str, nome:str, origem:str):
+        '''Guarda uma cópia do arquivo de origem na entrada, com o nome informado.'''
+        final, temporario = self._caminhos(chave, nome)
+        shutil.copyfile(origem, temporario)
+        self._substitui(temporario, final)
+
+    def guarda_json(self, chave:str, nome:str, dados):
+        '''Guarda dados em um arquivo JSON na entrada.'''
+        final, temporario = self._caminhos(chave, nome)
+        with open(temporario, "w") as arquivo:
+            json.dump(dados, arquivo)
+        self._substitui(temporario, final)
+
+    def guarda_saida(self, chave:str, info_saida:c.InfoSaida):
+        '''Gera o arquivo de saída de uma execução diretamente na entrada, como saida.txt.'''
+        final, temporario = self._caminhos(chave, "saida.txt")
+        info_saida.gera_saida(temporario)
+        self._substitui(temporario, final)
+
+    def limita(self):
+        '''Mede o tamanho do cache e, se ele passar do limite, remove as entradas usadas há mais
+        tempo até que ocupe no máximo FRACAO_APOS_LIMPEZA do limite.'''
+        entradas = []
+        total = 0
+        for prefixo in os.scandir(self.raiz):
+            if not prefixo.is_dir():
+                continue
+            for pasta in os.scandir(prefixo.path):
+                try:
+                    tamanho = sum(arquivo.stat().st_size for arquivo in os.scandir(pasta.path))
+                    entradas.append((pasta.stat().st_mtime, tamanho, pasta.path))
+                except FileNotFoundError:  # removida por outro processo
+                    continue
+                total += tamanho
+        if total > self.limite_bytes:
+            entradas.sort()
+            for _, tamanho, pasta in entradas:
+                if total <= self.limite_bytes * FRACAO_APOS_LIMPEZA:
+                    break
+                shutil.rmtree(pasta, ignore_errors=True)
+                total -= tamanho
+        self.tamanho_total = total
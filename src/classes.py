@@ -1,11 +1,26 @@
+import heapq
+import itertools
+import operator
+import os
+import tempfile
+from array import array
+from collections import deque
+from contextlib import ExitStack
 from enum import Enum
+from typing import Iterable, Iterator
 
 class Tarefa:
     '''Uma tarefa a ser processada pela simulação. Contém como atributos seu identificador,
     tempo de ingresso, duração total prevista, duração previsa no momento, prioridades original e
     no momento e tempos iniciais e finais de execução. Obs.: quanto menor o valor numérico de
-    prioridade informado, maior a prioridade para execução.'''
-    
+    prioridade informado, maior a prioridade para execução.
+
+    Os atributos são declarados em __slots__: sem o __dict__ de cada instância, uma tarefa ocupa
+    bem menos memória e o acesso aos atributos é mais rápido, o que permite simular arquivos com
+    milhões de tarefas.'''
+    __slots__ = ("id", "ingresso", "duracao_total", "duracao_resto", "priod_original",
+                 "priod_dinamica", "inicio_exe", "fim_exe")
+
     def __init__(self, id:str, ingresso:int, duracao:int, prioridade:int):
         '''Construtor da classe.'''
         self.id:str = id
@@ -55,40 +70,265 @@ class Criterio(Enum):
     priod_original = 2
     priod_dinamica = 3
 
-class InfoSaida:
-    '''Estrutura que armazena as tarefas que foram concluídas na simulação e os ids das tarefas
-    executadas a cada ciclo de clock, além de implementar os métodos para escrever o arquivo de
-    saída com os dados da execução.'''
+# Campos dos registros de tamanho fixo das tarefas concluídas, em inteiros de 64 bits (ver
+# InfoSaida.registros_descarregados). Uma tarefa concluída sempre tem início e fim de execução.
+CAMPOS_REGISTRO = ("ingresso", "inicio_exe", "fim_exe", "duracao_total", "priod_original")
+campos_registro = operator.attrgetter(*CAMPOS_REGISTRO)
+
+def _registro_concluida(tarefa:Tarefa) -> str:
+    '''Converte uma tarefa concluída em uma linha id;ingresso;duracao;prioridade;inicio;fim para os
+    blocos em disco do InfoSaida. Tempos ausentes são gravados como -1.'''
+    inicio = tarefa.inicio_exe if tarefa.inicio_exe is not None else -1
+    fim = tarefa.fim_exe if tarefa.fim_exe is not None else -1
+    return f"{tarefa.id};{tarefa.ingresso};{tarefa.duracao_total};{tarefa.priod_original};{inicio};{fim}\n"
+
+def _tarefa_concluida(linha:str) -> Tarefa:
+    '''Reconstrói uma tarefa concluída a partir de uma linha gravada por _registro_concluida.'''
+    id, ingresso, duracao, prioridade, inicio, fim = linha.rstrip("\n").split(";")
+    tarefa = Tarefa(id, int(ingresso), int(duracao), int(prioridade))
+    tarefa.duracao_resto = 0
+    tarefa.inicio_exe = int(inicio) if inicio != "-1" else None
+    tarefa.fim_exe = int(fim) if fim != "-1" else None
+    return tarefa
+
+class LinhaDoTempo:
+    '''Linha do tempo das tarefas executadas a cada ciclo de clock em um processador. É guardada em
+    segmentos: cada segmento é uma sequência de ciclos consecutivos executando a mesma tarefa (ou
+    ociosos, com id None), representada pelo id, ciclo inicial e duração. Os ids ficam em uma lista
+    e os ciclos em arrays de inteiros, de modo que a memória depende do número de trocas de tarefa,
+    e não do número de ciclos.'''
     def __init__(self) -> None:
-        '''Inicializa ambas as listas como vazias.'''
+        '''Inicializa a linha do tempo como vazia.'''
+        self.ids_segmentos:list[str|None] = []
+        self.inicios_segmentos:array[int] = array("q")
+        self.duracoes_segmentos:array[int] = array("q")
+        self.total_ciclos:int = 0
+
+    def _registra_ciclos(self, id:str|None, quantidade:int):
+        '''Acrescenta ciclos à linha do tempo, estendendo o último segmento se ele for da mesma
+        tarefa, em O(1).'''
+        if self.ids_segmentos and self.ids_segmentos[-1] == id:
+            self.duracoes_segmentos[-1] += quantidade
+        else:
+            self.ids_segmentos.append(id)
+            self.inicios_segmentos.append(self.total_ciclos)
+            self.duracoes_segmentos.append(quantidade)
+        self.total_ciclos += quantidade
+
+    def add_id_do_clock(self, id=None):
+        '''Adiciona o id do armunento na linha do tempo, como o próximo ciclo de clock. Caso neste
+        ciclo de clock não tenham tarefas sendo executadas, chame a função sem argumentos que None
+        será adicionado.'''
+        self._registra_ciclos(id, 1)
+
+    def add_ciclos_ociosos(self, quantidade:int):
+        '''Registra de uma só vez uma sequência de ciclos de clock sem tarefas em execução, como os
+        pulados pelo Clock enquanto a fila de prontas está vazia.'''
+        if quantidade > 0:
+            self._registra_ciclos(None, quantidade)
+
+    def segmentos(self) -> Iterator[tuple[str|None, int, int]]:
+        '''Percorre a linha do tempo em segmentos (id, ciclo inicial, duração), sem expandi-la.'''
+        return zip(self.ids_segmentos, self.inicios_segmentos, self.duracoes_segmentos)
+
+    def ids_por_clock(self) -> Iterator[str|None]:
+        '''Percorre a linha do tempo ciclo a ciclo, gerando o id executado em cada um (None para
+        ciclos ociosos).'''
+        for id, _, duracao in self.segmentos():
+            yield from itertools.repeat(id, duracao)
+
+    @property
+    def id_por_clock(self) -> list[str|None]:
+        '''Linha do tempo expandida em uma lista com um id por ciclo. Mantida por compatibilidade;
+        ocupa memória proporcional ao número de ciclos.'''
+        return list(self.ids_por_clock())
+
+    def registra(self, id:str, clock:int):
+        '''Registra a tarefa executada no ciclo informado, preenchendo como ociosos os ciclos
+        anteriores ainda não registrados. Usado na simulação com vários núcleos, em que a linha do
+        tempo de um núcleo só é atualizada nos ciclos em que ele está ocupado.'''
+        if clock > self.total_ciclos:
+            self._registra_ciclos(None, clock - self.total_ciclos)
+        self._registra_ciclos(id, 1)
+
+    def ciclos_ociosos(self) -> int:
+        '''Número de ciclos sem tarefa em execução.'''
+        return sum(duracao for id, duracao in zip(self.ids_segmentos, self.duracoes_segmentos)
+                   if id is None)
+
+class InfoSaida:
+    '''Estrutura que armazena as tarefas que foram concluídas na simulação e a linha do tempo das
+    tarefas executadas a cada ciclo de clock em cada núcleo, além de implementar os métodos para
+    escrever o arquivo de saída com os dados da execução.
+
+    Cada núcleo tem a sua LinhaDoTempo em linhas_nucleos. Na simulação com um processador, a única
+    linha do tempo também é acessada por linha_do_tempo e pelos métodos add_id_do_clock,
+    add_ciclos_ociosos e id_por_clock.
+
+    Com limite_concluidas, no máximo esse número de tarefas concluídas fica na memória: ao atingir
+    o limite, elas são gravadas em disco, ordenadas por id, em um bloco de um diretório temporário.
+    Os blocos são intercalados na geração da saída.'''
+    def __init__(self, limite_concluidas:int|None=None, num_nucleos:int=1) -> None:
+        '''Inicializa a lista de tarefas concluídas e as linhas do tempo como vazias.'''
+        self.linhas_nucleos:list[LinhaDoTempo] = [LinhaDoTempo() for _ in range(num_nucleos)]
+        # Linha do tempo do processador, na simulação com um núcleo (None com vários núcleos)
+        self.linha_do_tempo:LinhaDoTempo|None = self.linhas_nucleos[0] if num_nucleos == 1 else None
         self.tarefas_concluidas:list[Tarefa] = []
-        self.id_por_clock:list[str|None] = []
+        self.limite_concluidas:int|None = limite_concluidas
+        self.num_descarregadas:int = 0
+        self._pasta:tempfile.TemporaryDirectory|None = None
+        self._blocos:list[str] = []
+        self._registros:list[str] = []
+
+    def add_id_do_clock(self, id=None):
+        '''Adiciona o id na linha do tempo do processador (ver LinhaDoTempo.add_id_do_clock).'''
+        self.linha_do_tempo.add_id_do_clock(id) # type: ignore
+
+    def add_ciclos_ociosos(self, quantidade:int):
+        '''Registra ciclos ociosos na linha do tempo do processador (ver
+        LinhaDoTempo.add_ciclos_ociosos).'''
+        self.linha_do_tempo.add_ciclos_ociosos(quantidade) # type: ignore
+
+    @property
+    def id_por_clock(self) -> list[str|None]:
+        '''Linha do tempo do processador expandida em uma lista com um id por ciclo.'''
+        return self.linha_do_tempo.id_por_clock # type: ignore
+
+    @property
+    def total_ciclos(self) -> int:
+        '''Número de ciclos da simulação: o da linha do tempo mais longa, já que as dos núcleos
+        ociosos no fim só são completadas por completa_nucleos.'''
+        return max(linha.total_ciclos for linha in self.linhas_nucleos)
     
     def finaliza_tarefa(self, tarefa:Tarefa):
-        '''Adiciona uma Tarefa no fim da lista de tarefas concluídas.'''
+        '''Adiciona uma Tarefa no fim da lista de tarefas concluídas, descarregando a lista em disco
+        se ela atingir o limite.'''
         self.tarefas_concluidas.append(tarefa)
+        if self.limite_concluidas is not None and len(self.tarefas_concluidas) >= self.limite_concluidas:
+            self._descarrega()
 
-    def add_id_do_clock(self, id=None):
-        '''Adiciona o id do armunento na lista de id de tarefas por ciclo de clock. Caso neste
-        ciclo de clock não tenham tarefas sendo executadas, chame a função sem argumentos que None
-        será adicionado.'''
-        self.id_por_clock.append(id)
+    def _descarrega(self):
+        '''Grava as tarefas concluídas em memória em um novo bloco em disco, ordenadas por id, e as
+        libera da memória. Junto do bloco de texto, usado na saída, é gravado um bloco com os
+        registros de tamanho fixo das mesmas tarefas, que pode ser lido de uma só vez.'''
+        if self._pasta is None:
+            self._pasta = tempfile.TemporaryDirectory(prefix="escalonamento_")
+        self.tarefas_concluidas.sort(key=lambda t: t.id)
+        caminho = os.path.join(self._pasta.name, f"concluidas_{len(self._blocos)}.txt")
+        with open(caminho, "w") as bloco:
+            bloco.writelines(_registro_concluida(t) for t in self.tarefas_concluidas)
+        self._blocos.append(caminho)
+        registros = array("q", itertools.chain.from_iterable(map(campos_registro, self.tarefas_concluidas)))
+        caminho = os.path.join(self._pasta.name, f"concluidas_{len(self._registros)}.bin")
+        with open(caminho, "wb") as bloco:
+            registros.tofile(bloco)
+        self._registros.append(caminho)
+        self.num_descarregadas += len(self.tarefas_concluidas)
+        self.tarefas_concluidas = []
+
+    @property
+    def num_concluidas(self) -> int:
+        '''Número total de tarefas concluídas, em memória ou em disco.'''
+        return self.num_descarregadas + len(self.tarefas_concluidas)
 
-    def gera_saida(self) -> None:
+    def registros_descarregados(self) -> Iterator[bytes]:
+        '''Percorre os blocos de registros das tarefas descarregadas em disco: os campos de
+        CAMPOS_REGISTRO de cada tarefa, em inteiros de 64 bits na ordem de bytes da máquina. As
+        tarefas em memória não estão incluídas, e a ordem dos registros é a de cada bloco.'''
+        for caminho in self._registros:
+            with open(caminho, "rb") as bloco:
+                yield bloco.read()
+
+    def tarefas_em_ordem(self) -> Iterator[Tarefa]:
+        '''Percorre as tarefas concluídas em ordem de id (tarefas com o mesmo id na ordem de
+        conclusão). As tarefas descarregadas são lidas dos blocos em disco e intercaladas com as
+        que estão em memória, sem carregá-las todas.'''
+        self.tarefas_concluidas.sort(key=lambda t: t.id)
+        if not self._blocos:
+            yield from self.tarefas_concluidas
+            return
+        with ExitStack() as pilha:
+            blocos = [map(_tarefa_concluida, pilha.enter_context(open(caminho, "r")))
+                      for caminho in self._blocos]
+            yield from heapq.merge(*blocos, self.tarefas_concluidas, key=lambda t: t.id)
+
+    @property
+    def num_nucleos(self) -> int:
+        '''Número de núcleos da simulação.'''
+        return len(self.linhas_nucleos)
+
+    def completa_nucleos(self, total_ciclos:int):
+        '''Completa com ciclos ociosos as linhas do tempo dos núcleos até o total de ciclos da
+        simulação, ao final da execução com vários núcleos.'''
+        for linha in self.linhas_nucleos:
+            linha.add_ciclos_ociosos(total_ciclos - linha.total_ciclos)
+
+    def ciclos_ociosos_nucleos(self) -> int:
+        '''Número de ciclos sem tarefa em execução, somado em todos os núcleos.'''
+        return sum(linha.ciclos_ociosos() for linha in self.linhas_nucleos)
+
+    def utilizacao_nucleos(self) -> list[float]:
+        '''Fração dos ciclos em que cada núcleo esteve ocupado.'''
+        total = self.total_ciclos
+        if not total:
+            return [0.0] * self.num_nucleos
+        return [1 - linha.ciclos_ociosos() / total for linha in self.linhas_nucleos]
+
+    def descreve_utilizacao(self) -> str:
+        '''Retorna a utilização de cada núcleo em uma frase, para as mensagens de fim da simulação.'''
+        utilizacao = ", ".join(f"{u:.1%}" for u in self.utilizacao_nucleos())
+        return f"Utilização dos {self.num_nucleos} núcleos: {utilizacao}."
+
+    def _simbolos(self) -> Iterator[tuple[str, int]]:
+        '''Percorre a sequência em trechos (símbolo, duração), com "__" nos ciclos ociosos. Com
+        vários núcleos, o símbolo de cada ciclo reúne os ids de todos os núcleos, separados por ",",
+        e um trecho termina sempre que algum núcleo troca de tarefa.'''
+        if self.num_nucleos == 1:
+            for id, _, duracao in self.linha_do_tempo.segmentos(): # type: ignore
+                yield (id if id is not None else "__"), duracao
+            return
+        segmentos = [linha.segmentos() for linha in self.linhas_nucleos]
+        atuais = [next(segmento, (None, 0, 0)) for segmento in segmentos]
+        simbolos = [id if id is not None else "__" for id, _, _ in atuais]
+        restantes = [duracao for _, _, duracao in atuais]
+        while min(restantes) > 0:
+            quantidade = min(restantes)
+            yield ",".join(simbolos), quantidade
+            for nucleo, segmento in enumerate(segmentos):
+                restantes[nucleo] -= quantidade
+                if restantes[nucleo] == 0:
+                    id, _, restantes[nucleo] = next(segmento, (None, 0, 0))
+                    simbolos[nucleo] = id if id is not None else "__"
+
+    def _escreve_sequencia(self, saida):
+        '''Escreve a sequência de tarefas por clock, separada por ";" e com "__" nos ciclos ociosos,
+        expandindo um trecho por vez em blocos de tamanho limitado.'''
+        BLOCO = 65536
+        primeiro = True
+        for simbolo, duracao in self._simbolos():
+            while duracao > 0:
+                quantidade = min(duracao, BLOCO)
+                bloco = (";" + simbolo) * quantidade
+                saida.write(bloco[1:] if primeiro else bloco)
+                primeiro = False
+                duracao -= quantidade
+        saida.write("\n")
+
+    def gera_saida(self, caminho:str="saida.txt") -> None:
         '''Gera arquivo de saída com: sequência das tarefas por clock; uma linha por tarefa com ID,
         tempos e métricas; e linha final com médias de turnaround e espera, arredondadas com 1 casa
-        decimal.'''
-        with open("saida.txt", "w") as saida:
-
-            self.tarefas_concluidas.sort(key=lambda t: getattr(t, "id"))
+        decimal. O arquivo é escrito à medida que é gerado, sem montar nenhuma linha inteira na
+        memória.'''
+        with open(caminho, "w", buffering=1 << 20) as saida:
 
-            seq = ";".join(id if id is not None else "__" for id in self.id_por_clock)
-            saida.write(seq + "\n")
+            self._escreve_sequencia(saida)
 
             tt_sum:int = 0 # vai acumulando o turnaround time
             wt_sum:int = 0 # vai acumulando o waiting time
 
-            for t in self.tarefas_concluidas:
+            num_tarefas = 0
+            for t in self.tarefas_em_ordem():
+                num_tarefas += 1
                 if t.fim_exe is None:
                     raise ValueError(f"Tarefa {t.id} não foi finalizada.")
                 tt:int = t.fim_exe - t.ingresso  # turnaround time
@@ -98,55 +338,577 @@ class InfoSaida:
                 linha = f"{t.id};{t.ingresso};{t.fim_exe};{tt};{wt}\n"
                 saida.write(linha)
 
-            num_tarefas = len(self.tarefas_concluidas)
             if num_tarefas == 0:
                 raise ValueError("Nenhuma tarefa foi concluída.")
             tt_medio = round(tt_sum / num_tarefas, 1)
             wt_medio = round(wt_sum / num_tarefas, 1)
             saida.write(f"{tt_medio};{wt_medio}")
 
+class Nucleos:
+    '''Tarefas em execução em cada núcleo, na simulação com vários processadores. Cada núcleo
+    executa uma tarefa por ciclo, e uma tarefa que continua em execução permanece no mesmo núcleo.
+    As tarefas em execução ficam fora da fila de prontas, que só guarda as que esperam. Os núcleos
+    livres ficam em um heap, de modo que uma tarefa despachada ocupa o núcleo livre de menor
+    índice, e a cada ciclo só os núcleos ocupados são percorridos.'''
+    def __init__(self, num_nucleos:int) -> None:
+        '''Inicializa todos os núcleos como livres.'''
+        self.num_nucleos:int = num_nucleos
+        self.em_execucao:dict[int, Tarefa] = {}  # núcleo -> tarefa, na ordem em que foram ocupados
+        self.executados:dict[int, int] = {}  # núcleo -> ciclos executados desde o despacho da tarefa
+        self.livres:list[int] = list(range(num_nucleos))  # heap
+
+    def tem_livre(self) -> bool:
+        '''Retorna True caso algum núcleo esteja livre.'''
+        return bool(self.livres)
+
+    def ocupa(self, tarefa:Tarefa) -> int:
+        '''Coloca a tarefa no núcleo livre de menor índice e retorna esse núcleo.'''
+        nucleo = heapq.heappop(self.livres)
+        self.em_execucao[nucleo] = tarefa
+        self.executados[nucleo] = 0
+        return nucleo
+
+    def troca(self, nucleo:int, tarefa:Tarefa) -> Tarefa:
+        '''Coloca a tarefa no lugar da que está em execução no núcleo, que é retornada.'''
+        anterior = self.em_execucao[nucleo]
+        self.em_execucao[nucleo] = tarefa
+        self.executados[nucleo] = 0
+        return anterior
+
+    def libera(self, nucleo:int) -> Tarefa:
+        '''Retira e retorna a tarefa em execução no núcleo, que fica livre.'''
+        del self.executados[nucleo]
+        heapq.heappush(self.livres, nucleo)
+        return self.em_execucao.pop(nucleo)
+
+    def executa(self, clock:int, info_saida:InfoSaida, verboso:bool=True) -> int:
+        '''Executa um ciclo de cada tarefa em execução, registrando-o na linha do tempo do seu
+        núcleo, e libera os núcleos das tarefas finalizadas, que vão para info_saida. Retorna o
+        número de tarefas finalizadas.'''
+        linhas = info_saida.linhas_nucleos
+        executados = self.executados
+        finalizadas = []
+        for nucleo, tarefa in self.em_execucao.items():
+            if tarefa.duracao_resto == tarefa.duracao_total:
+                tarefa.inicio_exe = clock
+            tarefa.duracao_resto -= 1
+            executados[nucleo] += 1
+            linhas[nucleo].registra(tarefa.id, clock)
+            if verboso:
+                print(f"[Escalonador] Tarefa {tarefa.id} foi escalonada no núcleo {nucleo}.")
+            if tarefa.duracao_resto == 0:
+                tarefa.fim_exe = clock + 1
+                finalizadas.append(nucleo)
+        for nucleo in finalizadas:
+            tarefa = self.libera(nucleo)
+            info_saida.finaliza_tarefa(tarefa)
+            if verboso:
+                print(f"[Escalonador] Tarefa {tarefa.id} finalizada.")
+        return len(finalizadas)
+
+    def is_empty(self):
+        '''Retorna True caso nenhum núcleo esteja ocupado e False caso contrário.'''
+        return not self.em_execucao
+
 class FilaProntas:
     '''Estrutura que armazena as tarefas que o emissor já informou como prontas por já chegarem ao
     seu tempo de ingresso.'''
-    def __init__(self) -> None:
-        '''Inicializa uma lista vazia.'''
+    def __init__(self, verboso:bool=True) -> None:
+        '''Inicializa uma lista vazia. Com verboso=False, as mensagens de acompanhamento de cada
+        ciclo não são impressas, o que é útil em simulações longas.'''
         self.fila:list[Tarefa] = []
+        self.verboso:bool = verboso
 
     def enfilera(self, tarefa:Tarefa):
         '''Adiciona uma Tarefa no fim da fila.'''
         self.fila.append(tarefa)
 
+    def enfilera_lote(self, tarefas:list[Tarefa]):
+        '''Adiciona várias tarefas no fim da fila, na ordem da lista.'''
+        self.fila.extend(tarefas)
+
     def desenfilera(self):
         '''Retira e retorna a primeira tarefa da fila.'''
         return self.fila.pop(0)
 
+    def rotaciona(self):
+        '''Move a primeira tarefa da fila para o fim dela.'''
+        self.enfilera(self.desenfilera())
+
+    def proxima(self) -> Tarefa:
+        '''Retorna, sem retirar, a tarefa que será escalonada no próximo ciclo.'''
+        return self.fila[0]
+
+    def atualiza_proxima(self):
+        '''Chamado após a tarefa retornada por proxima() ter seus atributos alterados. Na lista
+        simples não há nada a fazer, já que a posição das tarefas só muda em ordena.'''
+
     def escalona(self, clock:int, info_saida:InfoSaida) -> tuple[str, bool]|None:
         '''Escalona a tarefa do inicio da fila e retorna seu id (junto a um bool que indica se a
         tarefa foi finalizada) caso a lista não estiver vazia. Caso contrário, retorna None. Todos
         os dados de saída são atualizados em info_saida.'''
-        if not self.fila:
-            info_saida.add_id_do_clock()
+        if self.is_empty():
+            info_saida.linha_do_tempo.add_id_do_clock() # type: ignore
             return None
         else:
-            tarefa:Tarefa = self.fila[0]
+            tarefa:Tarefa = self.proxima()
             if tarefa.duracao_resto == tarefa.duracao_total:
                 tarefa.inicio_exe = clock
             tarefa.duracao_resto -= 1
             tarefa_id = tarefa.id
-            info_saida.add_id_do_clock(tarefa_id)
-            print(f"[Escalonador] Tarefa {tarefa_id} foi escalonada.")
+            info_saida.linha_do_tempo.add_id_do_clock(tarefa_id) # type: ignore
+            if self.verboso:
+                print(f"[Escalonador] Tarefa {tarefa_id} foi escalonada.")
             if tarefa.duracao_resto == 0:
                 tarefa.fim_exe = clock + 1
                 info_saida.finaliza_tarefa(self.desenfilera())
-                print(f"[Escalonador] Tarefa {tarefa_id} finalizada.")
+                if self.verboso:
+                    print(f"[Escalonador] Tarefa {tarefa_id} finalizada.")
                 return tarefa_id, True
+            self.atualiza_proxima()
             return tarefa_id, False
            
         
+    def despacha(self, nucleos:Nucleos):
+        '''Na simulação com vários núcleos, ocupa os núcleos livres com as tarefas do início da
+        fila, que saem dela enquanto estão em execução.'''
+        while self.fila and nucleos.tem_livre():
+            nucleos.ocupa(self.desenfilera())
+
     def ordena(self, criterio:Criterio):
         '''Ordena a fila segundo um dos determinados atributor de Tarefa indicado por critério.'''
         self.fila.sort(key=lambda t: getattr(t, criterio.name))
     
     def is_empty(self):
         '''Retorna True Caso a fila esteja vazia e False caso contrário.'''
-        return not self.fila
\ No newline at end of file
+        return not self.fila
+
+class FilaFifo(FilaProntas):
+    '''Fila de prontas mantida em um deque, usada pelos algoritmos que atendem as tarefas em ordem
+    de chegada (FCFS e RR). Enfileirar, desenfileirar e rotacionar custam O(1), ao contrário do
+    pop(0) da lista, que desloca todas as tarefas restantes.'''
+    def __init__(self, verboso:bool=True) -> None:
+        '''Inicializa um deque vazio.'''
+        super().__init__(verboso)
+        self.fila:deque[Tarefa] = deque() # type: ignore
+
+    def desenfilera(self):
+        '''Retira e retorna a primeira tarefa da fila.'''
+        return self.fila.popleft()
+
+    def rotaciona(self):
+        '''Move a primeira tarefa da fila para o fim dela.'''
+        self.fila.rotate(-1)
+
+    def ordena(self, criterio:Criterio):
+        '''Ordena a fila segundo um dos determinados atributor de Tarefa indicado por critério.'''
+        self.fila = deque(sorted(self.fila, key=lambda t: getattr(t, criterio.name)))
+
+class FilaPrioridade(FilaProntas):
+    '''Fila de prontas mantida como um heap binário ordenado por um Criterio, com desempate pela
+    ordem de chegada à fila. É a mesma ordem que FilaProntas.ordena produz com a ordenação estável,
+    mas inserção e retirada custam O(log n) em vez de uma ordenação completa a cada ciclo.
+
+    No modo preemptivo, a próxima tarefa é sempre a de menor chave. No modo cooperativo, a tarefa
+    escolhida fica em execução, fora do heap, até terminar.'''
+    def __init__(self, criterio:Criterio, preemptiva:bool, verboso:bool=True) -> None:
+        '''Inicializa um heap vazio ordenado pelo critério informado.'''
+        super().__init__(verboso)
+        self.criterio:Criterio = criterio
+        self.preemptiva:bool = preemptiva
+        self.heap:list[list] = []  # entradas [chave, ordem de chegada, tarefa]
+        self.em_execucao:Tarefa|None = None  # usada apenas no modo cooperativo
+        self.em_nucleos:dict[int, list] = {}  # entradas das tarefas em execução, com vários núcleos
+        self.piores:list[tuple] = []  # heap das tarefas em execução, da maior chave para a menor
+        self.ciclos:int = 0  # ciclos executados pelos núcleos, no modo preemptivo
+        self._chegadas = itertools.count()
+        self._insercoes = itertools.count()
+
+    def enfilera(self, tarefa:Tarefa):
+        '''Insere uma Tarefa na posição dada pelo seu critério.'''
+        heapq.heappush(self.heap, [getattr(tarefa, self.criterio.name), next(self._chegadas), tarefa])
+
+    def enfilera_lote(self, tarefas:list[Tarefa]):
+        '''Insere várias tarefas, na ordem da lista.'''
+        for tarefa in tarefas:
+            self.enfilera(tarefa)
+
+    def desenfilera(self):
+        '''Retira e retorna a próxima tarefa da fila.'''
+        if self.em_execucao is not None:
+            tarefa, self.em_execucao = self.em_execucao, None
+            return tarefa
+        return heapq.heappop(self.heap)[2]
+
+    def proxima(self) -> Tarefa:
+        '''Retorna a tarefa que será escalonada no próximo ciclo. No modo cooperativo, a tarefa de
+        menor chave sai do heap e passa a ser a tarefa em execução.'''
+        if self.preemptiva:
+            return self.heap[0][2]
+        if self.em_execucao is None:
+            self.em_execucao = heapq.heappop(self.heap)[2]
+        return self.em_execucao
+
+    def atualiza_proxima(self):
+        '''Atualiza a chave da tarefa do topo do heap após ela ser executada. Como a execução só
+        diminui a duração restante, a chave do topo só pode diminuir e o heap continua válido
+        (decrease-key na raiz, em O(1)).'''
+        if self.preemptiva:
+            topo = self.heap[0]
+            topo[0] = getattr(topo[2], self.criterio.name)
+
+    def _deslocamento(self) -> int:
+        '''Retorna o valor somado às chaves no heap das tarefas em execução. No SRTF, a chave de
+        todas as tarefas em execução diminui 1 a cada ciclo, e guardá-las somadas ao número de
+        ciclos já executados mantém o heap válido sem atualizá-lo.'''
+        return self.ciclos if self.criterio == Criterio.duracao_resto else 0
+
+    def _em_execucao(self, nucleo:int, entrada:list, nucleos:Nucleos):
+        '''Registra a entrada da tarefa colocada no núcleo e a insere no heap das tarefas em
+        execução. As entradas de tarefas que já saíram dos núcleos ficam no heap até chegarem ao
+        topo (ou até ele ser reconstruído, quando elas passam das tarefas em execução).'''
+        deslocamento = self._deslocamento()
+        if len(self.piores) > 2 * nucleos.num_nucleos:
+            validas = [(n, self.em_nucleos[n]) for n in nucleos.em_execucao
+                       if self._vale(n, self.em_nucleos.get(n), nucleos)]
+            self.piores = [(-(getattr(e[2], self.criterio.name) + deslocamento), -e[1],
+                            next(self._insercoes), n, e) for n, e in validas]
+            heapq.heapify(self.piores)
+        self.em_nucleos[nucleo] = entrada
+        heapq.heappush(self.piores, (-(entrada[0] + deslocamento), -entrada[1],
+                                     next(self._insercoes), nucleo, entrada))
+
+    def _vale(self, nucleo:int, entrada:list|None, nucleos:Nucleos) -> bool:
+        '''Retorna True se a entrada é a da tarefa em execução no núcleo.'''
+        return (entrada is not None and self.em_nucleos.get(nucleo) is entrada
+                and nucleos.em_execucao.get(nucleo) is entrada[2])
+
+    def despacha(self, nucleos:Nucleos):
+        '''Na simulação com vários núcleos, ocupa os núcleos livres com as tarefas de menor chave.
+        No modo preemptivo, enquanto a menor chave da fila for menor que a maior chave entre as
+        tarefas em execução, essa tarefa é trocada pela da fila e volta ao heap com a sua ordem de
+        chegada original, como no modo com um núcleo. As tarefas em execução ficam em um segundo
+        heap, da maior chave para a menor, com invalidação preguiçosa como nas filas de prontas:
+        a pior delas é encontrada em O(log N) para N núcleos.'''
+        if self.preemptiva:
+            self.ciclos += 1
+        while self.heap and nucleos.tem_livre():
+            entrada = heapq.heappop(self.heap)
+            nucleo = nucleos.ocupa(entrada[2])
+            if self.preemptiva:
+                self._em_execucao(nucleo, entrada, nucleos)
+
+        piores = self.piores
+        while self.preemptiva and self.heap and piores:
+            nucleo, pior = piores[0][3], piores[0][4]
+            if not self._vale(nucleo, pior, nucleos):
+                heapq.heappop(piores)
+                continue
+            pior[0] = getattr(pior[2], self.criterio.name)
+            if (self.heap[0][0], self.heap[0][1]) >= (pior[0], pior[1]):
+                break
+            heapq.heappop(piores)
+            entrada = heapq.heapreplace(self.heap, pior)
+            nucleos.troca(nucleo, entrada[2])
+            self._em_execucao(nucleo, entrada, nucleos)
+            if self.verboso:
+                print(f"[Escalonador] Tarefa {pior[2].id} preempetada.")
+            piores = self.piores
+
+    def ordena(self, criterio:Criterio):
+        '''A fila já é mantida em ordem pelo seu critério, portanto não há o que ordenar.'''
+        if criterio != self.criterio:
+            raise ValueError(f"Fila ordenada por {self.criterio.name}, não por {criterio.name}.")
+
+    def is_empty(self):
+        '''Retorna True Caso a fila esteja vazia e False caso contrário.'''
+        return not self.heap and self.em_execucao is None
+
+class FilaDinamica(FilaProntas):
+    '''Fila de prontas do PRIOd com envelhecimento preguiçoso. Em vez de diminuir a prioridade
+    dinâmica de cada tarefa a cada evento, a fila guarda uma época global, incrementada a cada
+    evento, e cada tarefa fica em um nível de chave k = prioridade + fator * época de entrada. A
+    prioridade dinâmica de uma tarefa é max(1, k - fator * época), de modo que envelhecer todas as
+    tarefas custa O(1) e a escolha custa O(log n).
+
+    Ordenar pela chave dá a mesma ordem que a ordenação estável pela prioridade dinâmica: tarefas
+    que chegam ao limite de 1 o alcançam na ordem em que já estavam. A única exceção é a tarefa
+    escolhida no último evento, que está no início da fila; ela fica fora dos níveis até perder a
+    escolha, quando volta ao início do seu nível.
+
+    Tarefas com prioridade menor que 1 disputam o primeiro evento após a chegada com a própria
+    prioridade e, se não forem escolhidas, o envelhecimento as leva direto ao limite de 1, à frente
+    das que já estavam nele. Até esse evento elas ficam em recentes; depois, as que perderam o
+    evento de época e (e a escolhida que o perdeu com prioridade de até 1) entram no nível de chave
+    -e, menor que a de todos os níveis existentes.'''
+    def __init__(self, fator_envelhecimento:int=1, verboso:bool=True) -> None:
+        '''Inicializa uma fila vazia com o fator de envelhecimento informado.'''
+        super().__init__(verboso)
+        self.fator:int = fator_envelhecimento
+        self.epoca:int = 0
+        self.niveis:dict[int, deque[Tarefa]] = {}
+        self.chaves:list[int] = []  # heap com as chaves dos níveis (pode conter chaves já vazias)
+        self.escolhida:Tarefa|None = None
+        self.recentes:deque[Tarefa] = deque()  # chegadas com prioridade menor que 1, antes do evento
+        self.piores:list[tuple] = []  # heap das tarefas em execução, com vários núcleos
+        self.posicoes:dict[int, int] = {}  # núcleo -> ordem em que foi ocupado
+        self.colocadas:list[tuple[int, Tarefa]] = []  # colocadas nos núcleos desde o último evento
+        self._ocupacoes = itertools.count()
+        self._insercoes = itertools.count()
+
+    def _nivel(self, chave:int) -> deque[Tarefa]:
+        '''Retorna o nível com a chave informada, criando-o se necessário.'''
+        nivel = self.niveis.get(chave)
+        if nivel is None:
+            nivel = self.niveis[chave] = deque()
+            heapq.heappush(self.chaves, chave)
+        return nivel
+
+    def _menor_chave(self) -> int|None:
+        '''Retorna a menor chave com tarefas, descartando do heap as chaves de níveis esvaziados.'''
+        while self.chaves and self.chaves[0] not in self.niveis:
+            heapq.heappop(self.chaves)
+        return self.chaves[0] if self.chaves else None
+
+    def enfilera(self, tarefa:Tarefa):
+        '''Adiciona uma Tarefa ao final do nível correspondente à sua prioridade na época atual, ou
+        às recentes se a prioridade for menor que 1.'''
+        if tarefa.priod_original < 1:
+            self.recentes.append(tarefa)
+        else:
+            self._nivel(tarefa.priod_original + self.fator * self.epoca).append(tarefa)
+
+    def enfilera_lote(self, tarefas:list[Tarefa]):
+        '''Adiciona várias tarefas, na ordem da lista.'''
+        for tarefa in tarefas:
+            self.enfilera(tarefa)
+
+    def desenfilera(self):
+        '''Retira e retorna a tarefa do início da fila.'''
+        if self.escolhida is not None:
+            tarefa, self.escolhida = self.escolhida, None
+            return tarefa
+        if self._menor_chave() is None:
+            return self.recentes.popleft()
+        return self._retira_primeira()
+
+    def _retira_primeira(self) -> Tarefa:
+        '''Retira e retorna a primeira tarefa do nível de menor chave.'''
+        chave = self._menor_chave()
+        nivel = self.niveis[chave] # type: ignore
+        tarefa = nivel.popleft()
+        if not nivel:
+            del self.niveis[chave] # type: ignore
+        return tarefa
+
+    def proxima(self) -> Tarefa:
+        '''Retorna a tarefa do início da fila: a escolhida no último evento ou, se ela já terminou,
+        a primeira do nível de menor chave. As recentes ficam no fim, já que só passam à frente no
+        próximo evento.'''
+        if self.escolhida is not None:
+            return self.escolhida
+        chave = self._menor_chave()
+        return self.niveis[chave][0] if chave is not None else self.recentes[0]
+
+    def _ordena_recentes(self):
+        '''Ordena as recentes pela prioridade, mantendo a ordem de chegada nos empates, no início
+        de um evento.'''
+        if len(self.recentes) > 1:
+            self.recentes = deque(sorted(self.recentes, key=lambda t: t.priod_original))
+
+    def _melhor_dinamica(self) -> int|None:
+        '''Retorna a prioridade dinâmica da melhor tarefa da fila (fora a escolhida) durante um
+        evento: a primeira das recentes ou a primeira do nível de menor chave.'''
+        if self.recentes:
+            return self.recentes[0].priod_original
+        chave = self._menor_chave()
+        return max(1, chave - self.fator * self.epoca) if chave is not None else None
+
+    def _escolhe_melhor(self) -> Tarefa:
+        '''Retira a melhor tarefa da fila durante um evento (ver _melhor_dinamica) e registra a sua
+        prioridade dinâmica no momento da escolha, usada para compará-la com a fila no próximo
+        evento.'''
+        if self.recentes:
+            return self.recentes.popleft()
+        chave = self._menor_chave()
+        tarefa = self._retira_primeira()
+        tarefa.priod_dinamica = max(1, chave - self.fator * self.epoca) # type: ignore
+        return tarefa
+
+    def _devolve(self, tarefa:Tarefa, perdedoras:list[Tarefa]):
+        '''Devolve à fila uma tarefa escolhida que perdeu um evento, no início das tarefas com a
+        mesma prioridade dinâmica. Com prioridade de até 1, ela vai para as perdedoras do evento,
+        que chegam juntas ao limite de 1 (ver _envelhece_perdedoras).'''
+        if tarefa.priod_dinamica <= 1:
+            perdedoras.append(tarefa)
+        else:
+            self._nivel(tarefa.priod_dinamica + self.fator * self.epoca).appendleft(tarefa)
+
+    def _envelhece_perdedoras(self, perdedoras:list[Tarefa]):
+        '''Ao fim de um evento, leva ao limite de 1 as escolhidas devolvidas com prioridade de até
+        1 e as recentes não escolhidas, à frente das demais tarefas no limite: ficam no nível de
+        chave -época, em ordem de prioridade (as devolvidas primeiro nos empates).'''
+        perdedoras.extend(self.recentes)
+        self.recentes.clear()
+        if perdedoras:
+            perdedoras.sort(key=lambda t: t.priod_dinamica)
+            self._nivel(-self.epoca).extend(perdedoras)
+
+    def aplica_evento(self):
+        '''Aplica as regras do PRIOd a um evento: escolhe a tarefa de maior prioridade dinâmica
+        (a escolhida anterior vence os empates, por estar no início da fila), envelhece as demais
+        avançando a época e faz a prioridade da escolhida retroceder à estática.'''
+        if self.recentes:
+            self._aplica_evento_recentes()
+            return
+        chave = self._menor_chave()
+        if chave is not None:
+            dinamica = max(1, chave - self.fator * self.epoca)
+            if self.escolhida is None or dinamica < self.escolhida.priod_original:
+                anterior = self.escolhida
+                self.escolhida = self._retira_primeira()
+                if anterior is not None:
+                    self._nivel(anterior.priod_original + self.fator * self.epoca).appendleft(anterior)
+        self.epoca += 1
+        if self.escolhida is not None:
+            self.escolhida.priod_dinamica = self.escolhida.priod_original
+
+    def _aplica_evento_recentes(self):
+        '''aplica_evento quando há recentes, que têm prioridade menor que 1 e por isso vencem as
+        tarefas dos níveis: a melhor delas só não é escolhida se a escolhida anterior for melhor.'''
+        self._ordena_recentes()
+        perdedoras:list[Tarefa] = []
+        if self.escolhida is None or self.recentes[0].priod_original < self.escolhida.priod_original:
+            if self.escolhida is not None:
+                self._devolve(self.escolhida, perdedoras)
+            self.escolhida = self.recentes.popleft()
+        self._envelhece_perdedoras(perdedoras)
+        self.epoca += 1
+        self.escolhida.priod_dinamica = self.escolhida.priod_original
+
+    def _empilha_em_execucao(self, nucleo:int, tarefa:Tarefa, nucleos:Nucleos):
+        '''Insere a tarefa em execução no núcleo no heap das piores, ordenado pela maior prioridade
+        dinâmica e, nos empates, pela ordem em que os núcleos foram ocupados, que é a ordem de
+        Nucleos.em_execucao. Entradas de tarefas que saíram do núcleo ou mudaram de prioridade
+        dinâmica ficam no heap até chegarem ao topo (ou até ele ser reconstruído).'''
+        if len(self.piores) > 2 * nucleos.num_nucleos:
+            self.piores = [(-t.priod_dinamica, self.posicoes[n], next(self._insercoes), n, t)
+                           for n, t in nucleos.em_execucao.items() if n != nucleo]
+            heapq.heapify(self.piores)
+        heapq.heappush(self.piores, (-tarefa.priod_dinamica, self.posicoes[nucleo],
+                                     next(self._insercoes), nucleo, tarefa))
+
+    def _coloca(self, nucleo:int, tarefa:Tarefa, nucleos:Nucleos):
+        '''Registra a tarefa colocada no núcleo, que terá a prioridade restaurada no próximo evento.'''
+        self.colocadas.append((nucleo, tarefa))
+        self._empilha_em_execucao(nucleo, tarefa, nucleos)
+
+    def _pior_em_execucao(self, nucleos:Nucleos) -> tuple[int, Tarefa]|None:
+        '''Retorna o núcleo e a tarefa em execução de maior prioridade dinâmica (a de núcleo ocupado
+        há mais tempo nos empates), descartando do heap as entradas que não valem mais.'''
+        piores = self.piores
+        while piores:
+            negativa, _, _, nucleo, tarefa = piores[0]
+            if nucleos.em_execucao.get(nucleo) is tarefa and tarefa.priod_dinamica == -negativa:
+                return nucleo, tarefa
+            heapq.heappop(piores)
+        return None
+
+    def despacha(self, nucleos:Nucleos):
+        '''Na simulação com vários núcleos, ocupa os núcleos livres com as tarefas de maior
+        prioridade dinâmica, sem envelhecer as demais. É o que acontece fora dos eventos, como no
+        ciclo seguinte à conclusão de uma tarefa, quando a primeira da fila passa a ser executada.'''
+        while nucleos.tem_livre() and self._melhor_dinamica() is not None:
+            tarefa = self._escolhe_melhor()
+            nucleo = nucleos.ocupa(tarefa)
+            self.posicoes[nucleo] = next(self._ocupacoes)
+            self._coloca(nucleo, tarefa, nucleos)
+
+    def aplica_evento_nucleos(self, nucleos:Nucleos):
+        '''Versão de aplica_evento para vários núcleos, em que as tarefas em execução fazem o papel
+        da escolhida: ocupa os núcleos livres e, enquanto a melhor tarefa da fila tiver prioridade
+        dinâmica maior que a de alguma tarefa em execução, ela toma o núcleo da pior, que volta à
+        fila como a escolhida que perde um evento. Por fim, envelhece as demais e faz as escolhidas
+        retrocederem à prioridade estática. A pior tarefa em execução sai de um heap, em O(log N)
+        para N núcleos, e só as tarefas colocadas nos núcleos desde o último evento têm a
+        prioridade restaurada, já que as demais a restauraram em um evento anterior.'''
+        perdedoras:list[Tarefa] = []
+        self._ordena_recentes()
+        self.despacha(nucleos)
+        while (dinamica := self._melhor_dinamica()) is not None:
+            em_execucao = self._pior_em_execucao(nucleos)
+            if em_execucao is None:
+                break
+            nucleo, pior = em_execucao
+            if dinamica >= pior.priod_dinamica:
+                break
+            heapq.heappop(self.piores)
+            tarefa = self._escolhe_melhor()
+            nucleos.troca(nucleo, tarefa)
+            self._coloca(nucleo, tarefa, nucleos)
+            self._devolve(pior, perdedoras)
+        if self.recentes or perdedoras:
+            self._envelhece_perdedoras(perdedoras)
+        self.epoca += 1
+        for nucleo, tarefa in self.colocadas:
+            if nucleos.em_execucao.get(nucleo) is tarefa and tarefa.priod_dinamica != tarefa.priod_original:
+                tarefa.priod_dinamica = tarefa.priod_original
+                self._empilha_em_execucao(nucleo, tarefa, nucleos)
+        self.colocadas.clear()
+
+    def ordena(self, criterio:Criterio):
+        '''A fila já é mantida em ordem de prioridade dinâmica, portanto não há o que ordenar.'''
+        if criterio != Criterio.priod_dinamica:
+            raise ValueError(f"Fila ordenada por priod_dinamica, não por {criterio.name}.")
+
+    def is_empty(self):
+        '''Retorna True Caso a fila esteja vazia e False caso contrário.'''
+        return not self.niveis and self.escolhida is None and not self.recentes
+
+def cria_fila_prontas(algoritmo:Algoritmo, verboso:bool=True, fator_envelhecimento:int=1) -> FilaProntas:
+    '''Retorna a estrutura de fila de prontas adequada ao algoritmo: um heap para os algoritmos que
+    escolhem a tarefa por um critério, um deque para os que seguem a ordem de chegada, níveis com
+    envelhecimento preguiçoso para o PRIOd e a lista simples para os demais.'''
+    if algoritmo in (Algoritmo.fcfs, Algoritmo.rr):
+        return FilaFifo(verboso)
+    if algoritmo == Algoritmo.sjf:
+        return FilaPrioridade(Criterio.duracao_total, preemptiva=False, verboso=verboso)
+    if algoritmo == Algoritmo.srtf:
+        return FilaPrioridade(Criterio.duracao_resto, preemptiva=True, verboso=verboso)
+    if algoritmo == Algoritmo.prioc:
+        return FilaPrioridade(Criterio.priod_original, preemptiva=False, verboso=verboso)
+    if algoritmo == Algoritmo.priop:
+        return FilaPrioridade(Criterio.priod_original, preemptiva=True, verboso=verboso)
+    if algoritmo == Algoritmo.priod:
+        return FilaDinamica(fator_envelhecimento, verboso)
+    return FilaProntas(verboso)
+
+class AgendaTarefas:
+    '''Estrutura que armazena as tarefas que ainda não chegaram ao seu tempo de ingresso, em ordem
+    de ingresso (tarefas com o mesmo ingresso mantêm a ordem do arquivo). A cada ciclo, apenas as
+    tarefas liberadas são percorridas, e o próximo ingresso é consultado sem percorrer as demais.'''
+    def __init__(self, tarefas:Iterable[Tarefa], ordenadas:bool=False) -> None:
+        '''Ordena as tarefas por ingresso e posiciona o cursor na primeira. Com ordenadas=True,
+        as tarefas são consumidas sob demanda, na ordem em que vêm, sem serem guardadas: é o modo
+        usado com a leitura em fluxo do arquivo de entrada (leitura.py), em que só as tarefas já
+        liberadas ficam em memória.'''
+        if not ordenadas:
+            tarefas = sorted(tarefas, key=lambda t: t.ingresso)
+        self._tarefas = iter(tarefas)
+        self._proxima:Tarefa|None = next(self._tarefas, None)
+
+    def libera(self, clock:int) -> list[Tarefa]:
+        '''Retira e retorna, na ordem, as tarefas cujo ingresso já foi alcançado pelo clock.'''
+        prontas = []
+        while self._proxima is not None and self._proxima.ingresso <= clock:
+            prontas.append(self._proxima)
+            self._proxima = next(self._tarefas, None)
+        return prontas
+
+    def proximo_ingresso(self) -> int|None:
+        '''Retorna o ciclo de ingresso da próxima tarefa, ou None caso não reste nenhuma.'''
+        return self._proxima.ingresso if self._proxima is not None else None
+
+    def is_empty(self):
+        '''Retorna True caso todas as tarefas já tenham sido liberadas e False caso contrário.'''
+        return self._proxima is None
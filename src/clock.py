@@ -1,32 +1,129 @@
+import sys
+import queue
 import socket_utils as socket
 import time
 
-def main():
+def main(periodo:float=0.0):
+    '''Processo Clock. Cada ciclo segue um protocolo de barreira: o ciclo é enviado ao Emissor, que
+    confirma junto com as tarefas que ficaram prontas; depois é enviado ao Escalonador, levando
+    essas tarefas, e ele confirma após executá-lo. Só então o clock avança, de forma que o
+    resultado não depende de tempos de espera. São sempre quatro mensagens por ciclo,
+    independentemente do número de tarefas que chegam nele. O período (em segundos) é o tempo
+    mínimo de cada ciclo, útil para demonstrações; com 0, o clock avança tão rápido quanto a
+    comunicação permite.
+
+    Se algum componente falhar (mensagem "abortar", erro ao tratar uma mensagem, destino que não
+    aceita conexões ou confirmação que não chega em socket.PRAZO_CONEXAO segundos), a simulação é
+    interrompida: os demais componentes são avisados e o Clock retorna o
+    código de saída 1. Retorna 0 quando a simulação termina normalmente.'''
     PORTA_CLOCK = 4000
     PORTA_EMISSOR = 4001
     PORTA_ESCALONADOR = 4002
 
     clock = 0
     rodando = True
+    falha:dict|None = None  # mensagem "abortar" que interrompeu a simulação
+
+    # Confirmações (acks) recebidas dos outros componentes, consumidas pelo laço principal
+    confirmacoes:queue.Queue[dict] = queue.Queue()
 
     def trata_mensagem(mensagem: dict, addr):
-        nonlocal rodando
+        nonlocal rodando, falha
         tipo = mensagem.get("tipo")
         if tipo == "fim_simulacao": # Escalonador manda essa mensagem quando termina
             print("[Clock] Recebeu sinal de fim da simulação. Encerrando...")
             rodando = False
+            confirmacoes.put(mensagem)
+        elif tipo == "abortar": # Emissor ou Escalonador falhou e não vai mais confirmar ciclos
+            falha = mensagem
+            rodando = False
+            confirmacoes.put(mensagem)
+        elif tipo == "ack": # Emissor ou Escalonador terminou de processar o ciclo
+            confirmacoes.put(mensagem)
+
+    def trata_erro(erro: Exception):
+        '''Interrompe a simulação após um erro ao tratar uma mensagem recebida pelo Clock.'''
+        nonlocal rodando, falha
+        falha = {"tipo": "abortar", "origem": "clock", "erro": str(erro)}
+        rodando = False
+        confirmacoes.put(falha)
+
+    def espera_confirmacao(origem:str, ciclo:int) -> dict|None:
+        '''Bloqueia até que o componente de origem confirme o ciclo informado. Retorna a
+        confirmação, ou None caso a simulação tenha terminado ou sido interrompida. Um componente
+        que não responde dentro do prazo é tratado como falha.'''
+        nonlocal falha
+        while True:
+            try:
+                mensagem = confirmacoes.get(timeout=socket.PRAZO_CONEXAO)
+            except queue.Empty:
+                falha = {"tipo": "abortar", "origem": origem,
+                         "erro": f"o ciclo {ciclo} não foi confirmado em {socket.PRAZO_CONEXAO:g} s"}
+                return None
+            if mensagem.get("tipo") in ("fim_simulacao", "abortar"):
+                return None
+            if mensagem.get("origem") == origem and mensagem.get("ciclo") == ciclo:
+                return mensagem
 
     # Inicia o servidor para ouvir mensagens na porta do Clock
-    socket.start_server(PORTA_CLOCK, trata_mensagem)
+    socket.start_server(PORTA_CLOCK, trata_mensagem, trata_erro)
+
+    try:
+        while rodando:
+            inicio_ciclo = time.monotonic()
+            print(f"[Clock] Iniciando ciclo de clock: {clock}")
 
-    while rodando:
-        print(f"[Clock] Iniciando ciclo de clock: {clock}")
-        socket.send_message(PORTA_EMISSOR, {"tipo": "ciclo", "valor": clock})
-        time.sleep(0.005)
-        socket.send_message(PORTA_ESCALONADOR, {"tipo": "ciclo", "valor": clock})
-        time.sleep(0.095)  # totaliza 100ms
-        clock += 1
+            # 1. Emissor confirma o ciclo com o lote de tarefas que ficaram prontas nele
+            socket.send_message(PORTA_EMISSOR, {"tipo": "ciclo", "valor": clock})
+            ack_emissor = espera_confirmacao("emissor", clock)
+            if ack_emissor is None:
+                break
+
+            # 2. Escalonador recebe o ciclo junto com essas tarefas, enfileira-as e executa o ciclo
+            socket.send_message(PORTA_ESCALONADOR, {
+                "tipo": "ciclo",
+                "valor": clock,
+                "tarefas": ack_emissor["tarefas"],
+                "emissao_finalizada": ack_emissor["emissao_finalizada"],
+            })
+            ack_escalonador = espera_confirmacao("escalonador", clock)
+            if ack_escalonador is None:
+                break
+
+            # Respeita o período mínimo do ciclo, se houver
+            restante = periodo - (time.monotonic() - inicio_ciclo)
+            if restante > 0:
+                time.sleep(restante)
+
+            # Se o Escalonador ficou ocioso neste ciclo e a próxima tarefa só chega mais adiante,
+            # avança direto para o ciclo dela. Os ciclos pulados são registrados pelo Escalonador.
+            proximo_ingresso = ack_emissor["proximo_ingresso"]
+            if ack_escalonador["ocioso"] and proximo_ingresso is not None and proximo_ingresso > clock + 1:
+                print(f"[Clock] Nenhuma tarefa pronta até o ciclo {proximo_ingresso}. "
+                      f"Pulando {proximo_ingresso - clock - 1} ciclos ociosos.")
+                clock = proximo_ingresso
+            else:
+                clock += 1
+    except ConnectionError as erro:
+        falha = {"tipo": "abortar", "origem": "clock", "erro": str(erro)}
+
+    if falha is None:
+        return 0
+
+    # Avisa os componentes que não causaram a falha, para que também terminem com erro
+    print(f"[Clock] Simulação interrompida por falha no {falha['origem']}: {falha.get('erro')}")
+    for componente, porta in (("emissor", PORTA_EMISSOR), ("escalonador", PORTA_ESCALONADOR)):
+        if componente != falha["origem"]:
+            socket.try_send_message(porta, {"tipo": "abortar", "origem": falha["origem"]})
+    return 1
 
 if __name__ == "__main__":
-    
-    main()
\ No newline at end of file
+    # Período mínimo opcional de cada ciclo, em milissegundos
+    periodo_ms = 0.0
+    if len(sys.argv) > 1:
+        try:
+            periodo_ms = float(sys.argv[1])
+        except ValueError:
+            sys.exit("Erro: Período do clock inválido.")
+
+    sys.exit(main(periodo_ms / 1000))
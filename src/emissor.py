@@ -1,92 +1,115 @@
 import sys
 import os
 import classes as c
+import leitura
 import socket_utils as socket
 import time
 
-def main(entrada):
+def carregar_tarefas(entrada: str) -> list[c.Tarefa]:
+    '''Abre o arquivo de entrada para leitura, organiza as tarefas em classes e as adicona em uma pré-lista'''
+    return list(leitura.le_tarefas(entrada))
 
+def main(entrada, streaming=False):
+
+    PORTA_CLOCK = 4000
     PORTA_EMISSOR = 4001
     PORTA_ESCALONADOR = 4002
 
-    # Tarefas que foram lidas do arquivo mas ainda não foram enviadas ao escalonador
-    # É declarada globalmente para ser acessível pela função de callback do socket.
-    tarefas_agendadas = []
+    # Tarefas que foram lidas do arquivo mas ainda não foram enviadas ao escalonador, em ordem de
+    # ingresso. É declarada aqui para ser acessível pela função de callback do socket.
+    tarefas_agendadas = c.AgendaTarefas([])
 
     # Indica se todas as tarefas foram emitidas
     emissao_finalizada = False
 
-    def carregar_tarefas(entrada: str) -> list[c.Tarefa]:
-        '''Abre o arquivo de entrada para leitura, organiza as tarefas em classes e as adicona em uma pré-lista'''
-        tarefas = []
-
-        with open(entrada, 'r') as arquivo:
-            for linha in arquivo:
-                linha = linha.strip()
-                partes = linha.split(";")
-
-                tarefa = c.Tarefa(
-                    id=partes[0],
-                    ingresso=int(partes[1]),
-                    duracao=int(partes[2]),
-                    prioridade=int(partes[3])
-                )
-                tarefas.append(tarefa)
-
-        return tarefas
+    # Código de saída do processo, definido quando a simulação termina (0) ou é interrompida (1)
+    status_saida:int|None = None
 
     def trata_mensagem(mensagem: dict, addr):
         '''
         Função de callback que será executada toda vez que o Emissor receber uma mensagem via socket.
         É o coração da lógica do Emissor.
         '''
-        nonlocal tarefas_agendadas, emissao_finalizada
+        nonlocal tarefas_agendadas, emissao_finalizada, status_saida
 
-        # O Emissor espera dois tipos de mensagem: um ciclo do clock ou o fim da simulação
+        # O Emissor espera três tipos de mensagem: um ciclo do clock, o fim da simulação ou a
+        # interrupção da simulação por falha em outro componente
         tipo_msg = mensagem.get("tipo")
 
         # Caso a mensagem recebida seja de ciclo de clock:
         if tipo_msg == "ciclo":
             clock_atual = mensagem.get("valor")
 
-            # Cria uma lista de tarefas que estão prontas para serem enviadas neste ciclo
-            tarefas_prontas = []
-            for tarefa in tarefas_agendadas:
-                if tarefa.ingresso == clock_atual:
-                    tarefas_prontas.append(tarefa)
-
-            for tarefa in tarefas_prontas:
-                # Converte o objeto Tarefa para um dicionário para ser enviado
-                msg_tarefa = c.Tarefa.to_dict(tarefa)
-                print(f"[Emissor] Tarefa {tarefa.id} pronta. Enviando para o Escalonador.")
-                socket.send_message(PORTA_ESCALONADOR, msg_tarefa)
-                # Remove a tarefa da lista de agendadas após o envio
-                tarefas_agendadas.remove(tarefa)
+            # Retira da agenda as tarefas que estão prontas para serem enviadas neste ciclo. Elas
+            # seguem todas juntas, em um só lote, na confirmação do ciclo ao Clock, que as repassa
+            # ao Escalonador com o ciclo.
+            tarefas_prontas = tarefas_agendadas.libera(clock_atual)
+            if len(tarefas_prontas) == 1:
+                print(f"[Emissor] Tarefa {tarefas_prontas[0].id} pronta. Enviando para o Escalonador.")
+            elif tarefas_prontas:
+                print(f"[Emissor] {len(tarefas_prontas)} tarefas prontas. Enviando para o Escalonador.")
 
             # Após verificar todas as tarefas, checa se a lista de agendadas está vazia
-            # e se a notificação de fim de emissão ainda não foi enviada. 
-            if not tarefas_agendadas and not emissao_finalizada:
+            # e se o fim de emissão ainda não foi anunciado.
+            if tarefas_agendadas.is_empty() and not emissao_finalizada:
                 print("[Emissor] Todas as tarefas foram emitidas. Notificando o Escalonador.")
-                socket.send_message(PORTA_ESCALONADOR, {"tipo": "fim_emissao"})
                 emissao_finalizada = True
 
+            # Confirma o ciclo ao Clock com o lote de tarefas prontas e se a emissão acabou. O
+            # próximo ingresso permite ao Clock pular os ciclos em que o Escalonador ficaria ocioso.
+            proximo_ingresso = tarefas_agendadas.proximo_ingresso()
+            socket.send_message(PORTA_CLOCK, {
+                "tipo": "ack",
+                "origem": "emissor",
+                "ciclo": clock_atual,
+                "tarefas": [c.Tarefa.to_dict(tarefa) for tarefa in tarefas_prontas],
+                "emissao_finalizada": emissao_finalizada,
+                "proximo_ingresso": proximo_ingresso,
+            })
+
         # Caso a mensagem recebida seja de fim da simulação:
         elif tipo_msg == "fim_simulacao":
             # Mensagem recebida do Escalonador para encerrar o processo 
             print("[Emissor] Recebeu sinal de fim da simulação. Encerrando...")
-            sys.exit(0)
-
-    tarefas_agendadas = carregar_tarefas(entrada)
-    print(f"[Emissor] {len(tarefas_agendadas)} tarefas carregadas do arquivo '{entrada}'.")
+            status_saida = 0
+
+        # Caso a simulação tenha sido interrompida por falha no Escalonador ou no Clock:
+        elif tipo_msg == "abortar":
+            print(f"[Emissor] Simulação interrompida por falha no {mensagem.get('origem')}. "
+                  "Encerrando...")
+            status_saida = 1
+
+    def trata_erro(erro: Exception):
+        '''Interrompe a simulação após um erro ao tratar uma mensagem, avisando o Clock, que não
+        receberia a confirmação do ciclo. O aviso é enviado antes de definir o código de saída, que
+        encerraria o processo antes do envio.'''
+        nonlocal status_saida
+        socket.try_send_message(PORTA_CLOCK, {"tipo": "abortar", "origem": "emissor",
+                                              "erro": str(erro)})
+        status_saida = 1
+
+    if streaming:
+        # As tarefas são lidas do arquivo à medida que seus ciclos de ingresso se aproximam
+        tarefas_agendadas = c.AgendaTarefas(leitura.le_tarefas_em_ordem(entrada), ordenadas=True)
+        print(f"[Emissor] Lendo tarefas do arquivo '{entrada}' sob demanda.")
+    else:
+        try:
+            tarefas = carregar_tarefas(entrada)
+        except ValueError as erro:  # arquivo de entrada inválido
+            print(f"[Emissor] Erro: {erro}")
+            return 1
+        print(f"[Emissor] {len(tarefas)} tarefas carregadas do arquivo '{entrada}'.")
+        tarefas_agendadas = c.AgendaTarefas(tarefas)
 
     # Inicia o servidor socket em uma thread separada para ouvir mensagens na sua porta.
-    # A função `handle_message` será chamada para cada mensagem recebida.
-    socket.start_server(PORTA_EMISSOR, trata_mensagem)
+    # A função `trata_mensagem` será chamada para cada mensagem recebida.
+    socket.start_server(PORTA_EMISSOR, trata_mensagem, trata_erro)
 
-    # Mantém o processo principal vivo para que a thread do servidor possa continuar rodando.
-    # O processo terminará quando `sys.exit(0)` for chamado em `handle_message`.
-    while True:
-        time.sleep(1)
+    # Mantém o processo principal vivo para que a thread do servidor possa continuar rodando,
+    # até que a simulação termine ou seja interrompida. Retorna o código de saída do processo.
+    while status_saida is None:
+        time.sleep(0.1)
+    return status_saida
 
 if __name__ == "__main__":
     if len(sys.argv) < 2:
@@ -96,4 +119,4 @@ if __name__ == "__main__":
     if not os.path.isfile(entrada):
         sys.exit(f"Erro: O arquivo '{entrada}' não existe ou não é um arquivo válido.")
 
-    main(entrada)
+    sys.exit(main(entrada, streaming="--streaming" in sys.argv[2:]))
@@ -1,236 +1,428 @@
 import sys
 import time
 import classes as c
+import rastro
 import socket_utils as socket
 
-def main(algoritmo:c.Algoritmo):
-    '''Implementa o resto'''
-    
-    PORTA_CLOCK = 4000
-    PORTA_EMISSOR = 4001
-    PORTA_ESCALONADOR = 4002
+# Valores padrão dos parâmetros dos algoritmos
+QUANTUM_PADRAO = 3              # Round-Robin: ciclos de CPU por vez antes da preempção
+FATOR_ENVELHECIMENTO_PADRAO = 1  # PRIOd: melhora de prioridade das tarefas preteridas em cada evento
+NUCLEOS_PADRAO = 1              # núcleos da CPU simulada
 
-    # INICIALIZAÇÃO -------------------------------------------------------------------------------
+class Escalonador:
+    '''Lógica do Escalonador independente do meio de comunicação. Recebe as tarefas prontas e, a
+    cada ciclo de clock, aplica o algoritmo de priorização escolhido sobre a fila de tarefas
+    prontas. É usada tanto pelo processo escalonador (via sockets) quanto pela simulação direta em
+    um único processo (simulador.py).'''
 
-    # Estruturas de controle
-    fila_prontas = c.FilaProntas()
-    info_saida = c.InfoSaida()
-    
-    # Estados de controle
-    emissao_finalizada = False
-    simulacao_ativa = True
-    tarefa_finalizada_ultimo_clock = False  # Para Round-Robin
-    quantum_atual = 3        # Para Round-Robin
-    houve_evento_priod = False
+    def __init__(self, algoritmo:c.Algoritmo, verboso:bool=True, limite_concluidas:int|None=None,
+                 quantum:int=QUANTUM_PADRAO, fator_envelhecimento:int=FATOR_ENVELHECIMENTO_PADRAO,
+                 num_nucleos:int=NUCLEOS_PADRAO) -> None:
+        '''Inicializa as estruturas e os estados de controle da simulação. Com limite_concluidas,
+        as tarefas concluídas além desse número são guardadas em disco (ver InfoSaida). O quantum é
+        usado pelo Round-Robin e o fator de envelhecimento pelo PRIOd. Com num_nucleos maior que 1,
+        até esse número de tarefas é executado a cada ciclo (ver executa_ciclo_nucleos).'''
+        quantum, fator_envelhecimento, num_nucleos = parametros_validos(quantum, fator_envelhecimento,
+                                                                        num_nucleos)
+        self.algoritmo:c.Algoritmo = algoritmo
+        self.verboso:bool = verboso
+        self.quantum:int = quantum
+
+        # Estruturas de controle
+        self.fila_prontas = c.cria_fila_prontas(algoritmo, verboso, fator_envelhecimento)
+        self.info_saida = c.InfoSaida(limite_concluidas, num_nucleos)
+        self.nucleos = c.Nucleos(num_nucleos) if num_nucleos > 1 else None
+
+        # Estados de controle
+        self.emissao_finalizada = False
+        self.tarefa_finalizada_ultimo_clock = False  # Para Round-Robin
+        self.quantum_atual = quantum  # Para Round-Robin
+        self.houve_evento_priod = False
+        self.proximo_clock = 0  # Ciclo esperado na próxima chamada de executa_ciclo
+
+        # Mapeamento dos algoritmos para seus métodos
+        self.algoritmos = {
+            c.Algoritmo.fcfs: self.executa_fcfs,
+            c.Algoritmo.rr: self.executa_rr,
+            c.Algoritmo.sjf: self.executa_sjf,
+            c.Algoritmo.srtf: self.executa_srtf,
+            c.Algoritmo.prioc: self.executa_prioc,
+            c.Algoritmo.priop: self.executa_priop,
+            c.Algoritmo.priod: self.executa_priod
+        }
+
+    # EVENTOS DA SIMULAÇÃO ------------------------------------------------------------------------
+
+    def recebe_tarefas(self, tarefas:list[c.Tarefa]):
+        '''Adiciona de uma só vez, na ordem informada, as tarefas que ficaram prontas no mesmo
+        ciclo.'''
+        if not tarefas:
+            return
+        if self.verboso:
+            if len(tarefas) == 1:
+                print(f"[Escalonador] Nova tarefa recebida: {tarefas[0].id}")
+            else:
+                print(f"[Escalonador] {len(tarefas)} novas tarefas recebidas.")
+        self.fila_prontas.enfilera_lote(tarefas)
+        self.houve_evento_priod = True
+
+    def finaliza_emissao(self):
+        '''Registra que o Emissor não tem mais tarefas a enviar.'''
+        if self.verboso:
+            print("[Escalonador] Todas as tarefas foram emitidas pelo Emissor.")
+        self.emissao_finalizada = True
+
+    def executa_ciclo(self, clock:int) -> bool:
+        '''Executa o algoritmo de escalonamento ativo para o ciclo de clock informado. Retorna True
+        caso todas as tarefas tenham sido emitidas e concluídas, ou seja, se a simulação acabou.'''
+        if self.nucleos is not None:
+            return self.executa_ciclo_nucleos(clock)
+
+        # Ciclos pulados pelo Clock por não haver tarefas prontas são registrados como ociosos
+        if clock > self.proximo_clock:
+            self.info_saida.add_ciclos_ociosos(clock - self.proximo_clock)
+        self.proximo_clock = clock + 1
+
+        self.algoritmos[self.algoritmo](clock)
+
+        # Reset das flags após processar o ciclo
+        self.houve_evento_priod = False
+
+        return self.emissao_finalizada and self.fila_prontas.is_empty()
+
+    def esta_ocioso(self) -> bool:
+        '''Retorna True caso não haja nenhuma tarefa pronta, ou seja, caso os próximos ciclos só
+        registrem ociosidade até que uma nova tarefa chegue.'''
+        return self.fila_prontas.is_empty() and (self.nucleos is None or self.nucleos.is_empty())
+
+    def executa_ciclo_nucleos(self, clock:int) -> bool:
+        '''Versão de executa_ciclo para vários núcleos. As tarefas em execução ficam nos núcleos,
+        fora da fila de prontas, e a fila despacha tarefas para os núcleos livres segundo o
+        algoritmo (ver os métodos despacha das filas): FCFS, RR, SJF e PRIOc só ocupam núcleos
+        livres; SRTF e PRIOp também trocam as tarefas em execução por outras de menor chave; e o
+        PRIOd faz as trocas e o envelhecimento nos eventos de chegada, como executa_priod. No RR,
+        cada núcleo tem o seu quantum, e a tarefa que o esgota volta ao fim da fila se houver
+        tarefas esperando. Os ciclos ociosos de cada núcleo são registrados quando ele volta a ser
+        ocupado ou ao fim da simulação, e não a cada ciclo.'''
+        nucleos:c.Nucleos = self.nucleos # type: ignore
+        fila_prontas = self.fila_prontas
+        self.proximo_clock = clock + 1
+
+        if self.algoritmo == c.Algoritmo.priod and self.houve_evento_priod:
+            fila_prontas.aplica_evento_nucleos(nucleos) # type: ignore
+        else:
+            fila_prontas.despacha(nucleos)
+        nucleos.executa(clock, self.info_saida, self.verboso)
+        self.houve_evento_priod = False
+
+        if self.algoritmo == c.Algoritmo.rr:
+            esgotados = [nucleo for nucleo, executados in nucleos.executados.items()
+                         if executados >= self.quantum]
+            for nucleo in esgotados:
+                if fila_prontas.is_empty():
+                    nucleos.executados[nucleo] = 0
+                else:
+                    tarefa = nucleos.libera(nucleo)
+                    fila_prontas.enfilera(tarefa)
+                    if self.verboso:
+                        print(f"[Escalonador] Tarefa {tarefa.id} preempetada.")
+
+        if self.emissao_finalizada and fila_prontas.is_empty() and nucleos.is_empty():
+            self.info_saida.completa_nucleos(clock + 1)
+            return True
+        return False
 
     # IMPLEMENTAÇÃO DOS ALGORITMOS DE ESCALONAMENTO -----------------------------------------------
 
-    def executa_fcfs(clock: int):
+    def executa_fcfs(self, clock: int):
         '''Escalona uma tarefa presente em self.fila segundo o algoritmo de priorização First-Come,
         First-Served (FCFS). Nesse algoritmo, as tarefas são atendidas na sequência que elas chegam
         no estado de “pronta”.'''
-        fila_prontas.escalona(clock, info_saida)
+        self.fila_prontas.escalona(clock, self.info_saida)
 
-    def executa_rr(clock: int):
+    def executa_rr(self, clock: int):
         '''Escalona uma tarefa presente em self.fila segundo o algoritmo de priorização Round-Robin
-        (RR) com quantum fixo de 3 unidades de clock. Nesse algoritmo, as tarefas são atendidas na
-        sequência que elas chegam no estado de “pronta”, mas a cada vez que um quantum termina, a
-        tarefa volta para a fila de tarefas prontas.'''
-        nonlocal quantum_atual, tarefa_finalizada_ultimo_clock
-        QUANTUM = 3
-        
+        (RR) com quantum fixo de self.quantum unidades de clock (3 por padrão). Nesse algoritmo, as
+        tarefas são atendidas na sequência que elas chegam no estado de “pronta”, mas a cada vez que
+        um quantum termina, a tarefa volta para a fila de tarefas prontas.'''
+        fila_prontas = self.fila_prontas
+
         # Se não há tarefas na fila, escalona() vai registrar ciclo vazio
         if fila_prontas.is_empty():
-            fila_prontas.escalona(clock, info_saida)
+            fila_prontas.escalona(clock, self.info_saida)
             return None
-        
+
         # Se uma tarefa foi finalizada no último clock ou é o primeiro ciclo, reseta quantum
-        if tarefa_finalizada_ultimo_clock or quantum_atual == 0:
-            quantum_atual = QUANTUM
-            tarefa_finalizada_ultimo_clock = False
-        
+        if self.tarefa_finalizada_ultimo_clock or self.quantum_atual == 0:
+            self.quantum_atual = self.quantum
+            self.tarefa_finalizada_ultimo_clock = False
+
         # Executa a tarefa usando escalona()
-        resultado = fila_prontas.escalona(clock, info_saida)
-        quantum_atual -= 1
-        
+        resultado = fila_prontas.escalona(clock, self.info_saida)
+        self.quantum_atual -= 1
+
         # Verifica se a tarefa foi finalizada
         if resultado is not None:
             tarefa_id, finalizada = resultado
             if finalizada:
-                tarefa_finalizada_ultimo_clock = True
-                quantum_atual = 0  # Reset para próxima tarefa
+                self.tarefa_finalizada_ultimo_clock = True
+                self.quantum_atual = 0  # Reset para próxima tarefa
                 return None
-        
+
         # Se quantum esgotou e ainda há tarefa executando, faz preempção
-        if quantum_atual == 0 and not fila_prontas.is_empty():
+        if self.quantum_atual == 0 and not fila_prontas.is_empty():
             # Move a tarefa atual para o final da fila
-            tarefa_preemptada = fila_prontas.desenfilera()
-            fila_prontas.enfilera(tarefa_preemptada)
-            print(f"[Escalonador] Tarefa {tarefa_id} preempetada.")
+            fila_prontas.rotaciona()
+            if self.verboso:
+                print(f"[Escalonador] Tarefa {tarefa_id} preempetada.")
 
-    def executa_sjf(clock: int):
+    def executa_sjf(self, clock: int):
         '''Escalona uma tarefa presente em self.fila segundo o algoritmo de priorização Shortest Job
         First (SJF). Nesse algoritmo, as tarefas são atendidas em ordem crescente de duração
-        estimada.'''
-        if not fila_prontas.is_empty():
-            tarefa_candidata = fila_prontas.fila[0]
-            if tarefa_candidata.duracao_total == tarefa_candidata.duracao_resto:
-                fila_prontas.ordena(c.Criterio.duracao_total)
-        fila_prontas.escalona(clock, info_saida)
+        estimada. A fila de prontas é um heap cooperativo por duração total: a tarefa de menor
+        duração só é escolhida quando a que está em execução termina.'''
+        self.fila_prontas.escalona(clock, self.info_saida)
 
-
-    def executa_srtf(clock: int):
+    def executa_srtf(self, clock: int):
         '''Escalona uma tarefa presente em self.fila segundo o algoritmo de priorização Shortest
         Remaining Time First (SRTF). Nesse algoritmo, as tarefas são atendidas em ordem crescente
         de duração estimada restante, ou seja, a cada ciclo de clock é feita uma nova comparação
-        para definir a tarefa, que tem uma unidade de tempo restante decrementada logo em seguida.'''
-        fila_prontas.ordena(c.Criterio.duracao_resto)
-        fila_prontas.escalona(clock, info_saida)
-
+        para definir a tarefa, que tem uma unidade de tempo restante decrementada logo em seguida.
+        A fila de prontas é um heap preemptivo por duração restante, cujo topo é sempre a tarefa
+        escolhida.'''
+        self.fila_prontas.escalona(clock, self.info_saida)
 
-    def executa_prioc(clock: int):
+    def executa_prioc(self, clock: int):
         '''Escalona uma tarefa presente em self.fila segundo o algoritmo de priorização por
         prioridades fixas cooperativo (PRIOc). Nesse algoritmo, as tarefas são atendidas em ordem
         crescente de prioridade estática, sem alteração das prioridades ou interrupção de tarefas
-        já em processamento.'''
-        if not fila_prontas.is_empty():
-            tarefa_candidata = fila_prontas.fila[0]
-            if tarefa_candidata.duracao_resto == tarefa_candidata.duracao_total:
-                fila_prontas.ordena(c.Criterio.priod_original)
-        fila_prontas.escalona(clock, info_saida)
-
-    def executa_priop(clock: int):
+        já em processamento. A fila de prontas é um heap cooperativo por prioridade original.'''
+        self.fila_prontas.escalona(clock, self.info_saida)
+
+    def executa_priop(self, clock: int):
         '''Escalona uma tarefa presente em self.fila segundo o algoritmo de priorização por
         prioridades fixas preemptivo(PRIOp). Nesse algoritmo, as tarefas são atendidas em ordem
         crescente de prioridade estática, com as prioridades não sendo alteradas nunca, porém, a
         cada ciclo de clock, uma nova tarefa que surge com maior prioridade toma o lugar da
-        anterior.'''
-        fila_prontas.ordena(c.Criterio.priod_original)
-        fila_prontas.escalona(clock, info_saida)
+        anterior. A fila de prontas é um heap preemptivo por prioridade original.'''
+        self.fila_prontas.escalona(clock, self.info_saida)
 
-    def executa_priod(clock: int):
+    def executa_priod(self, clock: int):
         '''Escalona uma tarefa presente em self.fila segundo o algoritmo de priorização por
         prioridades dinâmicas (PRIOd). Nesse algoritmo, a cada evento de adição de nova tarefa à
         fila ou encerramento de tarefa, a tarefa com maior prioridade é escolhida. Porém, nesses
         eventos, as tarefas que não foram escalonadas tem sua prioridade aumentada segundo um fator
-        de escalonamento a. Além disso, a prioridade dinâmica da tarefa escalonada retrocede à
-        prioridade estática. Retorna a tarefa executada neste ciclo de clock'''
-        nonlocal houve_evento_priod
-        
-        FATOR_ENVELHECIMENTO = 1
-        
+        de envelhecimento a (1 por padrão). Além disso, a prioridade dinâmica da tarefa escalonada
+        retrocede à prioridade estática. Retorna a tarefa executada neste ciclo de clock'''
+        fila_prontas = self.fila_prontas
+
         # Se não há tarefas na fila, escalona() vai registrar ciclo vazio
         if fila_prontas.is_empty():
-            fila_prontas.escalona(clock, info_saida)
+            fila_prontas.escalona(clock, self.info_saida)
             return
-        
-        # Se houve evento (nova tarefa ou tarefa finalizada), aplica regras PRIOd
-        if houve_evento_priod:
-            
-            # 1. Escolhe a tarefa com maior prioridade dinâmica (menor valor numérico)
-            fila_prontas.ordena(c.Criterio.priod_dinamica)
-            tarefa_escolhida = fila_prontas.fila[0]
-            
-            # 2. Tarefas NÃO escalonadas têm prioridade melhorada (aging)
-            for tarefa in fila_prontas.fila:
-                if tarefa != tarefa_escolhida:
-                    # Melhora prioridade (diminui valor) respeitando limite mínimo de 1
-                    tarefa.priod_dinamica = max(1, tarefa.priod_dinamica - FATOR_ENVELHECIMENTO)
-            
-            # 3. Tarefa escalonada retrocede à prioridade estática
-            tarefa_escolhida.priod_dinamica = tarefa_escolhida.priod_original
-        
+
+        # Se houve evento (nova tarefa ou tarefa finalizada), aplica regras PRIOd: escolhe a tarefa
+        # com maior prioridade dinâmica, melhora a prioridade das demais (aging) e faz a escolhida
+        # retroceder à prioridade estática. A FilaDinamica envelhece as tarefas de forma
+        # preguiçosa, sem percorrê-las.
+        if self.houve_evento_priod:
+            fila_prontas.aplica_evento() # type: ignore
+
         # Executa a tarefa com maior prioridade dinâmica
-        resultado = fila_prontas.escalona(clock, info_saida)
-        
+        resultado = fila_prontas.escalona(clock, self.info_saida)
+
         # Se uma tarefa foi finalizada, marca evento para próximo ciclo
         if resultado is not None:
             tarefa_id, finalizada = resultado
             if finalizada:
-                houve_evento_priod = True
-
-    # Mapeamento dos algoritmos para suas funções
-    algoritmos = {
-        c.Algoritmo.fcfs: executa_fcfs,
-        c.Algoritmo.rr: executa_rr,
-        c.Algoritmo.sjf: executa_sjf,
-        c.Algoritmo.srtf: executa_srtf,
-        c.Algoritmo.prioc: executa_prioc,
-        c.Algoritmo.priop: executa_priop,
-        c.Algoritmo.priod: executa_priod
-    }
+                self.houve_evento_priod = True
+
+def main(algoritmo:c.Algoritmo, saida:str="saida.txt", arquivo_rastro:str|None=None,
+         limite_concluidas:int|None=None, arquivo_metricas:str|None=None,
+         quantum:int=QUANTUM_PADRAO, fator_envelhecimento:int=FATOR_ENVELHECIMENTO_PADRAO,
+         num_nucleos:int=NUCLEOS_PADRAO):
+    '''Processo Escalonador: recebe tarefas do Emissor e ciclos do Clock via socket e os repassa
+    para a lógica de escalonamento. Ao final, grava o arquivo de saída e, se informados, o rastro
+    binário e o arquivo JSON de métricas. Um erro ao tratar uma mensagem interrompe a simulação,
+    avisando o Clock. Retorna o código de saída do processo: 0 se a simulação terminou e 1 se foi
+    interrompida.'''
+
+    PORTA_CLOCK = 4000
+    PORTA_EMISSOR = 4001
+    PORTA_ESCALONADOR = 4002
+
+    # INICIALIZAÇÃO -------------------------------------------------------------------------------
+
+    escalonador = Escalonador(algoritmo, limite_concluidas=limite_concluidas, quantum=quantum,
+                              fator_envelhecimento=fator_envelhecimento, num_nucleos=num_nucleos)
+    simulacao_ativa = True
+    status_saida = 0
+    fim_notificado = False  # Clock e Emissor já foram avisados do fim da simulação
 
     # TRATAMENTO DE MENSAGENS ---------------------------------------------------------------------
 
+    def processa_ciclo(mensagem: dict):
+        """Executa um ciclo do Clock e o confirma, ou finaliza a simulação se ela acabou"""
+        clock_atual:int = mensagem["valor"]
+
+        # As tarefas que ficaram prontas neste ciclo chegam junto com ele, em um único lote
+        escalonador.recebe_tarefas([c.Tarefa.from_dict(tarefa) for tarefa in mensagem.get("tarefas", ())])
+
+        if mensagem.get("emissao_finalizada") and not escalonador.emissao_finalizada:
+            escalonador.finaliza_emissao()
+
+        # Executa o algoritmo de escalonamento ativo e verifica se deve finalizar a simulação
+        if escalonador.executa_ciclo(clock_atual):
+            print("[Escalonador] Todas as tarefas foram concluídas. Finalizando simulação...")
+            finalizar_simulacao()
+            return
+
+        # Confirma o ciclo ao Clock, avisando se ficou sem tarefas prontas para que ele possa
+        # pular os ciclos ociosos
+        socket.send_message(PORTA_CLOCK, {
+            "tipo": "ack",
+            "origem": "escalonador",
+            "ciclo": clock_atual,
+            "ocioso": escalonador.esta_ocioso(),
+        })
+
     def trata_mensagem(mensagem: dict, addr):
         """Função callback para tratar mensagens recebidas via socket"""
-        nonlocal emissao_finalizada, houve_evento_priod
-        
         tipo_msg = mensagem.get("tipo")
-        
+
         if tipo_msg == "ciclo":
             # Mensagem do Clock
-            clock_atual:int = mensagem.get("valor") # type: ignore
-            
-            # Executa o algoritmo de escalonamento ativo
-            funcao_algoritmo = algoritmos[algoritmo]
-            funcao_algoritmo(clock_atual)
-            
-            # Reset das flags após processar o ciclo
-            houve_evento_priod = False
-            
-            # Verifica se deve finalizar a simulação
-            if emissao_finalizada and fila_prontas.is_empty():
-                print("[Escalonador] Todas as tarefas foram concluídas. Finalizando simulação...")
-                finalizar_simulacao()
-                
-        elif tipo_msg == "tarefa":
-            # Mensagem do Emissor com nova tarefa
-            nova_tarefa = c.Tarefa.from_dict(mensagem)
-            print(f"[Escalonador] Nova tarefa recebida: {nova_tarefa.id}")
-            fila_prontas.enfilera(nova_tarefa)
-            houve_evento_priod = True
-            
-        elif tipo_msg == "fim_emissao":
-            # Mensagem do Emissor indicando que todas as tarefas foram emitidas
-            print("[Escalonador] Todas as tarefas foram emitidas pelo Emissor.")
-            emissao_finalizada = True
-    
+            processa_ciclo(mensagem)
+
+        elif tipo_msg == "abortar":
+            # Mensagem do Clock indicando que a simulação foi interrompida por falha no Emissor
+            print(f"[Escalonador] Simulação interrompida por falha no {mensagem.get('origem')}. "
+                  "Encerrando...")
+            encerra(1)
+
     def finalizar_simulacao():
-        """Finaliza a simulação, gera arquivo de saída e notifica outros componentes"""
-        nonlocal simulacao_ativa
-        
-        print("[Escalonador] Gerando arquivo de saída...")
-        info_saida.gera_saida()
-        print("[Escalonador] Arquivo 'saida.txt' gerado com sucesso.")
-        
+        """Finaliza a simulação: notifica os outros componentes e só então gera os arquivos de
+        saída, para que o Clock não espere por eles (o main.py espera o Escalonador terminar)"""
+        nonlocal fim_notificado
+
         # Notifica Clock e Emissor sobre o fim da simulação
         print("[Escalonador] Notificando outros componentes sobre fim da simulação...")
         socket.send_message(PORTA_CLOCK, {"tipo": "fim_simulacao"})
         socket.send_message(PORTA_EMISSOR, {"tipo": "fim_simulacao"})
-        
-        simulacao_ativa = False
+        fim_notificado = True
+
+        print("[Escalonador] Gerando arquivo de saída...")
+        escalonador.info_saida.gera_saida(saida)
+        print(f"[Escalonador] Arquivo '{saida}' gerado com sucesso.")
+        if escalonador.info_saida.num_nucleos > 1:
+            print(f"[Escalonador] {escalonador.info_saida.descreve_utilizacao()}")
+        if arquivo_rastro is not None:
+            rastro.grava_rastro(escalonador.info_saida, arquivo_rastro)
+            print(f"[Escalonador] Rastro binário '{arquivo_rastro}' gerado com sucesso.")
+        if arquivo_metricas is not None:
+            import metricas  # depende do numpy, opcional
+            resultado = metricas.calcula(metricas.colunas_da_simulacao(escalonador.info_saida))
+            metricas.grava(resultado, arquivo_metricas)
+            print(metricas.formata(resultado))
+            print(f"[Escalonador] Métricas gravadas em '{arquivo_metricas}'.")
+
         print("[Escalonador] Simulação finalizada.")
-        sys.exit(0)
+        encerra(0)
+
+    def trata_erro(erro: Exception):
+        """Interrompe a simulação após um erro ao tratar uma mensagem, avisando o Clock, que
+        esperaria pela confirmação do ciclo. O aviso é enviado antes de encerrar o laço principal,
+        que fecharia o processo antes do envio. Um erro ao gravar os arquivos de saída, depois do
+        aviso de fim, só muda o código de saída, que o main.py verifica"""
+        if not fim_notificado:
+            socket.try_send_message(PORTA_CLOCK, {"tipo": "abortar", "origem": "escalonador",
+                                                  "erro": str(erro)})
+        encerra(1)
+
+    def encerra(status: int):
+        """Encerra o laço principal com o código de saída informado"""
+        nonlocal simulacao_ativa, status_saida
+        status_saida = status
+        simulacao_ativa = False
 
     # LOOP PRINCIPAL ------------------------------------------------------------------------------
 
     # Inicia o servidor socket para receber mensagens
-    socket.start_server(PORTA_ESCALONADOR, trata_mensagem)
+    socket.start_server(PORTA_ESCALONADOR, trata_mensagem, trata_erro)
     print("[Escalonador] Servidor socket iniciado. Aguardando mensagens...")
-    
+
     # Mantém o processo ativo até a simulação terminar
     while simulacao_ativa:
         time.sleep(0.1)
-        
-    return None
+
+    return status_saida
+
+def algoritmo_valido(nome:str) -> c.Algoritmo:
+    '''Retorna o algoritmo com o nome dado, sem diferenciar maiúsculas. Lança ValueError com as
+    opções válidas se o nome não for de nenhum algoritmo.'''
+    try:
+        return c.Algoritmo[nome.strip().lower()]
+    except KeyError:
+        opcoes = ", ".join(algoritmo.name for algoritmo in c.Algoritmo)
+        raise ValueError(f"Algoritmo inválido. Opções: {opcoes}.") from None
+
+def parametros_validos(quantum:int|None=None, fator_envelhecimento:int|None=None,
+                       num_nucleos:int|None=None) -> tuple[int, int, int]:
+    '''Valida o quantum, o fator de envelhecimento e o número de núcleos, que recebem os valores
+    padrão quando None. Usada pelo Escalonador e por todos os pontos de entrada, para que as regras
+    e as mensagens sejam as mesmas. Lança ValueError se algum valor estiver fora do intervalo.'''
+    quantum = QUANTUM_PADRAO if quantum is None else quantum
+    fator_envelhecimento = FATOR_ENVELHECIMENTO_PADRAO if fator_envelhecimento is None \
+        else fator_envelhecimento
+    num_nucleos = NUCLEOS_PADRAO if num_nucleos is None else num_nucleos
+    if quantum < 1:
+        raise ValueError("O quantum deve ser um inteiro positivo.")
+    if fator_envelhecimento < 0:
+        raise ValueError("O fator de envelhecimento não pode ser negativo.")
+    if num_nucleos < 1:
+        raise ValueError("O número de núcleos deve ser um inteiro positivo.")
+    return quantum, fator_envelhecimento, num_nucleos
+
+def valor_da_opcao(argumentos:list[str], opcao:str) -> str|None:
+    '''Retorna o valor que segue a opção na lista de argumentos, ou None se ela não foi usada.'''
+    if opcao not in argumentos:
+        return None
+    posicao = argumentos.index(opcao) + 1
+    if posicao >= len(argumentos):
+        sys.exit(f"Erro: A opção {opcao} precisa de um valor.")
+    return argumentos[posicao]
+
+def valor_inteiro_da_opcao(argumentos:list[str], opcao:str, minimo:int|None=1) -> int|None:
+    '''Como valor_da_opcao, mas exige um inteiro maior ou igual ao mínimo (por padrão, positivo).
+    Com minimo None, aceita qualquer inteiro e o intervalo fica a cargo de quem chama.'''
+    valor = valor_da_opcao(argumentos, opcao)
+    if valor is None:
+        return None
+    try:
+        inteiro = int(valor)
+    except ValueError:
+        inteiro = None
+    if inteiro is None or (minimo is not None and inteiro < minimo):
+        requisito = "um inteiro" if minimo is None else f"um inteiro maior ou igual a {minimo}"
+        sys.exit(f"Erro: A opção {opcao} precisa de {requisito}.")
+    return inteiro
 
 if __name__ == "__main__":
     if len(sys.argv) < 2:
         sys.exit("Erro: Nenhum algoritmo foi especificado.")
+    opcoes = sys.argv[2:]
     try:
-        algoritmo = c.Algoritmo[sys.argv[1]]
-    except KeyError:
-        sys.exit("Erro: Algoritmo inválido.")
-
-    main(algoritmo)
\ No newline at end of file
+        algoritmo = algoritmo_valido(sys.argv[1])
+        quantum, fator_envelhecimento, num_nucleos = parametros_validos(
+            valor_inteiro_da_opcao(opcoes, "--quantum", minimo=None),
+            valor_inteiro_da_opcao(opcoes, "--envelhecimento", minimo=None),
+            valor_inteiro_da_opcao(opcoes, "--nucleos", minimo=None))
+    except ValueError as erro:
+        sys.exit(f"Erro: {erro}")
+    status = main(algoritmo, saida=valor_da_opcao(opcoes, "--saida") or "saida.txt",
+                  arquivo_rastro=valor_da_opcao(opcoes, "--rastro"),
+                  limite_concluidas=valor_inteiro_da_opcao(opcoes, "--limite-concluidas"),
+                  arquivo_metricas=valor_da_opcao(opcoes, "--metricas"),
+                  quantum=quantum, fator_envelhecimento=fator_envelhecimento,
+                  num_nucleos=num_nucleos)
+    sys.exit(status)
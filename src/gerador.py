@@ -0,0 +1,234 @@
+import argparse
+import sys
+import time
+from typing import Iterator
+import numpy as np
+import leitura
+
+# Gerador de arquivos de entrada sintéticos, para testar o escalonador com cargas grandes. As
+# tarefas são geradas com NumPy em blocos de tamanho fixo e gravadas à medida que são geradas, de
+# modo que a memória usada não depende do número de tarefas. Requer o pacote numpy, que é opcional
+# para a simulação em si.
+
+USO = ("python gerador.py <arquivo_saida> <num_tarefas> [--semente N] [--formato {texto,binario}] "
+       "[--chegadas {poisson,rajadas}] [--taxa X] [--rajada X] [--intensidade X] "
+       "[--duracao {exponencial,pareto,lognormal,constante}] [--duracao-media X] [--cauda X] "
+       "[--duracao-maxima N] [--prioridades N] [--assimetria X]")
+
+# Quantidade de tarefas geradas e gravadas por vez
+TAREFAS_POR_BLOCO = 1 << 18
+
+# Prefixo dos ids das tarefas geradas, seguido do índice da tarefa com zeros à esquerda
+PREFIXO_ID = "t"
+
+# Maior duração que cabe no registro do formato binário
+DURACAO_MAXIMA = (1 << 32) - 1
+
+class Cenario:
+    '''Distribuições usadas para gerar as tarefas:
+
+    - chegadas: "poisson" (intervalos exponenciais entre ingressos, com taxa tarefas por ciclo) ou
+      "rajadas" (grupos de, em média, rajada tarefas que chegam intensidade vezes mais rápido, com
+      intervalos entre os grupos que mantêm a taxa média);
+    - duração: "exponencial", "pareto" (cauda pesada, com expoente cauda > 1), "lognormal" (com
+      desvio padrão cauda do logaritmo) ou "constante", todas com média duracao_media, arredondadas
+      para cima e limitadas a duracao_maxima (por padrão, o maior valor do formato binário);
+    - prioridade: de 1 a prioridades, com probabilidade proporcional a 1 / p ** assimetria (lei de
+      Zipf; assimetria 0 dá prioridades uniformes).'''
+    def __init__(self, chegadas:str="poisson", taxa:float=0.5, rajada:float=20, intensidade:float=10,
+                 duracao:str="pareto", duracao_media:float=5, cauda:float=1.5,
+                 duracao_maxima:int|None=None, prioridades:int=5, assimetria:float=1) -> None:
+        '''Construtor da classe. Levanta ValueError para parâmetros inválidos.'''
+        if chegadas not in ("poisson", "rajadas"):
+            raise ValueError(f"Distribuição de chegadas inválida: {chegadas}.")
+        if duracao not in ("exponencial", "pareto", "lognormal", "constante"):
+            raise ValueError(f"Distribuição de duração inválida: {duracao}.")
+        if taxa <= 0 or rajada < 1 or intensidade < 1:
+            raise ValueError("A taxa deve ser positiva, e a rajada e a intensidade, no mínimo 1.")
+        if duracao_media < 1 or (duracao_maxima is not None and not 1 <= duracao_maxima <= DURACAO_MAXIMA):
+            raise ValueError(f"As durações média e máxima devem estar entre 1 e {DURACAO_MAXIMA}.")
+        if (duracao == "pareto" and cauda <= 1) or (duracao == "lognormal" and cauda <= 0):
+            raise ValueError("A cauda deve ser maior que 1 na Pareto e positiva na lognormal.")
+        if prioridades < 1 or assimetria < 0:
+            raise ValueError("O número de prioridades deve ser positivo e a assimetria não pode ser negativa.")
+        self.chegadas = chegadas
+        self.taxa = taxa
+        self.rajada = rajada
+        self.intensidade = intensidade
+        self.duracao = duracao
+        self.duracao_media = duracao_media
+        self.cauda = cauda
+        self.duracao_maxima = duracao_maxima
+        self.prioridades = prioridades
+        self.assimetria = assimetria
+
+def gera_blocos(cenario:Cenario, num_tarefas:int, semente:int=0,
+                tamanho_bloco:int=TAREFAS_POR_BLOCO) -> Iterator[tuple[np.ndarray, np.ndarray, np.ndarray]]:
+    '''Gera as tarefas em blocos de colunas (ingresso, duração, prioridade), em ordem de ingresso.
+    Cada distribuição usa um gerador próprio derivado da semente, de modo que o resultado depende
+    apenas da semente e do cenário, e não do tamanho dos blocos.'''
+    (gerador_intervalos, gerador_rajadas, gerador_pausas,
+     gerador_duracoes, gerador_prioridades) = (np.random.default_rng(s)
+                                                for s in np.random.SeedSequence(semente).spawn(5))
+
+    probabilidades = 1 / np.arange(1, cenario.prioridades + 1) ** cenario.assimetria
+    probabilidades /= probabilidades.sum()
+
+    tempo = 0.0  # instante contínuo da última chegada
+    for inicio in range(0, num_tarefas, tamanho_bloco):
+        n = min(tamanho_bloco, num_tarefas - inicio)
+
+        if cenario.chegadas == "poisson":
+            intervalos = gerador_intervalos.exponential(1 / cenario.taxa, n)
+        else:
+            # Cada tarefa abre uma nova rajada com probabilidade 1 / rajada, o que dá rajadas de
+            # tamanho geométrico. A pausa antes de cada rajada compensa a chegada mais rápida dentro
+            # dela, mantendo a taxa média.
+            taxa_rajada = cenario.taxa * cenario.intensidade
+            pausa_media = cenario.rajada / cenario.taxa - cenario.rajada / taxa_rajada
+            intervalos = gerador_intervalos.exponential(1 / taxa_rajada, n)
+            novas = gerador_rajadas.random(n) < 1 / cenario.rajada
+            intervalos += np.where(novas, gerador_pausas.exponential(pausa_media, n), 0)
+        if inicio == 0:
+            intervalos[0] = 0  # a primeira tarefa chega no ciclo 0
+        instantes = tempo + np.cumsum(intervalos)
+        tempo = float(instantes[-1])
+        ingressos = instantes.astype(np.int64)
+
+        media = cenario.duracao_media
+        if cenario.duracao == "exponencial":
+            duracoes = gerador_duracoes.exponential(media, n)
+        elif cenario.duracao == "pareto":
+            # numpy.pareto gera a Pareto deslocada (Lomax); somando 1 e escalando pelo mínimo, a
+            # média é minimo * cauda / (cauda - 1)
+            minimo = media * (cenario.cauda - 1) / cenario.cauda
+            duracoes = (gerador_duracoes.pareto(cenario.cauda, n) + 1) * minimo
+        elif cenario.duracao == "lognormal":
+            sigma = cenario.cauda
+            duracoes = gerador_duracoes.lognormal(np.log(media) - sigma ** 2 / 2, sigma, n)
+        else:
+            duracoes = np.full(n, float(media))
+        limite = cenario.duracao_maxima if cenario.duracao_maxima is not None else DURACAO_MAXIMA
+        duracoes = np.clip(np.ceil(duracoes), 1, limite).astype(np.int64)
+
+        prioridades = gerador_prioridades.choice(np.arange(1, cenario.prioridades + 1, dtype=np.int64),
+                                                 size=n, p=probabilidades)
+        yield ingressos, duracoes, prioridades
+
+def largura_id(num_tarefas:int) -> int:
+    '''Retorna o tamanho dos ids para o número de tarefas: prefixo mais dígitos do maior índice.'''
+    return len(PREFIXO_ID) + len(str(max(num_tarefas - 1, 0)))
+
+def _digitos(valores:np.ndarray, largura:int) -> np.ndarray:
+    '''Retorna uma matriz com os dígitos ASCII de cada valor não negativo, alinhados à direita em
+    largura colunas.'''
+    potencias = 10 ** np.arange(largura - 1, -1, -1, dtype=np.int64)
+    return (valores[:, None] // potencias % 10 + ord("0")).astype(np.uint8)
+
+def _ids(inicio:int, n:int, largura:int) -> np.ndarray:
+    '''Retorna a matriz de bytes dos ids das tarefas de índices inicio a inicio + n - 1.'''
+    ids = np.empty((n, largura), dtype=np.uint8)
+    ids[:, :len(PREFIXO_ID)] = np.frombuffer(PREFIXO_ID.encode(), dtype=np.uint8)
+    ids[:, len(PREFIXO_ID):] = _digitos(np.arange(inicio, inicio + n, dtype=np.int64),
+                                        largura - len(PREFIXO_ID))
+    return ids
+
+def formata_texto(inicio:int, largura:int, colunas:tuple[np.ndarray, ...]) -> bytes:
+    '''Formata um bloco de tarefas como linhas ID;ingresso;duracao;prioridade. Em vez de formatar
+    linha por linha, monta uma matriz de bytes com todas as colunas alinhadas à direita e descarta
+    os zeros à esquerda com uma máscara, o que é bem mais rápido em Python.'''
+    n = len(colunas[0])
+    separador = np.full((n, 1), ord(";"), dtype=np.uint8)
+    todos = np.ones((n, 1), dtype=bool)
+    partes = [_ids(inicio, n, largura)]
+    mascaras = [np.ones((n, largura), dtype=bool)]
+    for coluna in colunas:
+        digitos = _digitos(coluna, len(str(int(coluna.max()))))
+        significativos = digitos != ord("0")
+        significativos = np.logical_or.accumulate(significativos, axis=1)
+        significativos[:, -1] = True  # o valor 0 tem um dígito
+        partes += [separador, digitos]
+        mascaras += [todos, significativos]
+    partes.append(np.full((n, 1), ord("\n"), dtype=np.uint8))
+    mascaras.append(todos)
+    return np.hstack(partes)[np.hstack(mascaras)].tobytes()
+
+def formata_binario(inicio:int, largura:int, colunas:tuple[np.ndarray, ...]) -> bytes:
+    '''Formata um bloco de tarefas como registros do formato binário de entrada (ver leitura.py).'''
+    n = len(colunas[0])
+    registros = np.empty(n, dtype=[("id", f"S{largura}"), ("ingresso", "<i8"),
+                                   ("duracao", "<u4"), ("prioridade", "<i4")])
+    registros["id"] = _ids(inicio, n, largura).view(f"S{largura}").ravel()
+    registros["ingresso"], registros["duracao"], registros["prioridade"] = colunas
+    return registros.tobytes()
+
+def gera(caminho:str, num_tarefas:int, cenario:Cenario, semente:int=0, binario:bool=False):
+    '''Gera num_tarefas tarefas com o cenário e a semente informados e as grava no arquivo, no
+    formato de texto ou no binário.'''
+    largura = largura_id(num_tarefas)
+    formata = formata_binario if binario else formata_texto
+    with open(caminho, "wb") as arquivo:
+        if binario:
+            arquivo.write(leitura.CABECALHO_BINARIO.pack(leitura.MAGICO_BINARIO, leitura.VERSAO_BINARIO,
+                                                         num_tarefas, largura, 1))
+        inicio = 0
+        for colunas in gera_blocos(cenario, num_tarefas, semente):
+            arquivo.write(formata(inicio, largura, colunas))
+            inicio += len(colunas[0])
+
+def main():
+    parser = argparse.ArgumentParser(usage=USO)
+    parser.add_argument("saida", nargs="?", help="arquivo de entrada a ser gerado")
+    parser.add_argument("num_tarefas", nargs="?", type=int, help="número de tarefas")
+    parser.add_argument("--semente", type=int, default=0,
+                        help="semente do gerador; a mesma semente gera o mesmo arquivo (padrão: 0)")
+    parser.add_argument("--formato", choices=["texto", "binario"], default="texto",
+                        help="texto (ID;ingresso;duracao;prioridade, padrão) ou binário, mais "
+                             "rápido de gerar e de ler")
+    parser.add_argument("--chegadas", choices=["poisson", "rajadas"], default="poisson",
+                        help="distribuição das chegadas (padrão: poisson)")
+    parser.add_argument("--taxa", type=float, default=0.5,
+                        help="média de tarefas que chegam por ciclo (padrão: 0.5)")
+    parser.add_argument("--rajada", type=float, default=20,
+                        help="tamanho médio das rajadas, com --chegadas rajadas (padrão: 20)")
+    parser.add_argument("--intensidade", type=float, default=10,
+                        help="quantas vezes as chegadas são mais rápidas dentro de uma rajada "
+                             "(padrão: 10)")
+    parser.add_argument("--duracao", choices=["exponencial", "pareto", "lognormal", "constante"],
+                        default="pareto", help="distribuição das durações (padrão: pareto)")
+    parser.add_argument("--duracao-media", type=float, default=5,
+                        help="duração média das tarefas, em ciclos (padrão: 5)")
+    parser.add_argument("--cauda", type=float, default=1.5,
+                        help="expoente da Pareto (quanto menor, mais pesada a cauda) ou desvio do "
+                             "logaritmo na lognormal (padrão: 1.5)")
+    parser.add_argument("--duracao-maxima", type=int, help="limite das durações, em ciclos")
+    parser.add_argument("--prioridades", type=int, default=5,
+                        help="número de níveis de prioridade, de 1 a N (padrão: 5)")
+    parser.add_argument("--assimetria", type=float, default=1,
+                        help="expoente de Zipf das prioridades: 0 é uniforme e valores maiores "
+                             "concentram as tarefas nas prioridades mais altas (padrão: 1)")
+    args = parser.parse_args()
+
+    if args.saida is None or args.num_tarefas is None:
+        print(f"Uso: {USO}")
+        sys.exit(1)
+
+    if args.num_tarefas < 1:
+        print("Erro: O número de tarefas deve ser um inteiro positivo.")
+        sys.exit(1)
+
+    try:
+        cenario = Cenario(args.chegadas, args.taxa, args.rajada, args.intensidade, args.duracao,
+                          args.duracao_media, args.cauda, args.duracao_maxima, args.prioridades,
+                          args.assimetria)
+    except ValueError as erro:
+        print(f"Erro: {erro}")
+        sys.exit(1)
+
+    inicio = time.perf_counter()
+    gera(args.saida, args.num_tarefas, cenario, args.semente, args.formato == "binario")
+    print(f"[Gerador] {args.num_tarefas} tarefas gravadas em '{args.saida}' "
+          f"({time.perf_counter() - inicio:.2f} s).")
+
+if __name__ == "__main__":
+    main()
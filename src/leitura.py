@@ -0,0 +1,170 @@
+import heapq
+import itertools
+import tempfile
+import os
+import struct
+from contextlib import ExitStack
+from typing import Iterator
+import classes as c
+
+# Quantidade de linhas ordenadas em memória por vez na ordenação externa
+TAMANHO_BLOCO = 1_000_000
+
+# Formato binário do arquivo de entrada, equivalente ao de texto e mais rápido de ler:
+#
+#   cabeçalho    mágico, versão, nº de tarefas, largura dos ids em bytes e se as tarefas estão em
+#                ordem de ingresso (1) ou não (0)
+#   tarefas      um registro de tamanho fixo por tarefa: id em UTF-8 completado com bytes nulos até
+#                a largura, ingresso (64 bits), duração (32 bits sem sinal) e prioridade (32 bits)
+#
+# Todos os inteiros são little-endian.
+MAGICO_BINARIO = b"ESCT"
+VERSAO_BINARIO = 1
+CABECALHO_BINARIO = struct.Struct("<4sIqII")
+
+# Quantidade de registros do formato binário lidos de uma vez
+REGISTROS_POR_LEITURA = 65536
+
+def registro_binario(largura_id: int) -> struct.Struct:
+    '''Retorna o formato do registro de tarefa do arquivo binário com ids da largura informada.'''
+    return struct.Struct(f"<{largura_id}sqIi")
+
+def le_cabecalho_binario(entrada: str) -> tuple[int, int, bool]|None:
+    '''Retorna o número de tarefas, a largura dos ids e se as tarefas estão em ordem de ingresso,
+    caso o arquivo esteja no formato binário, ou None caso seja um arquivo de texto. Levanta
+    ValueError se o arquivo for binário em uma versão desconhecida.'''
+    with open(entrada, 'rb') as arquivo:
+        dados = arquivo.read(CABECALHO_BINARIO.size)
+    if not dados.startswith(MAGICO_BINARIO):
+        return None
+    if len(dados) < CABECALHO_BINARIO.size:
+        raise ValueError(f"'{entrada}' não é um arquivo de entrada binário válido.")
+    _, versao, num_tarefas, largura_id, ordenado = CABECALHO_BINARIO.unpack(dados)
+    if versao != VERSAO_BINARIO:
+        raise ValueError(f"'{entrada}' não é um arquivo de entrada binário na versão {VERSAO_BINARIO}.")
+    return num_tarefas, largura_id, bool(ordenado)
+
+def _le_registros_binario(entrada: str, num_tarefas: int, largura_id: int) -> Iterator[tuple]:
+    '''Percorre os registros do arquivo binário, lendo blocos de registros por vez.'''
+    registro = registro_binario(largura_id)
+    with open(entrada, 'rb') as arquivo:
+        arquivo.seek(CABECALHO_BINARIO.size)
+        restantes = num_tarefas
+        while restantes > 0:
+            quantidade = min(restantes, REGISTROS_POR_LEITURA)
+            dados = arquivo.read(quantidade * registro.size)
+            if len(dados) < quantidade * registro.size:
+                raise ValueError(f"'{entrada}' está truncado: faltam {restantes} tarefas.")
+            yield from registro.iter_unpack(dados)
+            restantes -= quantidade
+
+def _le_tarefas_binario(entrada: str, num_tarefas: int, largura_id: int) -> Iterator[c.Tarefa]:
+    '''Lê as tarefas do arquivo binário sob demanda, na ordem do arquivo.'''
+    registros = _le_registros_binario(entrada, num_tarefas, largura_id)
+    for numero, (id, ingresso, duracao, prioridade) in enumerate(registros, 1):
+        yield cria_tarefa(id.rstrip(b"\0").decode(), ingresso, duracao, prioridade,
+                          f"Registro {numero}")
+
+def _linhas(entrada: str) -> Iterator[str]:
+    '''Percorre as tarefas do arquivo de entrada como linhas no formato de texto, qualquer que seja
+    o formato do arquivo.'''
+    cabecalho = le_cabecalho_binario(entrada)
+    if cabecalho is None:
+        with open(entrada, 'r') as arquivo:
+            yield from arquivo
+        return
+    for id, ingresso, duracao, prioridade in _le_registros_binario(entrada, *cabecalho[:2]):
+        id = id.rstrip(b"\0").decode()
+        yield f"{id};{ingresso};{duracao};{prioridade}\n"
+
+def cria_tarefa(id: str, ingresso: int, duracao: int, prioridade: int, origem: str) -> c.Tarefa:
+    '''Cria uma Tarefa lida da entrada, validando seus campos. Uma tarefa com duração menor que 1
+    nunca seria concluída, o que faria a simulação não terminar. A origem (a linha ou o registro
+    do arquivo) identifica a tarefa nas mensagens de erro (ValueError).'''
+    if duracao < 1:
+        raise ValueError(f"{origem}: a duração da tarefa '{id}' deve ser um inteiro positivo.")
+    return c.Tarefa(id=id, ingresso=ingresso, duracao=duracao, prioridade=prioridade)
+
+def converte_linha(linha: str, numero: int|None = None) -> c.Tarefa:
+    '''Converte uma linha no formato ID;ingresso;duracao;prioridade em uma Tarefa. Levanta
+    ValueError, com o número da linha quando informado, se faltarem campos ou se algum deles for
+    inválido.'''
+    origem = f"Linha {numero}" if numero is not None else f"Linha '{linha.strip()}'"
+    partes = linha.strip().split(";")
+    if len(partes) < 4:
+        raise ValueError(f"{origem}: esperado o formato ID;ingresso;duracao;prioridade.")
+    try:
+        ingresso, duracao, prioridade = int(partes[1]), int(partes[2]), int(partes[3])
+    except ValueError:
+        raise ValueError(f"{origem}: ingresso, duração e prioridade devem ser inteiros.") from None
+    return cria_tarefa(partes[0], ingresso, duracao, prioridade, origem)
+
+def ingresso_da_linha(linha: str, numero: int|None = None) -> int:
+    '''Extrai apenas o tempo de ingresso de uma linha do arquivo de entrada. Levanta ValueError,
+    como converte_linha, se ele estiver ausente ou não for inteiro.'''
+    partes = linha.split(";", 2)
+    try:
+        return int(partes[1])
+    except (IndexError, ValueError):
+        origem = f"Linha {numero}" if numero is not None else f"Linha '{linha.strip()}'"
+        raise ValueError(f"{origem}: esperado o formato ID;ingresso;duracao;prioridade.") from None
+
+def le_tarefas(entrada: str) -> Iterator[c.Tarefa]:
+    '''Lê as tarefas do arquivo de entrada sob demanda, uma linha por vez, na ordem do arquivo.
+    Linhas em branco são ignoradas. Arquivos no formato binário são reconhecidos pelo cabeçalho.'''
+    cabecalho = le_cabecalho_binario(entrada)
+    if cabecalho is not None:
+        yield from _le_tarefas_binario(entrada, *cabecalho[:2])
+        return
+    with open(entrada, 'r') as arquivo:
+        for numero, linha in enumerate(arquivo, 1):
+            if linha.strip():
+                yield converte_linha(linha, numero)
+
+def esta_ordenado(entrada: str) -> bool:
+    '''Percorre o arquivo de entrada sem guardá-lo e retorna True caso as tarefas estejam em ordem
+    crescente de ingresso. No formato binário, vale a indicação do cabeçalho quando ele garante a
+    ordem.'''
+    cabecalho = le_cabecalho_binario(entrada)
+    if cabecalho is not None and cabecalho[2]:
+        return True
+    anterior:int|None = None
+    for numero, linha in enumerate(_linhas(entrada), 1):
+        if not linha.strip():
+            continue
+        ingresso = ingresso_da_linha(linha, numero)
+        if anterior is not None and ingresso < anterior:
+            return False
+        anterior = ingresso
+    return True
+
+def le_tarefas_em_ordem(entrada: str, tamanho_bloco: int = TAMANHO_BLOCO) -> Iterator[c.Tarefa]:
+    '''Lê as tarefas sob demanda em ordem de ingresso, mantendo a ordem do arquivo entre tarefas
+    com o mesmo ingresso. Se o arquivo já estiver ordenado, ele é lido diretamente; caso contrário,
+    é feita uma ordenação externa. Em ambos os casos a memória usada não depende do tamanho do
+    arquivo.'''
+    if esta_ordenado(entrada):
+        yield from le_tarefas(entrada)
+    else:
+        yield from _ordenacao_externa(entrada, tamanho_bloco)
+
+def _ordenacao_externa(entrada: str, tamanho_bloco: int) -> Iterator[c.Tarefa]:
+    '''Ordena o arquivo por ingresso em blocos de até tamanho_bloco linhas, gravando cada bloco
+    ordenado em um arquivo temporário, e intercala os blocos com heapq.merge. Tanto a ordenação
+    de cada bloco quanto a intercalação são estáveis, o que preserva a ordem do arquivo entre
+    tarefas com o mesmo ingresso.'''
+    with tempfile.TemporaryDirectory(prefix="escalonamento_") as pasta, ExitStack() as pilha:
+        blocos = []
+        linhas_entrada = _linhas(entrada)
+        while linhas_lidas := list(itertools.islice(linhas_entrada, tamanho_bloco)):
+            linhas = [linha if linha.endswith("\n") else linha + "\n"
+                      for linha in linhas_lidas if linha.strip()]
+            linhas.sort(key=ingresso_da_linha)
+            caminho = os.path.join(pasta, f"bloco_{len(blocos)}.txt")
+            with open(caminho, 'w') as bloco:
+                bloco.writelines(linhas)
+            blocos.append(caminho)
+
+        arquivos = [pilha.enter_context(open(caminho, 'r')) for caminho in blocos]
+        for linha in heapq.merge(*arquivos, key=ingresso_da_linha):
+            yield converte_linha(linha)
@@ -0,0 +1,181 @@
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import cache
+import classes as c
+import simulador
+from escalonador import QUANTUM_PADRAO, FATOR_ENVELHECIMENTO_PADRAO, NUCLEOS_PADRAO, \
+    algoritmo_valido, parametros_validos
+
+USO = ("python lote.py <arquivos_entrada...> [--algoritmos fcfs,rr,...] [--pasta DIR] [--processos N] "
+       "[--streaming] [--quantum N] [--envelhecimento N] [--nucleos N] [--cache DIR] [--sem-cache]")
+
+CAMPOS = ["entrada", "algoritmo", "tarefas", "ciclos", "ciclos_ociosos", "utilizacao",
+          "turnaround_medio", "espera_medio", "resposta_medio", "tempo_s", "em_cache", "saida", "erro"]
+
+def resume(info_saida:c.InfoSaida) -> dict:
+    '''Resume uma execução nas métricas da tabela de comparação: número de tarefas e de ciclos,
+    ciclos ociosos e utilização da CPU (somados todos os núcleos) e médias de turnaround, espera e
+    resposta, que são None se nenhuma tarefa foi concluída.'''
+    tt_sum = wt_sum = rt_sum = 0
+    for t in info_saida.tarefas_em_ordem():
+        tt = t.fim_exe - t.ingresso # type: ignore
+        tt_sum += tt
+        wt_sum += tt - t.duracao_total
+        rt_sum += t.inicio_exe - t.ingresso # type: ignore
+    num_tarefas = info_saida.num_concluidas
+    ociosos = info_saida.ciclos_ociosos_nucleos()
+    total = info_saida.total_ciclos
+    capacidade = total * info_saida.num_nucleos
+    return {
+        "tarefas": num_tarefas,
+        "ciclos": total,
+        "ciclos_ociosos": ociosos,
+        "utilizacao": round((capacidade - ociosos) / capacidade, 4) if capacidade else 0.0,
+        "turnaround_medio": round(tt_sum / num_tarefas, 1) if num_tarefas else None,
+        "espera_medio": round(wt_sum / num_tarefas, 1) if num_tarefas else None,
+        "resposta_medio": round(rt_sum / num_tarefas, 1) if num_tarefas else None,
+    }
+
+def executa(entrada:str, algoritmo:c.Algoritmo, pasta:str, streaming:bool=False,
+            quantum:int=QUANTUM_PADRAO, fator_envelhecimento:int=FATOR_ENVELHECIMENTO_PADRAO,
+            resultados:cache.CacheResultados|None=None, hash_entrada:str|None=None,
+            num_nucleos:int=NUCLEOS_PADRAO) -> dict:
+    '''Simula uma combinação de entrada e algoritmo no processo atual, grava o arquivo de saída na
+    pasta e retorna uma linha da tabela de comparação. Erros da simulação são registrados na linha,
+    para não interromper o lote. Com um cache de resultados, uma execução idêntica já feita é
+    copiada dele em vez de simulada, e as novas são guardadas nele.'''
+    nome = os.path.splitext(os.path.basename(entrada))[0]
+    saida = os.path.join(pasta, f"saida_{nome}_{algoritmo.name}.txt")
+    linha:dict = {"entrada": entrada, "algoritmo": algoritmo.name, "em_cache": False,
+                  "saida": saida, "erro": ""}
+    inicio = time.perf_counter()
+
+    chave = None
+    if resultados is not None:
+        chave = resultados.chave(entrada, algoritmo, quantum, fator_envelhecimento, hash_entrada,
+                                 num_nucleos)
+        if resultados.busca(chave, "saida.txt", "resumo.json"):
+            resultados.copia(chave, "saida.txt", saida)
+            linha.update(resultados.le_json(chave, "resumo.json"))
+            linha["tempo_s"] = round(time.perf_counter() - inicio, 3)
+            linha["em_cache"] = True
+            return linha
+
+    try:
+        info_saida = simulador.simula(entrada, algoritmo, streaming=streaming, quantum=quantum,
+                                      fator_envelhecimento=fator_envelhecimento,
+                                      num_nucleos=num_nucleos)
+        info_saida.gera_saida(saida)
+    except (OSError, ValueError) as erro:
+        linha["erro"] = str(erro)
+        return linha
+
+    resumo = resume(info_saida)
+    if resultados is not None and chave is not None:
+        resultados.guarda_arquivo(chave, "saida.txt", saida)
+        resultados.guarda_json(chave, "resumo.json", resumo)
+    linha.update(resumo)
+    linha["tempo_s"] = round(time.perf_counter() - inicio, 3)
+    return linha
+
+def executa_lote(entradas:list[str], algoritmos:list[c.Algoritmo], pasta:str,
+                 processos:int|None=None, streaming:bool=False, quantum:int=QUANTUM_PADRAO,
+                 fator_envelhecimento:int=FATOR_ENVELHECIMENTO_PADRAO,
+                 resultados:cache.CacheResultados|None=None,
+                 num_nucleos:int=NUCLEOS_PADRAO) -> list[dict]:
+    '''Executa todas as combinações de entradas e algoritmos em paralelo, em um pool de processos
+    (por padrão, um por núcleo), e retorna as linhas da comparação na ordem das entradas e dos
+    algoritmos informados. Com um cache de resultados, só as combinações ainda não calculadas são
+    simuladas.'''
+    os.makedirs(pasta, exist_ok=True)
+    hashes = {entrada: cache.hash_arquivo(entrada) if resultados is not None else None
+              for entrada in entradas}
+    combinacoes = [(entrada, algoritmo) for entrada in entradas for algoritmo in algoritmos]
+    linhas:dict[tuple[str, c.Algoritmo], dict] = {}
+    if resultados is not None:
+        # Cada tarefa do pool recebe uma cópia do cache com o tamanho já medido, e o limite é
+        # verificado de novo ao final, com as gravações de todos os processos
+        resultados.limita()
+    with ProcessPoolExecutor(max_workers=processos) as pool:
+        futuros = {pool.submit(executa, entrada, algoritmo, pasta, streaming, quantum,
+                               fator_envelhecimento, resultados, hashes[entrada],
+                               num_nucleos): (entrada, algoritmo)
+                   for entrada, algoritmo in combinacoes}
+        for futuro in as_completed(futuros):
+            entrada, algoritmo = futuros[futuro]
+            linhas[(entrada, algoritmo)] = linha = futuro.result()
+            situacao = (f"erro: {linha['erro']}" if linha["erro"]
+                        else "cache" if linha["em_cache"] else f"{linha['tempo_s']} s")
+            print(f"[Lote] {entrada} / {algoritmo.name}: {situacao}")
+    if resultados is not None:
+        resultados.limita()
+    return [linhas[combinacao] for combinacao in combinacoes]
+
+def grava_comparacao(linhas:list[dict], pasta:str):
+    '''Grava a tabela de comparação em comparacao.csv e comparacao.json na pasta.'''
+    with open(os.path.join(pasta, "comparacao.csv"), "w", newline="") as arquivo:
+        escritor = csv.DictWriter(arquivo, fieldnames=CAMPOS, delimiter=";")
+        escritor.writeheader()
+        escritor.writerows(linhas)
+    with open(os.path.join(pasta, "comparacao.json"), "w") as arquivo:
+        json.dump(linhas, arquivo, indent=2)
+
+def main():
+    parser = argparse.ArgumentParser(usage=USO)
+    parser.add_argument("entradas", nargs="*", help="arquivos de entrada com as tarefas")
+    parser.add_argument("--algoritmos", default=",".join(a.name for a in c.Algoritmo),
+                        help="algoritmos separados por vírgula (padrão: todos)")
+    parser.add_argument("--pasta", default="lote",
+                        help="pasta dos arquivos de saída e da comparação (padrão: lote)")
+    parser.add_argument("--processos", type=int,
+                        help="número de processos simultâneos (padrão: número de núcleos)")
+    parser.add_argument("--streaming", action="store_true",
+                        help="lê cada arquivo de entrada sob demanda, em ordem de ingresso")
+    parser.add_argument("--quantum", type=int, default=QUANTUM_PADRAO,
+                        help=f"quantum do Round-Robin (padrão: {QUANTUM_PADRAO})")
+    parser.add_argument("--envelhecimento", type=int, default=FATOR_ENVELHECIMENTO_PADRAO,
+                        help=f"fator de envelhecimento do PRIOd (padrão: {FATOR_ENVELHECIMENTO_PADRAO})")
+    parser.add_argument("--nucleos", type=int, default=NUCLEOS_PADRAO,
+                        help=f"número de núcleos da CPU simulada (padrão: {NUCLEOS_PADRAO})")
+    parser.add_argument("--cache", default=cache.RAIZ_PADRAO,
+                        help="pasta do cache de resultados (padrão: ~/.cache/escalonamento ou a "
+                             "variável de ambiente ESCALONAMENTO_CACHE)")
+    parser.add_argument("--sem-cache", action="store_true",
+                        help="simula todas as combinações, sem consultar nem alimentar o cache")
+    args = parser.parse_args()
+
+    if not args.entradas:
+        print(f"Uso: {USO}")
+        sys.exit(1)
+
+    for entrada in args.entradas:
+        if not os.path.isfile(entrada):
+            print(f"Erro: Arquivo de entrada '{entrada}' não encontrado.")
+            sys.exit(1)
+
+    try:
+        algoritmos = [algoritmo_valido(nome) for nome in args.algoritmos.split(",")]
+        parametros_validos(args.quantum, args.envelhecimento, args.nucleos)
+    except ValueError as erro:
+        print(f"Erro: {erro}")
+        sys.exit(1)
+
+    if args.processos is not None and args.processos < 1:
+        print("Erro: O número de processos deve ser um inteiro positivo.")
+        sys.exit(1)
+
+    inicio = time.perf_counter()
+    resultados = None if args.sem_cache else cache.CacheResultados(args.cache)
+    linhas = executa_lote(args.entradas, algoritmos, args.pasta, args.processos, args.streaming,
+                          args.quantum, args.envelhecimento, resultados, args.nucleos)
+    grava_comparacao(linhas, args.pasta)
+    print(f"[Lote] {len(linhas)} simulações em {time.perf_counter() - inicio:.2f} s. "
+          f"Comparação gravada em '{os.path.join(args.pasta, 'comparacao.csv')}' e 'comparacao.json'.")
+
+if __name__ == "__main__":
+    main()
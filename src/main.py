@@ -1,15 +1,105 @@
+import argparse
+import importlib.util
 import subprocess
 import time
 import sys
 import os
+from escalonador import QUANTUM_PADRAO, FATOR_ENVELHECIMENTO_PADRAO, NUCLEOS_PADRAO, \
+    algoritmo_valido, parametros_validos
+
+USO = ("python main.py <arquivo_entrada> <algoritmo> [--modo {distribuido,direto}] [--periodo MS] "
+       "[--codec {binario,json}] [--streaming] [--saida CAMINHO] [--rastro CAMINHO] "
+       "[--limite-concluidas N] [--metricas CAMINHO] [--quantum N] [--envelhecimento N] "
+       "[--nucleos N] [--cache DIR] [--sem-cache]")
+
+# Arquivos de uma execução guardados no cache de resultados, com a opção que define seu destino
+ARQUIVOS_CACHE = {"saida.txt": "saida", "metricas.json": "metricas", "rastro.bin": "rastro"}
+
+def consulta_cache(resultados, chave:str, args) -> bool:
+    '''Copia do cache os arquivos pedidos pelas opções, se todos estiverem guardados na entrada
+    da chave. Retorna True se a simulação pode ser dispensada.'''
+    pedidos = {nome: getattr(args, opcao) for nome, opcao in ARQUIVOS_CACHE.items()
+               if getattr(args, opcao) is not None}
+    if not resultados.busca(chave, *pedidos):
+        return False
+    for nome, destino in pedidos.items():
+        resultados.copia(chave, nome, destino)
+    return True
+
+def guarda_no_cache(resultados, chave:str, args, inicio:float):
+    '''Guarda no cache os arquivos gerados pela execução. Arquivos mais antigos que o início da
+    execução são de execuções anteriores (a simulação falhou) e são ignorados.'''
+    for nome, opcao in ARQUIVOS_CACHE.items():
+        caminho = getattr(args, opcao)
+        if caminho is not None and os.path.isfile(caminho) and os.path.getmtime(caminho) >= inicio:
+            resultados.guarda_arquivo(chave, nome, caminho)
 
 def main():
-    if len(sys.argv) < 3:
-        print("Uso: python main.py <arquivo_entrada> <algoritmo>")
+    parser = argparse.ArgumentParser(usage=USO)
+    parser.add_argument("entrada", nargs="?", help="arquivo de entrada com as tarefas")
+    parser.add_argument("algoritmo", nargs="?", help="algoritmo de escalonamento")
+    parser.add_argument("--modo", choices=["distribuido", "direto"], default="distribuido",
+                        help="distribuido: três processos via sockets (padrão); "
+                             "direto: simulação em um único processo, sem espera entre ciclos")
+    parser.add_argument("--periodo", type=float, default=0,
+                        help="período mínimo de cada ciclo do Clock em milissegundos, no modo "
+                             "distribuido (padrão: 0, sem espera)")
+    parser.add_argument("--codec", choices=["binario", "json"], default="binario",
+                        help="codificação das mensagens entre os processos no modo distribuido "
+                             "(padrão: binario; json facilita a depuração)")
+    parser.add_argument("--streaming", action="store_true",
+                        help="lê o arquivo de entrada sob demanda, em ordem de ingresso, em vez "
+                             "de carregá-lo inteiro na memória")
+    parser.add_argument("--saida", default="saida.txt",
+                        help="caminho do arquivo de saída (padrão: saida.txt)")
+    parser.add_argument("--rastro",
+                        help="caminho para gravar também o rastro binário da execução, com a "
+                             "linha do tempo e as métricas das tarefas em registros de tamanho fixo")
+    parser.add_argument("--limite-concluidas", type=int, metavar="N",
+                        help="mantém no máximo N tarefas concluídas na memória; as demais são "
+                             "gravadas em disco e intercaladas ao gerar a saída")
+    parser.add_argument("--metricas",
+                        help="caminho para gravar, em JSON, métricas detalhadas da execução "
+                             "(percentis, vazão, utilização e resumo por prioridade); requer numpy")
+    parser.add_argument("--quantum", type=int, default=QUANTUM_PADRAO,
+                        help=f"quantum do Round-Robin, em ciclos (padrão: {QUANTUM_PADRAO})")
+    parser.add_argument("--envelhecimento", type=int, default=FATOR_ENVELHECIMENTO_PADRAO,
+                        help="fator de envelhecimento do PRIOd: quanto a prioridade das tarefas "
+                             "preteridas melhora a cada evento "
+                             f"(padrão: {FATOR_ENVELHECIMENTO_PADRAO})")
+    parser.add_argument("--nucleos", type=int, default=NUCLEOS_PADRAO,
+                        help="número de núcleos da CPU simulada: a cada ciclo, até N tarefas da "
+                             f"fila de prontas são executadas (padrão: {NUCLEOS_PADRAO})")
+    parser.add_argument("--cache",
+                        help="pasta do cache de resultados (padrão: ~/.cache/escalonamento ou a "
+                             "variável de ambiente ESCALONAMENTO_CACHE)")
+    parser.add_argument("--sem-cache", action="store_true",
+                        help="simula sempre, sem consultar nem alimentar o cache de resultados")
+    args = parser.parse_args()
+
+    if args.entrada is None or args.algoritmo is None:
+        print(f"Uso: {USO}")
+        sys.exit(1)
+
+    if args.metricas is not None and importlib.util.find_spec("numpy") is None:
+        print("Erro: A opção --metricas requer o pacote numpy (pip install numpy).")
+        sys.exit(1)
+
+    try:
+        parametros_validos(args.quantum, args.envelhecimento, args.nucleos)
+    except ValueError as erro:
+        print(f"Erro: {erro}")
+        sys.exit(1)
+
+    if args.rastro is not None and args.nucleos > 1:
+        print("Erro: O rastro binário não suporta simulações com vários núcleos.")
+        sys.exit(1)
+
+    if args.limite_concluidas is not None and args.limite_concluidas < 1:
+        print("Erro: O limite de tarefas concluídas deve ser um inteiro positivo.")
         sys.exit(1)
 
-    entrada = sys.argv[1]
-    algoritmo = sys.argv[2]
+    entrada = args.entrada
 
     # Caso o arquivo de entrada não seja encontrado
     if not os.path.isfile(entrada):
@@ -17,34 +107,91 @@ def main():
         sys.exit(1)
 
     # Caso o algoritmo de escalonamento inserido pelo usuário seja incorreto
-    if algoritmo.lower() not in ['fcfs', 'rr', 'sjf', 'srtf', 'prioc', 'priop', 'priod']:
-        print("Erro: Algoritmo inválido. Opções: fcfs, rr, sjf, srtf, prioc, priop, priod.")
+    try:
+        algoritmo = algoritmo_valido(args.algoritmo)
+    except ValueError as erro:
+        print(f"Erro: {erro}")
         sys.exit(1)
 
+    # Execuções idênticas (mesmo conteúdo de entrada, algoritmo, parâmetros e versão do código)
+    # são copiadas do cache de resultados em vez de simuladas
+    resultados = chave = None
+    if not args.sem_cache:
+        import cache
+        resultados = cache.CacheResultados(args.cache or cache.RAIZ_PADRAO)
+        chave = resultados.chave(entrada, algoritmo, args.quantum,
+                                 args.envelhecimento, num_nucleos=args.nucleos)
+        if consulta_cache(resultados, chave, args):
+            print(f"Resultado encontrado no cache. Saída gravada em '{args.saida}'.")
+            return
+    inicio = time.time()
+
+    # Modo direto: Clock, Emissor e Escalonador simulados no próprio processo
+    if args.modo == "direto":
+        import simulador
+        simulador.main(entrada, algoritmo, streaming=args.streaming,
+                       saida=args.saida, arquivo_rastro=args.rastro,
+                       limite_concluidas=args.limite_concluidas, arquivo_metricas=args.metricas,
+                       quantum=args.quantum, fator_envelhecimento=args.envelhecimento,
+                       num_nucleos=args.nucleos)
+        if resultados is not None:
+            guarda_no_cache(resultados, chave, args, inicio)
+        return
+
+    # Os processos herdam o codec escolhido pela variável de ambiente lida em protocolo.py
+    os.environ["ESCALONAMENTO_CODEC"] = args.codec
+
     # Inicia Emissor
     print("Iniciando Emissor...")
-    emissor = subprocess.Popen(['python', 'emissor.py', entrada])
+    emissor = subprocess.Popen(['python', 'emissor.py', entrada] + (['--streaming'] if args.streaming else []))
 
     time.sleep(1)  # espera emissor subir
 
     # Inicia Escalonador
     print("Iniciando Escalonador...")
-    escalonador = subprocess.Popen(['python', 'escalonador.py', algoritmo])
+    escalonador = subprocess.Popen(['python', 'escalonador.py', algoritmo.name, '--saida', args.saida]
+                                   + (['--rastro', args.rastro] if args.rastro else [])
+                                   + (['--limite-concluidas', str(args.limite_concluidas)]
+                                      if args.limite_concluidas else [])
+                                   + (['--metricas', args.metricas] if args.metricas else [])
+                                   + ['--quantum', str(args.quantum), '--envelhecimento', str(args.envelhecimento)]
+                                   + ['--nucleos', str(args.nucleos)])
 
     time.sleep(1)  # espera escalonador subir
 
     # Inicia Clock
     print("Iniciando Clock...")
-    clock = subprocess.Popen(['python', 'clock.py'])
+    clock = subprocess.Popen(['python', 'clock.py', str(args.periodo)])
 
     # Aguarda os processos terminarem (Clock termina a simulação)
     clock.wait()
 
-    # Encerra os outros processos se ainda estiverem rodando
-    escalonador.terminate()
-    emissor.terminate()
+    # Se algum processo falhou, o Clock avisa os demais e termina com erro; eles terminam logo em
+    # seguida, também com erro, e a execução não é guardada no cache
+    if clock.returncode != 0:
+        for processo in (escalonador, emissor):
+            try:
+                processo.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                processo.terminate()
+        print("Erro: A simulação foi interrompida por uma falha em um dos processos.")
+        sys.exit(1)
+
+    # O Escalonador avisa o fim da simulação antes de gravar os arquivos de saída e termina depois
+    # de gravá-los; o Emissor termina assim que recebe o aviso
+    escalonador.wait()
+    try:
+        emissor.wait(timeout=5)
+    except subprocess.TimeoutExpired:
+        emissor.terminate()
+    if escalonador.returncode != 0:
+        print("Erro: O Escalonador falhou ao gravar os arquivos de saída.")
+        sys.exit(1)
+
+    if resultados is not None:
+        guarda_no_cache(resultados, chave, args, inicio)
 
-    print("Todos os processos finalizados.")
+    print("Todos os processos finalizados.")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
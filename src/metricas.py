@@ -0,0 +1,188 @@
+import itertools
+import json
+import operator
+import sys
+import numpy as np
+import classes as c
+import rastro
+from escalonador import valor_da_opcao
+
+# Métricas calculadas com NumPy sobre colunas de inteiros (uma posição por tarefa), sem percorrer
+# as tarefas em Python. Requer o pacote numpy, que é opcional para a simulação em si.
+
+PERCENTIS = (50, 95, 99)
+
+# Registro de tamanho fixo de uma tarefa concluída, com os campos de classes.CAMPOS_REGISTRO
+REGISTRO = np.dtype([(campo, np.int64) for campo in c.CAMPOS_REGISTRO])
+
+class Colunas:
+    '''Dados das tarefas concluídas em colunas de inteiros, mais os totais de ciclos da execução.
+    Com vários núcleos, ciclos_ociosos soma os ciclos ociosos de todos eles e ociosos_por_nucleo
+    guarda os de cada um.'''
+    def __init__(self, ingresso:np.ndarray, inicio:np.ndarray, fim:np.ndarray, duracao:np.ndarray,
+                 prioridade:np.ndarray, total_ciclos:int, ciclos_ociosos:int,
+                 ociosos_por_nucleo:list[int]|None=None) -> None:
+        '''Construtor da classe.'''
+        self.ingresso = ingresso
+        self.inicio = inicio
+        self.fim = fim
+        self.duracao = duracao
+        self.prioridade = prioridade
+        self.total_ciclos = total_ciclos
+        self.ciclos_ociosos = ciclos_ociosos
+        self.ociosos_por_nucleo = ociosos_por_nucleo or [ciclos_ociosos]
+
+    @property
+    def num_nucleos(self) -> int:
+        '''Número de núcleos da simulação.'''
+        return len(self.ociosos_por_nucleo)
+
+def colunas_da_simulacao(info_saida:c.InfoSaida) -> Colunas:
+    '''Monta as colunas a partir do InfoSaida de uma simulação, inclusive com tarefas concluídas
+    descarregadas em disco. As métricas não dependem da ordem das tarefas, então os registros de
+    tamanho fixo dos blocos em disco são lidos de uma só vez e os das tarefas em memória são
+    convertidos por np.fromiter, sem um laço em Python por tarefa.'''
+    em_memoria = info_saida.tarefas_concluidas
+    partes = [np.frombuffer(bloco, dtype=REGISTRO) for bloco in info_saida.registros_descarregados()]
+    partes.append(np.fromiter(map(c.campos_registro, em_memoria), dtype=REGISTRO,
+                              count=len(em_memoria)))
+    registros = np.concatenate(partes)
+    campos = [np.ascontiguousarray(registros[campo]) for campo in c.CAMPOS_REGISTRO]
+
+    ociosos_por_nucleo = []
+    for linha in info_saida.linhas_nucleos:
+        ociosos = np.fromiter(map(operator.is_, linha.ids_segmentos, itertools.repeat(None)),
+                              dtype=bool, count=len(linha.ids_segmentos))
+        duracoes = np.array(linha.duracoes_segmentos, dtype=np.int64)
+        ociosos_por_nucleo.append(int(duracoes[ociosos].sum()))
+    return Colunas(*campos, total_ciclos=info_saida.total_ciclos,
+                   ciclos_ociosos=sum(ociosos_por_nucleo), ociosos_por_nucleo=ociosos_por_nucleo)
+
+def colunas_do_rastro(caminho:str) -> Colunas:
+    '''Monta as colunas diretamente dos registros de um arquivo de rastro binário, mapeados em
+    memória, sem decodificar registro por registro.'''
+    with rastro.Rastro(caminho) as r:
+        num_segmentos, num_tarefas, total_ciclos = r.num_segmentos, r.num_tarefas, r.total_ciclos
+
+    inicio_segmentos = rastro.CABECALHO.size
+    inicio_tarefas = inicio_segmentos + num_segmentos * rastro.SEGMENTO.size
+    segmentos = _mapeia(caminho, inicio_segmentos, num_segmentos, 3)
+    tarefas = _mapeia(caminho, inicio_tarefas, num_tarefas, 8)
+
+    ciclos_ociosos = int(segmentos[segmentos[:, 0] == -1, 2].sum())
+    # Colunas do registro de tarefa: id, ingresso, início, fim, duração, prioridade, turnaround, espera
+    return Colunas(tarefas[:, 1], tarefas[:, 2], tarefas[:, 3], tarefas[:, 4], tarefas[:, 5],
+                   total_ciclos=total_ciclos, ciclos_ociosos=ciclos_ociosos)
+
+def _mapeia(caminho:str, posicao:int, linhas:int, colunas:int) -> np.ndarray:
+    '''Mapeia em memória uma seção de registros de inteiros de 64 bits do rastro.'''
+    if linhas == 0:
+        return np.empty((0, colunas), dtype=np.int64)
+    return np.memmap(caminho, dtype="<i8", mode="r", offset=posicao, shape=(linhas, colunas))
+
+def resumo(valores:np.ndarray) -> dict:
+    '''Retorna média, percentis e máximo de uma coluna de valores.'''
+    if len(valores) == 0:
+        return {"media": None, **{f"p{p}": None for p in PERCENTIS}, "max": None}
+    percentis = np.percentile(valores, PERCENTIS)
+    return {"media": float(valores.mean()),
+            **{f"p{p}": float(v) for p, v in zip(PERCENTIS, percentis)},
+            "max": int(valores.max())}
+
+def _ordem_por_prioridade(prioridade:np.ndarray) -> np.ndarray:
+    '''Retorna os índices das tarefas agrupados por prioridade. Como costuma haver poucos valores
+    de prioridade, eles são deslocados para 16 bits quando possível, o que permite ao NumPy usar a
+    ordenação radix, bem mais rápida que a de inteiros de 64 bits.'''
+    menor = prioridade.min()
+    if prioridade.max() - menor < 1 << 16:
+        return np.argsort((prioridade - menor).astype(np.uint16), kind="stable")
+    return np.argsort(prioridade, kind="stable")
+
+def calcula(colunas:Colunas) -> dict:
+    '''Calcula as métricas da execução: turnaround, espera e resposta (do ingresso ao início da
+    execução) de cada tarefa, resumidos por média, percentis e máximo; vazão (tarefas concluídas por
+    ciclo); utilização da CPU (fração de ciclos não ociosos, somados todos os núcleos); e os mesmos
+    resumos por prioridade original. Com vários núcleos, inclui também a utilização de cada um.'''
+    turnaround = colunas.fim - colunas.ingresso
+    espera = turnaround - colunas.duracao
+    resposta = colunas.inicio - colunas.ingresso
+    num_tarefas = len(turnaround)
+    total = colunas.total_ciclos
+
+    por_prioridade = {}
+    if num_tarefas:
+        ordem = _ordem_por_prioridade(colunas.prioridade)
+        prioridades, inicios = np.unique(colunas.prioridade[ordem], return_index=True)
+        grupos = np.split(ordem, inicios[1:])
+        for prioridade, grupo in zip(prioridades, grupos):
+            por_prioridade[str(prioridade)] = {
+                "tarefas": len(grupo),
+                "turnaround": resumo(turnaround[grupo]),
+                "espera": resumo(espera[grupo]),
+                "resposta": resumo(resposta[grupo]),
+            }
+
+    capacidade = total * colunas.num_nucleos
+    metricas = {
+        "tarefas": num_tarefas,
+        "ciclos": total,
+        "ciclos_ociosos": colunas.ciclos_ociosos,
+        "vazao": num_tarefas / total if total else 0.0,
+        "utilizacao": (capacidade - colunas.ciclos_ociosos) / capacidade if capacidade else 0.0,
+        "turnaround": resumo(turnaround),
+        "espera": resumo(espera),
+        "resposta": resumo(resposta),
+        "por_prioridade": por_prioridade,
+    }
+    if colunas.num_nucleos > 1:
+        metricas["nucleos"] = colunas.num_nucleos
+        metricas["utilizacao_por_nucleo"] = [(total - ociosos) / total if total else 0.0
+                                             for ociosos in colunas.ociosos_por_nucleo]
+    return metricas
+
+def grava(metricas:dict, caminho:str):
+    '''Grava as métricas em um arquivo JSON.'''
+    with open(caminho, "w") as arquivo:
+        json.dump(metricas, arquivo, indent=2)
+
+def formata(metricas:dict) -> str:
+    '''Formata as métricas como um relatório de texto.'''
+    def linha(nome:str, r:dict) -> str:
+        valores = [r["media"], *(r[f"p{p}"] for p in PERCENTIS), r["max"]]
+        return f"{nome:<12}" + "".join(f"{v:>12.1f}" if v is not None else f"{'-':>12}" for v in valores)
+
+    cabecalho = f"{'':<12}{'média':>12}" + "".join(f"{f'p{p}':>12}" for p in PERCENTIS) + f"{'máx':>12}"
+    linhas = [
+        f"Tarefas: {metricas['tarefas']}    Ciclos: {metricas['ciclos']} "
+        f"({metricas['ciclos_ociosos']} ociosos)",
+        f"Vazão: {metricas['vazao']:.4f} tarefas/ciclo    Utilização da CPU: {metricas['utilizacao']:.1%}",
+    ]
+    if "utilizacao_por_nucleo" in metricas:
+        por_nucleo = metricas["utilizacao_por_nucleo"]
+        linhas.append(f"Núcleos: {metricas['nucleos']}    Utilização por núcleo: "
+                      f"mín. {min(por_nucleo):.1%}, máx. {max(por_nucleo):.1%}")
+    linhas += [
+        "",
+        cabecalho,
+        linha("Turnaround", metricas["turnaround"]),
+        linha("Espera", metricas["espera"]),
+        linha("Resposta", metricas["resposta"]),
+    ]
+    if metricas["por_prioridade"]:
+        linhas += ["", f"{'Prioridade':<12}{'tarefas':>12}{'turnaround':>12}{'espera':>12}{'resposta':>12}"]
+        for prioridade, m in metricas["por_prioridade"].items():
+            linhas.append(f"{prioridade:<12}{m['tarefas']:>12}{m['turnaround']['media']:>12.1f}"
+                          f"{m['espera']['media']:>12.1f}{m['resposta']['media']:>12.1f}")
+    return "\n".join(linhas)
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        sys.exit("Uso: python metricas.py <arquivo_rastro> [--json CAMINHO]")
+    try:
+        metricas = calcula(colunas_do_rastro(sys.argv[1]))
+    except (OSError, ValueError) as erro:
+        sys.exit(f"Erro: {erro}")
+    print(formata(metricas))
+    arquivo_json = valor_da_opcao(sys.argv[2:], "--json")
+    if arquivo_json is not None:
+        grava(metricas, arquivo_json)
@@ -0,0 +1,162 @@
+import os
+import json
+import struct
+
+# Cada mensagem trafega em um quadro: cabeçalho com o tamanho do conteúdo e o codec usado para
+# codificá-lo, seguido do conteúdo. Assim mensagens de qualquer tamanho, ou várias mensagens
+# seguidas na mesma conexão, são separadas corretamente por quem recebe.
+CABECALHO = struct.Struct("!IB")  # tamanho do conteúdo, identificador do codec
+
+class CodecJSON:
+    '''Codifica a mensagem como JSON. Aceita qualquer mensagem e é legível ao depurar o tráfego.'''
+    ID = 0
+
+    def codifica(self, data: dict) -> bytes|None:
+        '''Retorna o conteúdo codificado da mensagem.'''
+        return json.dumps(data).encode()
+
+    def decodifica(self, conteudo: bytes) -> dict:
+        '''Reconstrói a mensagem a partir do conteúdo codificado.'''
+        return json.loads(conteudo.decode())
+
+class CodecBinario:
+    '''Codifica as mensagens mais frequentes (o ciclo e as confirmações de ciclo, com os lotes de
+    tarefas que carregam) em campos de tamanho fixo com struct, evitando o custo de gerar e
+    interpretar JSON. O primeiro byte indica o formato. Mensagens com outros campos não são
+    suportadas (codifica retorna None) e seguem como JSON.'''
+    ID = 1
+
+    CICLO = struct.Struct("!Bq")              # formato, valor
+    CICLO_LOTE = struct.Struct("!Bq?I")       # formato, valor, emissão finalizada, nº de tarefas
+    ACK_EMISSOR = struct.Struct("!Bq??qI")    # formato, ciclo, emissão finalizada, há próximo
+                                              # ingresso, próximo ingresso, nº de tarefas
+    ACK_ESCALONADOR = struct.Struct("!Bq?")   # formato, ciclo, ocioso
+    ITEM_TAREFA = struct.Struct("!qqqH")      # ingresso, duração, prioridade, tamanho do id
+
+    F_CICLO = 2
+    F_CICLO_LOTE = 3
+    F_ACK_EMISSOR = 4
+    F_ACK_ESCALONADOR = 5
+
+    CAMPOS_TAREFA = {"tipo", "id", "ingresso", "duracao", "prioridade"}
+    CAMPOS_CICLO = {"tipo", "valor"}
+    CAMPOS_CICLO_LOTE = {"tipo", "valor", "tarefas", "emissao_finalizada"}
+    CAMPOS_ACK_EMISSOR = {"tipo", "origem", "ciclo", "tarefas", "emissao_finalizada", "proximo_ingresso"}
+    CAMPOS_ACK_ESCALONADOR = {"tipo", "origem", "ciclo", "ocioso"}
+
+    def codifica(self, data: dict) -> bytes|None:
+        '''Retorna o conteúdo codificado da mensagem, ou None se ela não tiver formato binário.'''
+        tipo = data.get("tipo")
+        campos = data.keys()
+        try:
+            if tipo == "ciclo" and campos == self.CAMPOS_CICLO:
+                return self.CICLO.pack(self.F_CICLO, data["valor"])
+            if tipo == "ciclo" and campos == self.CAMPOS_CICLO_LOTE:
+                return self.CICLO_LOTE.pack(self.F_CICLO_LOTE, data["valor"], data["emissao_finalizada"],
+                                            len(data["tarefas"])) + self._codifica_tarefas(data["tarefas"])
+            if tipo == "ack" and data.get("origem") == "emissor" and campos == self.CAMPOS_ACK_EMISSOR:
+                proximo = data["proximo_ingresso"]
+                return self.ACK_EMISSOR.pack(self.F_ACK_EMISSOR, data["ciclo"], data["emissao_finalizada"],
+                                             proximo is not None, proximo or 0, len(data["tarefas"])) \
+                    + self._codifica_tarefas(data["tarefas"])
+            if tipo == "ack" and data.get("origem") == "escalonador" and campos == self.CAMPOS_ACK_ESCALONADOR:
+                return self.ACK_ESCALONADOR.pack(self.F_ACK_ESCALONADOR, data["ciclo"], data["ocioso"])
+        except (struct.error, AttributeError, TypeError, ValueError):
+            # Valores fora do intervalo ou de tipo inesperado
+            return None
+        return None
+
+    def _codifica_tarefas(self, tarefas: list[dict]) -> bytes:
+        '''Codifica um lote de tarefas, uma após a outra. Levanta ValueError se alguma delas não
+        tiver exatamente os campos de Tarefa.to_dict.'''
+        partes = []
+        for tarefa in tarefas:
+            if tarefa.keys() != self.CAMPOS_TAREFA:
+                raise ValueError("Tarefa sem formato binário.")
+            id_tarefa = tarefa["id"].encode()
+            partes.append(self.ITEM_TAREFA.pack(tarefa["ingresso"], tarefa["duracao"],
+                                                tarefa["prioridade"], len(id_tarefa)))
+            partes.append(id_tarefa)
+        return b"".join(partes)
+
+    def _decodifica_tarefas(self, conteudo: bytes, inicio: int, quantidade: int) -> list[dict]:
+        '''Decodifica um lote de tarefas que começa na posição informada do conteúdo. Levanta
+        ValueError se o conteúdo terminar antes do lote.'''
+        tarefas = []
+        for _ in range(quantidade):
+            ingresso, duracao, prioridade, tamanho_id = self.ITEM_TAREFA.unpack_from(conteudo, inicio)
+            inicio += self.ITEM_TAREFA.size
+            if inicio + tamanho_id > len(conteudo):
+                raise ValueError("Lote de tarefas incompleto.")
+            id_tarefa = conteudo[inicio:inicio + tamanho_id].decode()
+            inicio += tamanho_id
+            tarefas.append({"tipo": "tarefa", "id": id_tarefa, "ingresso": ingresso,
+                            "duracao": duracao, "prioridade": prioridade})
+        return tarefas
+
+    def decodifica(self, conteudo: bytes) -> dict:
+        '''Reconstrói a mensagem a partir do conteúdo codificado.'''
+        formato = conteudo[0]
+        if formato == self.F_CICLO:
+            _, valor = self.CICLO.unpack(conteudo)
+            return {"tipo": "ciclo", "valor": valor}
+        if formato == self.F_CICLO_LOTE:
+            _, valor, emissao_finalizada, quantidade = self.CICLO_LOTE.unpack_from(conteudo)
+            return {"tipo": "ciclo", "valor": valor,
+                    "tarefas": self._decodifica_tarefas(conteudo, self.CICLO_LOTE.size, quantidade),
+                    "emissao_finalizada": emissao_finalizada}
+        if formato == self.F_ACK_EMISSOR:
+            _, ciclo, emissao_finalizada, ha_proximo, proximo, quantidade = self.ACK_EMISSOR.unpack_from(conteudo)
+            return {"tipo": "ack", "origem": "emissor", "ciclo": ciclo,
+                    "tarefas": self._decodifica_tarefas(conteudo, self.ACK_EMISSOR.size, quantidade),
+                    "emissao_finalizada": emissao_finalizada,
+                    "proximo_ingresso": proximo if ha_proximo else None}
+        if formato == self.F_ACK_ESCALONADOR:
+            _, ciclo, ocioso = self.ACK_ESCALONADOR.unpack(conteudo)
+            return {"tipo": "ack", "origem": "escalonador", "ciclo": ciclo, "ocioso": ocioso}
+        raise ValueError(f"Formato binário desconhecido: {formato}.")
+
+CODECS = {"json": CodecJSON(), "binario": CodecBinario()}
+_CODECS_POR_ID = {codec.ID: codec for codec in CODECS.values()}
+
+# Codec usado para enviar mensagens. Pode ser escolhido pela variável de ambiente
+# ESCALONAMENTO_CODEC, herdada pelos processos iniciados pelo main.py.
+codec_ativo = CODECS[os.environ.get("ESCALONAMENTO_CODEC", "binario")]
+
+def define_codec(nome: str):
+    '''Escolhe o codec usado nos próximos envios ("binario" ou "json"). O recebimento aceita
+    qualquer codec, já que cada quadro informa com qual foi codificado.'''
+    global codec_ativo
+    codec_ativo = CODECS[nome]
+
+def codifica_quadro(data: dict) -> bytes:
+    '''Monta o quadro da mensagem com o codec ativo. Mensagens que o codec ativo não sabe
+    representar são enviadas em JSON.'''
+    codec = codec_ativo
+    conteudo = codec.codifica(data)
+    if conteudo is None:
+        codec = CODECS["json"]
+        conteudo = codec.codifica(data)
+    return CABECALHO.pack(len(conteudo), codec.ID) + conteudo # type: ignore
+
+def le_quadro(fluxo) -> tuple[int, bytes]|None:
+    '''Lê um quadro completo do fluxo (arquivo binário da conexão). Retorna o identificador do
+    codec e o conteúdo, ou None se a conexão foi encerrada.'''
+    cabecalho = fluxo.read(CABECALHO.size)
+    if len(cabecalho) < CABECALHO.size:
+        return None
+    tamanho, codec_id = CABECALHO.unpack(cabecalho)
+    conteudo = fluxo.read(tamanho)
+    if len(conteudo) < tamanho:
+        return None
+    return codec_id, conteudo
+
+def decodifica_quadro(codec_id: int, conteudo: bytes) -> dict:
+    '''Decodifica o conteúdo de um quadro com o codec informado no seu cabeçalho. Qualquer
+    conteúdo malformado resulta em ValueError.'''
+    if codec_id not in _CODECS_POR_ID:
+        raise ValueError(f"Codec desconhecido: {codec_id}.")
+    try:
+        return _CODECS_POR_ID[codec_id].decodifica(conteudo)
+    except (struct.error, IndexError) as erro:
+        raise ValueError(f"Conteúdo inválido para o codec {codec_id}.") from erro
@@ -0,0 +1,197 @@
+import mmap
+import shutil
+import struct
+import sys
+import tempfile
+from array import array
+from typing import Iterator
+import classes as c
+
+# Arquivo de rastro: versão binária e compacta do resultado da simulação, com registros de tamanho
+# fixo que podem ser lidos diretamente de um arquivo mapeado em memória, sem interpretar texto.
+#
+#   cabeçalho    mágico, versão, total de ciclos, nº de segmentos, nº de tarefas, nº de ids
+#   segmentos    um registro por segmento da linha do tempo: índice do id (-1 se ocioso), ciclo
+#                inicial e duração
+#   tarefas      um registro por tarefa concluída, em ordem de id: índice do id, ingresso, início,
+#                fim, duração, prioridade, turnaround e espera
+#   ids          posições de cada id no bloco de texto (nº de ids + 1 posições), seguidas do bloco
+#                com os ids em UTF-8
+#
+# Todos os inteiros são de 64 bits little-endian, e todas as seções começam em posições múltiplas
+# de 8 bytes.
+MAGICO = b"ESCR"
+VERSAO = 1
+CABECALHO = struct.Struct("<4sIqqqq")
+SEGMENTO = struct.Struct("<qqq")
+TAREFA = struct.Struct("<qqqqqqqq")
+POSICAO = struct.Struct("<q")
+
+# Quantidade de registros agrupados em cada escrita ou leitura
+REGISTROS_POR_BLOCO = 65536
+
+def _escreve_inteiros(arquivo, valores:array):
+    '''Escreve um array de inteiros de 64 bits em little-endian.'''
+    if sys.byteorder != "little":
+        valores.byteswap()
+    arquivo.write(valores.tobytes())
+
+def grava_rastro(info_saida:c.InfoSaida, caminho:str):
+    '''Grava o resultado da simulação no formato de rastro binário. As tarefas são percorridas uma
+    única vez, em ordem de id, com InfoSaida.tarefas_em_ordem, inclusive as descarregadas em disco,
+    e seus registros são escritos em blocos à medida que são lidos. A tabela de ids é acumulada em
+    arquivos temporários e copiada para o fim do rastro, e o cabeçalho e os segmentos, que dependem
+    dos índices dos ids, são escritos por último, no início do arquivo. Assim, a memória usada não
+    depende do número de tarefas concluídas além da linha do tempo, já mantida por InfoSaida. O
+    formato tem uma única linha do tempo, por isso simulações com vários núcleos não são aceitas
+    (ValueError).'''
+    if info_saida.num_nucleos > 1:
+        raise ValueError("O rastro binário não suporta simulações com vários núcleos.")
+    linha:c.LinhaDoTempo = info_saida.linha_do_tempo # type: ignore
+    # Os ids das tarefas são numerados na ordem dos registros de tarefa; ids que só aparecem na
+    # linha do tempo vão para o fim da tabela. Só os ids da linha do tempo precisam de um índice
+    # consultável, para os segmentos.
+    indices:dict[str, int|None] = dict.fromkeys(id for id in linha.ids_segmentos
+                                                if id is not None)
+
+    with open(caminho, "wb") as arquivo, tempfile.TemporaryFile() as posicoes, \
+         tempfile.TemporaryFile() as textos:
+        arquivo.seek(CABECALHO.size + len(linha.ids_segmentos) * SEGMENTO.size)
+        bloco = array("q")
+        bloco_posicoes, bloco_textos = array("q", [0]), []
+        posicao = 0
+
+        def acrescenta_id(id:str):
+            """Acrescenta um id ao fim da tabela de ids"""
+            nonlocal posicao, bloco_posicoes, bloco_textos
+            codificado = id.encode()
+            posicao += len(codificado)
+            bloco_posicoes.append(posicao)
+            bloco_textos.append(codificado)
+            if len(bloco_posicoes) >= REGISTROS_POR_BLOCO:
+                _escreve_inteiros(posicoes, bloco_posicoes)
+                textos.writelines(bloco_textos)
+                bloco_posicoes, bloco_textos = array("q"), []
+
+        num_tarefas = 0
+        for t in info_saida.tarefas_em_ordem():
+            if t.fim_exe is None:
+                raise ValueError(f"Tarefa {t.id} não foi finalizada.")
+            if t.id in indices:
+                indices[t.id] = num_tarefas
+            acrescenta_id(t.id)
+            turnaround = t.fim_exe - t.ingresso
+            bloco.extend((num_tarefas, t.ingresso, t.inicio_exe if t.inicio_exe is not None else -1,
+                          t.fim_exe, t.duracao_total, t.priod_original, turnaround,
+                          turnaround - t.duracao_total))
+            num_tarefas += 1
+            if len(bloco) >= 8 * REGISTROS_POR_BLOCO:
+                _escreve_inteiros(arquivo, bloco)
+                bloco = array("q")
+        _escreve_inteiros(arquivo, bloco)
+
+        num_ids = num_tarefas
+        for id, indice in indices.items():
+            if indice is None:
+                indices[id] = num_ids
+                acrescenta_id(id)
+                num_ids += 1
+        _escreve_inteiros(posicoes, bloco_posicoes)
+        textos.writelines(bloco_textos)
+        for temporario in (posicoes, textos):
+            temporario.seek(0)
+            shutil.copyfileobj(temporario, arquivo)
+
+        arquivo.seek(0)
+        arquivo.write(CABECALHO.pack(MAGICO, VERSAO, linha.total_ciclos,
+                                     len(linha.ids_segmentos), num_tarefas, num_ids))
+        bloco = array("q")
+        for id, inicio, duracao in linha.segmentos():
+            bloco.extend((indices[id] if id is not None else -1, inicio, duracao))
+            if len(bloco) >= 3 * REGISTROS_POR_BLOCO:
+                _escreve_inteiros(arquivo, bloco)
+                bloco = array("q")
+        _escreve_inteiros(arquivo, bloco)
+
+class Rastro:
+    '''Leitor de um arquivo de rastro binário. O arquivo é mapeado em memória e cada registro é
+    decodificado apenas quando acessado, de modo que abrir resultados com milhões de ciclos é
+    imediato e a memória usada não depende do tamanho do arquivo.'''
+    def __init__(self, caminho:str) -> None:
+        '''Abre e mapeia o arquivo, validando o cabeçalho. Levanta ValueError se o arquivo não for
+        um rastro válido.'''
+        with open(caminho, "rb") as arquivo:
+            try:
+                self._mapa = mmap.mmap(arquivo.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError as erro:  # arquivo vazio
+                raise ValueError(f"'{caminho}' não é um arquivo de rastro.") from erro
+
+        if len(self._mapa) < CABECALHO.size:
+            self._mapa.close()
+            raise ValueError(f"'{caminho}' não é um arquivo de rastro.")
+        magico, versao, self.total_ciclos, self.num_segmentos, self.num_tarefas, self.num_ids = \
+            CABECALHO.unpack_from(self._mapa)
+        if magico != MAGICO or versao != VERSAO:
+            self._mapa.close()
+            raise ValueError(f"'{caminho}' não é um arquivo de rastro na versão {VERSAO}.")
+
+        self._inicio_segmentos = CABECALHO.size
+        self._inicio_tarefas = self._inicio_segmentos + self.num_segmentos * SEGMENTO.size
+        self._inicio_posicoes = self._inicio_tarefas + self.num_tarefas * TAREFA.size
+        self._inicio_textos = self._inicio_posicoes + (self.num_ids + 1) * POSICAO.size
+
+    def id(self, indice:int) -> str|None:
+        '''Retorna o id com o índice informado, ou None para o índice -1 (ciclos ociosos).'''
+        if indice < 0:
+            return None
+        inicio, = POSICAO.unpack_from(self._mapa, self._inicio_posicoes + indice * POSICAO.size)
+        fim, = POSICAO.unpack_from(self._mapa, self._inicio_posicoes + (indice + 1) * POSICAO.size)
+        return self._mapa[self._inicio_textos + inicio:self._inicio_textos + fim].decode()
+
+    def segmento(self, indice:int) -> tuple[str|None, int, int]:
+        '''Retorna o segmento (id, ciclo inicial, duração) com o índice informado.'''
+        if not 0 <= indice < self.num_segmentos:
+            raise IndexError(indice)
+        id, inicio, duracao = SEGMENTO.unpack_from(self._mapa, self._inicio_segmentos + indice * SEGMENTO.size)
+        return self.id(id), inicio, duracao
+
+    def _percorre(self, formato:struct.Struct, inicio:int, quantidade:int) -> Iterator[tuple]:
+        '''Decodifica em sequência os registros de uma seção, copiando do mapeamento um bloco de
+        registros por vez.'''
+        for primeiro in range(0, quantidade, REGISTROS_POR_BLOCO):
+            ultimo = min(primeiro + REGISTROS_POR_BLOCO, quantidade)
+            yield from formato.iter_unpack(self._mapa[inicio + primeiro * formato.size:
+                                                      inicio + ultimo * formato.size])
+
+    def segmentos(self) -> Iterator[tuple[str|None, int, int]]:
+        '''Percorre os segmentos da linha do tempo, em ordem.'''
+        for id, inicio, duracao in self._percorre(SEGMENTO, self._inicio_segmentos, self.num_segmentos):
+            yield self.id(id), inicio, duracao
+
+    def tarefa(self, indice:int) -> dict:
+        '''Retorna o registro da tarefa com o índice informado (tarefas em ordem de id).'''
+        if not 0 <= indice < self.num_tarefas:
+            raise IndexError(indice)
+        return self._registro_tarefa(TAREFA.unpack_from(self._mapa, self._inicio_tarefas + indice * TAREFA.size))
+
+    def tarefas(self) -> Iterator[dict]:
+        '''Percorre os registros das tarefas, em ordem de id.'''
+        for campos in self._percorre(TAREFA, self._inicio_tarefas, self.num_tarefas):
+            yield self._registro_tarefa(campos)
+
+    def _registro_tarefa(self, campos:tuple) -> dict:
+        '''Monta o dicionário de uma tarefa a partir dos campos do seu registro.'''
+        id, ingresso, inicio, fim, duracao, prioridade, turnaround, espera = campos
+        return {"id": self.id(id), "ingresso": ingresso, "inicio": inicio if inicio >= 0 else None,
+                "fim": fim, "duracao": duracao, "prioridade": prioridade,
+                "turnaround": turnaround, "espera": espera}
+
+    def close(self):
+        '''Libera o mapeamento do arquivo.'''
+        self._mapa.close()
+
+    def __enter__(self) -> "Rastro":
+        return self
+
+    def __exit__(self, *_):
+        self.close()
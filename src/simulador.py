@@ -0,0 +1,108 @@
+import sys
+import os
+import classes as c
+import leitura
+import rastro
+from emissor import carregar_tarefas
+from escalonador import Escalonador, valor_da_opcao, valor_inteiro_da_opcao, algoritmo_valido, \
+    parametros_validos, QUANTUM_PADRAO, FATOR_ENVELHECIMENTO_PADRAO, NUCLEOS_PADRAO
+
+def simula(entrada:str, algoritmo:c.Algoritmo, verboso:bool=False, streaming:bool=False,
+           limite_concluidas:int|None=None, quantum:int=QUANTUM_PADRAO,
+           fator_envelhecimento:int=FATOR_ENVELHECIMENTO_PADRAO,
+           num_nucleos:int=NUCLEOS_PADRAO) -> c.InfoSaida:
+    '''Executa a simulação completa em um único processo, sem sockets nem espera entre ciclos. O
+    papel do Clock é feito por um laço que avança o tempo simulado, e o do Emissor por uma consulta
+    às tarefas cujo ingresso coincide com o ciclo atual. Enquanto não há tarefas prontas, o tempo
+    salta direto para o próximo ingresso. A ordem dos eventos em cada ciclo é a mesma da execução
+    distribuída: primeiro o Emissor entrega as tarefas que ficaram prontas e só então o
+    Escalonador executa o ciclo. Com streaming=True, o arquivo de entrada é lido sob demanda em vez
+    de ser carregado por inteiro, e com limite_concluidas as tarefas concluídas além desse número
+    ficam em disco. O quantum (Round-Robin), o fator de envelhecimento (PRIOd) e o número de
+    núcleos são repassados ao Escalonador. Retorna o InfoSaida com os dados da execução.'''
+    escalonador = Escalonador(algoritmo, verboso, limite_concluidas, quantum, fator_envelhecimento,
+                              num_nucleos)
+
+    # Tarefas ainda não emitidas, em ordem de ingresso
+    if streaming:
+        tarefas_agendadas = c.AgendaTarefas(leitura.le_tarefas_em_ordem(entrada), ordenadas=True)
+    else:
+        tarefas_agendadas = c.AgendaTarefas(carregar_tarefas(entrada))
+
+    return executa(escalonador, tarefas_agendadas)
+
+def executa(escalonador:Escalonador, tarefas_agendadas:c.AgendaTarefas) -> c.InfoSaida:
+    '''Laço da simulação direta (ver simula), a partir de um Escalonador e das tarefas já
+    agendadas. Separado da leitura da entrada para que o escalonamento possa ser medido sozinho
+    (ver bench.py).'''
+    clock = 0
+    while True:
+        # Papel do Emissor: entrega as tarefas do ciclo e avisa quando não restar nenhuma
+        escalonador.recebe_tarefas(tarefas_agendadas.libera(clock))
+        if tarefas_agendadas.is_empty() and not escalonador.emissao_finalizada:
+            escalonador.finaliza_emissao()
+
+        # Papel do Escalonador
+        if escalonador.executa_ciclo(clock):
+            break
+
+        # Papel do Clock: sem tarefas prontas, pula direto para o próximo ingresso
+        proximo_ingresso = tarefas_agendadas.proximo_ingresso()
+        if escalonador.esta_ocioso() and proximo_ingresso is not None:
+            clock = proximo_ingresso
+        else:
+            clock += 1
+
+    return escalonador.info_saida
+
+def main(entrada:str, algoritmo:c.Algoritmo, verboso:bool=False, streaming:bool=False,
+         saida:str="saida.txt", arquivo_rastro:str|None=None, limite_concluidas:int|None=None,
+         arquivo_metricas:str|None=None, quantum:int=QUANTUM_PADRAO,
+         fator_envelhecimento:int=FATOR_ENVELHECIMENTO_PADRAO, num_nucleos:int=NUCLEOS_PADRAO):
+    '''Executa a simulação direta e gera o arquivo de saída, idêntico ao da execução distribuída, e
+    opcionalmente o rastro binário e o arquivo JSON de métricas (ver metricas.py).'''
+    print(f"[Simulador] Simulando '{entrada}' com o algoritmo {algoritmo.name}...")
+    info_saida = simula(entrada, algoritmo, verboso, streaming, limite_concluidas, quantum,
+                        fator_envelhecimento, num_nucleos)
+    info_saida.gera_saida(saida)
+    print(f"[Simulador] {info_saida.total_ciclos} ciclos simulados. Arquivo '{saida}' gerado com sucesso.")
+    if num_nucleos > 1:
+        print(f"[Simulador] {info_saida.descreve_utilizacao()}")
+    if arquivo_rastro is not None:
+        rastro.grava_rastro(info_saida, arquivo_rastro)
+        print(f"[Simulador] Rastro binário '{arquivo_rastro}' gerado com sucesso.")
+    if arquivo_metricas is not None:
+        import metricas  # depende do numpy, opcional
+        resultado = metricas.calcula(metricas.colunas_da_simulacao(info_saida))
+        metricas.grava(resultado, arquivo_metricas)
+        print(metricas.formata(resultado))
+        print(f"[Simulador] Métricas gravadas em '{arquivo_metricas}'.")
+
+if __name__ == "__main__":
+    if len(sys.argv) < 3:
+        sys.exit("Uso: python simulador.py <arquivo_entrada> <algoritmo> [--streaming] "
+                 "[--saida CAMINHO] [--rastro CAMINHO] [--limite-concluidas N] "
+                 "[--metricas CAMINHO] [--quantum N] [--envelhecimento N] [--nucleos N]")
+
+    entrada = sys.argv[1]
+    if not os.path.isfile(entrada):
+        sys.exit(f"Erro: O arquivo '{entrada}' não existe ou não é um arquivo válido.")
+    opcoes = sys.argv[3:]
+    try:
+        algoritmo = algoritmo_valido(sys.argv[2])
+        quantum, fator_envelhecimento, num_nucleos = parametros_validos(
+            valor_inteiro_da_opcao(opcoes, "--quantum", minimo=None),
+            valor_inteiro_da_opcao(opcoes, "--envelhecimento", minimo=None),
+            valor_inteiro_da_opcao(opcoes, "--nucleos", minimo=None))
+    except ValueError as erro:
+        sys.exit(f"Erro: {erro}")
+
+    try:
+        main(entrada, algoritmo, streaming="--streaming" in opcoes,
+             saida=valor_da_opcao(opcoes, "--saida") or "saida.txt",
+             arquivo_rastro=valor_da_opcao(opcoes, "--rastro"),
+             limite_concluidas=valor_inteiro_da_opcao(opcoes, "--limite-concluidas"),
+             arquivo_metricas=valor_da_opcao(opcoes, "--metricas"),
+             quantum=quantum, fator_envelhecimento=fator_envelhecimento, num_nucleos=num_nucleos)
+    except ValueError as erro:  # arquivo de entrada inválido
+        sys.exit(f"Erro: {erro}")
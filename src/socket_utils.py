@@ -1,39 +1,131 @@
+import os
 import socket
-import json
 import threading
 import time
+import traceback
+import protocolo
 
 HOST = 'localhost'
 
-def send_message(port: int, data: dict):
-    '''Envia um dicionário como JSON via socket para a porta informada.'''
+# Espera inicial e máxima entre tentativas de (re)conexão, em segundos
+ESPERA_INICIAL = 0.01
+ESPERA_MAXIMA = 1.0
+
+# Tempo máximo, em segundos, tentando conectar ou enviar a um destino que não responde. Passado o
+# prazo, o envio desiste com ConnectionError em vez de esperar para sempre por um processo que
+# morreu. É também o tempo máximo que o Clock espera pela confirmação de um ciclo. Pode ser ajustado
+# pela variável de ambiente, já que o Emissor pode demorar a subir ao carregar arquivos de entrada
+# grandes.
+PRAZO_CONEXAO = float(os.environ.get("ESCALONAMENTO_PRAZO_CONEXAO", "60"))
+
+# Conexões abertas por porta de destino, reaproveitadas entre mensagens. Cada conexão tem sua
+# própria trava, já que threads diferentes do mesmo processo podem enviar para a mesma porta.
+_conexoes:dict[int, tuple[socket.socket, threading.Lock]] = {}
+_trava_conexoes = threading.Lock()
+
+def _aguarda(espera: float, limite: float, port: int) -> float:
+    '''Dorme antes de uma nova tentativa e retorna a espera seguinte, que cresce até ESPERA_MAXIMA.
+    Levanta ConnectionError se o instante limite já tiver passado.'''
+    if time.monotonic() >= limite:
+        raise ConnectionError(f"A porta {port} não respondeu em {PRAZO_CONEXAO:g} s.")
+    time.sleep(espera)
+    return min(espera * 2, ESPERA_MAXIMA)
+
+def _conecta(port: int) -> socket.socket:
+    '''Abre uma conexão com a porta informada, tentando novamente com espera crescente (limitada a
+    ESPERA_MAXIMA) enquanto o destino ainda não estiver escutando, por até PRAZO_CONEXAO.'''
+    espera = ESPERA_INICIAL
+    limite = time.monotonic() + PRAZO_CONEXAO
     while True:
         try:
-            with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
-                s.connect((HOST, port))
-                s.sendall(json.dumps(data).encode())
-            break
+            s = socket.create_connection((HOST, port))
+            # Mensagens são pequenas e trocadas em sequência: envia sem esperar acumular dados
+            s.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            return s
         except ConnectionRefusedError:
-            time.sleep(0.1)
+            espera = _aguarda(espera, limite, port)
+
+def _conexao(port: int) -> tuple[socket.socket, threading.Lock]:
+    '''Retorna a conexão em cache para a porta informada, abrindo uma nova se necessário.'''
+    with _trava_conexoes:
+        if port not in _conexoes:
+            _conexoes[port] = (_conecta(port), threading.Lock())
+        return _conexoes[port]
+
+def _descarta_conexao(port: int, s: socket.socket):
+    '''Fecha a conexão com falha e a remove do cache, para que a próxima seja aberta do zero.'''
+    with _trava_conexoes:
+        if port in _conexoes and _conexoes[port][0] is s:
+            del _conexoes[port]
+    s.close()
+
+def send_message(port: int, data: dict):
+    '''Envia um dicionário via socket para a porta informada, em um quadro codificado com o codec
+    ativo de protocolo.py. A conexão com cada porta é mantida aberta e reaproveitada; se ela cair,
+    é reaberta e o envio é repetido. Levanta ConnectionError se o destino não puder ser alcançado
+    dentro de PRAZO_CONEXAO.'''
+    mensagem = protocolo.codifica_quadro(data)
+    espera = ESPERA_INICIAL
+    limite = time.monotonic() + PRAZO_CONEXAO
+    while True:
+        s, trava = _conexao(port)
+        try:
+            with trava:
+                s.sendall(mensagem)
+            return
+        except OSError:
+            _descarta_conexao(port, s)
+            espera = _aguarda(espera, limite, port)
+
+def try_send_message(port: int, data: dict) -> bool:
+    '''Como send_message, mas registra a falha em vez de levantar ConnectionError. Usado para
+    avisar os outros processos de que a simulação foi interrompida, quando eles podem já ter
+    terminado. Retorna True se a mensagem foi enviada.'''
+    try:
+        send_message(port, data)
+        return True
+    except ConnectionError as erro:
+        print(f"[SocketUtils] Mensagem '{data.get('tipo')}' não enviada: {erro}")
+        return False
+
+def start_server(my_port: int, on_message, on_error=None):
+    '''Inicia um servidor socket na porta informada e chama on_message(data, addr) quando receber algo.
+    Cada conexão é atendida por uma thread própria e pode trazer várias mensagens, uma por quadro.
+    As chamadas de on_message são feitas uma de cada vez, mesmo vindas de conexões diferentes.
+
+    Uma exceção em on_message é registrada e repassada a on_error(erro), que deve interromper a
+    simulação: como o Clock espera a confirmação de cada ciclo, uma mensagem perdida a travaria.
+    Sem on_error, a exceção só é registrada. A conexão continua sendo atendida.'''
+    trava_mensagens = threading.Lock()
+
+    def connection_thread(conn: socket.socket, addr):
+        with conn, conn.makefile('rb') as fluxo:
+            while (quadro := protocolo.le_quadro(fluxo)) is not None:
+                try:
+                    message = protocolo.decodifica_quadro(*quadro)
+                except ValueError:
+                    # Inclui erros de JSON e de UTF-8. O quadro é descartado sem afetar os seguintes.
+                    print("[SocketUtils] Erro ao decodificar mensagem.")
+                    continue
+                with trava_mensagens:
+                    try:
+                        on_message(message, addr)
+                    except Exception as erro:
+                        print(f"[SocketUtils] Erro ao tratar mensagem '{message.get('tipo')}': {erro}")
+                        traceback.print_exc()
+                        if on_error is not None:
+                            on_error(erro)
 
-def start_server(my_port: int, on_message):
-    '''Inicia um servidor socket na porta informada e chama on_message(data, addr) quando receber algo.'''
     def server_thread():
         with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+            # Permite reutilizar a porta logo após uma simulação anterior (conexões em TIME_WAIT)
+            s.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
             s.bind((HOST, my_port))
             s.listen()
             print(f"[SocketUtils] Escutando na porta {my_port}")
             while True:
                 conn, addr = s.accept()
-                with conn:
-                    data = conn.recv(4096)
-                    if not data:
-                        continue
-                    try:
-                        message = json.loads(data.decode())
-                        on_message(message, addr)
-                    except json.JSONDecodeError:
-                        print("[SocketUtils] Erro ao decodificar JSON.")
+                threading.Thread(target=connection_thread, args=(conn, addr), daemon=True).start()
 
     thread = threading.Thread(target=server_thread, daemon=True)
     thread.start()
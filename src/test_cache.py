@@ -0,0 +1,89 @@
+import os
+import tempfile
+import unittest
+import cache
+import classes as c
+
+# Testes do cache de resultados: chaves, busca e remoção das entradas menos usadas (LRU). Executar
+# na pasta src com python -m unittest test_cache (ou python -m pytest test_cache.py).
+
+class TestCacheResultados(unittest.TestCase):
+    def setUp(self):
+        self.pasta = tempfile.TemporaryDirectory()
+        self.raiz = os.path.join(self.pasta.name, "cache")
+
+    def tearDown(self):
+        self.pasta.cleanup()
+
+    def arquivo(self, nome:str, conteudo:bytes) -> str:
+        '''Grava um arquivo na pasta temporária do teste e retorna seu caminho.'''
+        caminho = os.path.join(self.pasta.name, nome)
+        with open(caminho, "wb") as arquivo:
+            arquivo.write(conteudo)
+        return caminho
+
+    def test_chave_depende_do_conteudo_e_dos_parametros_usados(self):
+        resultados = cache.CacheResultados(self.raiz)
+        entrada = self.arquivo("a.txt", b"t0;0;3;1\n")
+        copia = self.arquivo("b.txt", b"t0;0;3;1\n")
+        outra = self.arquivo("c.txt", b"t0;0;4;1\n")
+        fcfs = resultados.chave(entrada, c.Algoritmo.fcfs)
+        self.assertEqual(resultados.chave(copia, c.Algoritmo.fcfs), fcfs)
+        self.assertEqual(resultados.chave(entrada, c.Algoritmo.fcfs, quantum=7), fcfs)
+        self.assertEqual(resultados.chave(entrada, c.Algoritmo.fcfs, num_nucleos=1), fcfs)
+        self.assertEqual(len({fcfs, resultados.chave(outra, c.Algoritmo.fcfs),
+                              resultados.chave(entrada, c.Algoritmo.sjf),
+                              resultados.chave(entrada, c.Algoritmo.fcfs, num_nucleos=2),
+                              resultados.chave(entrada, c.Algoritmo.rr, quantum=2),
+                              resultados.chave(entrada, c.Algoritmo.rr, quantum=3),
+                              resultados.chave(entrada, c.Algoritmo.priod, fator_envelhecimento=2)}), 7)
+
+    def test_guarda_e_busca(self):
+        resultados = cache.CacheResultados(self.raiz)
+        origem = self.arquivo("saida.txt", b"conteudo")
+        self.assertFalse(resultados.busca("ab01", "saida.txt"))
+        resultados.guarda_arquivo("ab01", "saida.txt", origem)
+        resultados.guarda_json("ab01", "resumo.json", {"tt_medio": 1.5})
+        self.assertTrue(resultados.busca("ab01", "saida.txt", "resumo.json"))
+        self.assertFalse(resultados.busca("ab01", "saida.txt", "metricas.json"))
+        self.assertEqual(resultados.le_json("ab01", "resumo.json"), {"tt_medio": 1.5})
+        destino = os.path.join(self.pasta.name, "copia.txt")
+        resultados.copia("ab01", "saida.txt", destino)
+        with open(destino, "rb") as arquivo:
+            self.assertEqual(arquivo.read(), b"conteudo")
+        self.assertEqual(resultados.tamanho_total, len(b"conteudo") + len('{"tt_medio": 1.5}'))
+
+    def test_remove_as_entradas_usadas_ha_mais_tempo(self):
+        resultados = cache.CacheResultados(self.raiz, limite_bytes=1000)
+        origem = self.arquivo("saida.txt", b"x" * 300)
+        chaves = ["aa01", "bb02", "cc03"]
+        for chave in chaves:
+            resultados.guarda_arquivo(chave, "saida.txt", origem)
+        for instante, chave in enumerate(chaves, start=1):
+            os.utime(resultados._pasta(chave), (instante, instante))
+        # A primeira entrada volta a ser usada e passa a ser a mais recente
+        self.assertTrue(resultados.busca("aa01", "saida.txt"))
+
+        varreduras = []
+        limita = resultados.limita
+        resultados.limita = lambda: (varreduras.append(True), limita())[1]
+        resultados.guarda_arquivo("dd04", "saida.txt", origem)
+        self.assertEqual(len(varreduras), 1)
+        self.assertFalse(resultados.busca("bb02", "saida.txt"))
+        for chave in ("aa01", "cc03", "dd04"):
+            self.assertTrue(resultados.busca(chave, "saida.txt"), chave)
+        self.assertEqual(resultados.tamanho_total, 900)
+
+    def test_gravacoes_abaixo_do_limite_nao_varrem_o_cache(self):
+        resultados = cache.CacheResultados(self.raiz, limite_bytes=10_000)
+        origem = self.arquivo("saida.txt", b"x" * 100)
+        resultados.guarda_arquivo("aa01", "saida.txt", origem)
+        varreduras = []
+        resultados.limita = lambda: varreduras.append(True)
+        for i in range(20):
+            resultados.guarda_arquivo(f"b{i:03d}", "saida.txt", origem)
+        self.assertEqual(varreduras, [])
+        self.assertEqual(resultados.tamanho_total, 2100)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,71 @@
+import os
+import random
+import tempfile
+import unittest
+from array import array
+import classes as c
+import simulador
+
+# Testes do descarregamento em disco das tarefas concluídas (limite_concluidas do InfoSaida).
+# Executar na pasta src com python -m unittest test_descarga (ou python -m pytest test_descarga.py).
+
+def concluida(id:str, ingresso:int, fim:int) -> c.Tarefa:
+    '''Cria uma tarefa já concluída, com um ciclo de duração.'''
+    tarefa = c.Tarefa(id, ingresso, 1, ingresso % 3)
+    tarefa.duracao_resto = 0
+    tarefa.inicio_exe, tarefa.fim_exe = fim - 1, fim
+    return tarefa
+
+class TestDescarga(unittest.TestCase):
+    def test_intercalacao_em_ordem_de_id(self):
+        gerador = random.Random(0)
+        # Ids repetidos e fora de ordem; o ingresso registra a ordem de conclusão
+        ids = [f"t{gerador.randint(0, 40)}" for _ in range(200)]
+        esperado = sorted(((id, i) for i, id in enumerate(ids)), key=lambda par: par[0])
+        for limite in (None, 1, 3, 7, 64, 500):
+            with self.subTest(limite=limite):
+                info_saida = c.InfoSaida(limite_concluidas=limite)
+                for i, id in enumerate(ids):
+                    info_saida.finaliza_tarefa(concluida(id, i, i + 1))
+                self.assertEqual(info_saida.num_concluidas, len(ids))
+                if limite is not None and limite <= len(ids):
+                    self.assertEqual(info_saida.num_descarregadas, len(ids) // limite * limite)
+                    self.assertLess(len(info_saida.tarefas_concluidas), limite)
+                tarefas = list(info_saida.tarefas_em_ordem())
+                self.assertEqual([(t.id, t.ingresso) for t in tarefas], esperado)
+                self.assertTrue(all((t.inicio_exe, t.fim_exe) == (t.ingresso, t.ingresso + 1)
+                                    for t in tarefas))
+
+    def test_registros_descarregados(self):
+        info_saida = c.InfoSaida(limite_concluidas=4)
+        for i in range(10):
+            info_saida.finaliza_tarefa(concluida(f"t{9 - i}", i, i + 1))
+        registros = array("q")
+        for bloco in info_saida.registros_descarregados():
+            registros.frombytes(bloco)
+        campos = len(c.CAMPOS_REGISTRO)
+        self.assertEqual(len(registros), info_saida.num_descarregadas * campos)
+        self.assertEqual(sorted(registros[i * campos] for i in range(len(registros) // campos)),
+                         list(range(8)))
+
+    def test_saida_igual_sem_limite(self):
+        gerador = random.Random(1)
+        tarefas = [(f"t{i}", i // 2, gerador.randint(1, 4), gerador.randint(0, 2)) for i in range(120)]
+        with tempfile.TemporaryDirectory() as pasta:
+            entrada = os.path.join(pasta, "entrada.txt")
+            with open(entrada, "w") as arquivo:
+                arquivo.writelines(f"{id};{ingresso};{duracao};{prioridade}\n"
+                                   for id, ingresso, duracao, prioridade in tarefas)
+            for algoritmo in c.Algoritmo:
+                with self.subTest(algoritmo=algoritmo.name):
+                    conteudos = []
+                    for limite in (None, 1, 13):
+                        saida = os.path.join(pasta, f"saida_{limite}.txt")
+                        simulador.simula(entrada, algoritmo, limite_concluidas=limite).gera_saida(saida)
+                        with open(saida) as arquivo:
+                            conteudos.append(arquivo.read())
+                    self.assertEqual(conteudos[1], conteudos[0])
+                    self.assertEqual(conteudos[2], conteudos[0])
+
+if __name__ == "__main__":
+    unittest.main()
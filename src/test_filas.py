@@ -0,0 +1,128 @@
+import random
+import unittest
+import classes as c
+import simulador
+from escalonador import Escalonador
+
+# Testes das filas de prontas com heap e com deque, comparadas com a lista da versão original do
+# escalonador. Executar na pasta src com python -m unittest test_filas (ou python -m pytest
+# test_filas.py).
+
+def referencia(tarefas:list[tuple[str, int, int, int]], algoritmo:c.Algoritmo) -> tuple[list, dict]:
+    '''Simula as tarefas como na versão original do escalonador: uma FilaProntas em lista, ordenada
+    de forma estável pelo critério do algoritmo antes de escalonar (nos cooperativos, só quando a
+    tarefa do início da fila ainda não começou). Retorna o id executado em cada ciclo (None se
+    ocioso) e o fim de cada tarefa.'''
+    criterio = {c.Algoritmo.sjf: c.Criterio.duracao_total, c.Algoritmo.srtf: c.Criterio.duracao_resto,
+                c.Algoritmo.prioc: c.Criterio.priod_original,
+                c.Algoritmo.priop: c.Criterio.priod_original}[algoritmo]
+    cooperativo = algoritmo in (c.Algoritmo.sjf, c.Algoritmo.prioc)
+    pendentes = sorted(tarefas, key=lambda t: t[1])
+    fila = c.FilaProntas(verboso=False)
+    info_saida = c.InfoSaida()
+    clock = proxima = 0
+    while proxima < len(pendentes) or not fila.is_empty():
+        while proxima < len(pendentes) and pendentes[proxima][1] <= clock:
+            fila.enfilera(c.Tarefa(*pendentes[proxima]))
+            proxima += 1
+        if not fila.is_empty():
+            primeira = fila.fila[0]
+            if not cooperativo or primeira.duracao_resto == primeira.duracao_total:
+                fila.ordena(criterio)
+        fila.escalona(clock, info_saida)
+        clock += 1
+    return info_saida.id_por_clock, {t.id: t.fim_exe for t in info_saida.tarefas_em_ordem()}
+
+def simula(tarefas:list[tuple[str, int, int, int]], algoritmo:c.Algoritmo,
+           fila_prontas:c.FilaProntas|None=None, quantum:int=3) -> c.InfoSaida:
+    '''Simula as tarefas com o Escalonador atual, em um núcleo. Com fila_prontas, ela substitui a
+    fila criada para o algoritmo.'''
+    escalonador = Escalonador(algoritmo, verboso=False, quantum=quantum)
+    if fila_prontas is not None:
+        escalonador.fila_prontas = fila_prontas
+    agenda = c.AgendaTarefas(c.Tarefa(*tarefa) for tarefa in tarefas)
+    return simulador.executa(escalonador, agenda)
+
+def tarefas_com_empates(semente:int, quantidade:int) -> list[tuple[str, int, int, int]]:
+    '''Tarefas com chegadas agrupadas e poucas durações e prioridades distintas, para que quase
+    toda escolha tenha empates.'''
+    gerador = random.Random(semente)
+    tarefas, ingresso = [], 0
+    for i in range(quantidade):
+        ingresso += gerador.choice([0, 0, 1, 2, 6])
+        tarefas.append((f"t{i}", ingresso, gerador.randint(1, 4), gerador.randint(0, 2)))
+    return tarefas
+
+class TestFilaPrioridade(unittest.TestCase):
+    def test_empates_na_ordem_de_chegada(self):
+        fila = c.FilaPrioridade(c.Criterio.priod_original, preemptiva=True, verboso=False)
+        fila.enfilera_lote([c.Tarefa(id, 0, 1, prioridade)
+                            for id, prioridade in [("a", 2), ("b", 1), ("c", 2), ("d", 1)]])
+        self.assertEqual([fila.desenfilera().id for _ in range(4)], ["b", "d", "a", "c"])
+        self.assertTrue(fila.is_empty())
+
+    def test_cooperativa_mantem_a_tarefa_em_execucao(self):
+        fila = c.FilaPrioridade(c.Criterio.duracao_total, preemptiva=False, verboso=False)
+        fila.enfilera(c.Tarefa("longa", 0, 5, 0))
+        self.assertEqual(fila.proxima().id, "longa")
+        fila.enfilera(c.Tarefa("curta", 1, 1, 0))
+        self.assertEqual(fila.proxima().id, "longa")
+        self.assertEqual(fila.desenfilera().id, "longa")
+        self.assertEqual(fila.proxima().id, "curta")
+
+    def test_ordena_por_outro_criterio(self):
+        fila = c.FilaPrioridade(c.Criterio.duracao_resto, preemptiva=True, verboso=False)
+        fila.ordena(c.Criterio.duracao_resto)
+        with self.assertRaises(ValueError):
+            fila.ordena(c.Criterio.priod_original)
+
+    def test_igual_a_lista_ordenada(self):
+        for algoritmo in (c.Algoritmo.sjf, c.Algoritmo.srtf, c.Algoritmo.prioc, c.Algoritmo.priop):
+            for semente in range(25):
+                tarefas = tarefas_com_empates(semente, 20 + 4 * semente)
+                with self.subTest(algoritmo=algoritmo.name, semente=semente):
+                    sequencia, fim = referencia(tarefas, algoritmo)
+                    info_saida = simula(tarefas, algoritmo)
+                    self.assertEqual(info_saida.id_por_clock, sequencia)
+                    self.assertEqual({t.id: t.fim_exe for t in info_saida.tarefas_em_ordem()}, fim)
+
+class TestFilaFifo(unittest.TestCase):
+    def test_operacoes_iguais_as_da_lista(self):
+        gerador = random.Random(0)
+        lista, fifo = c.FilaProntas(verboso=False), c.FilaFifo(verboso=False)
+        for i in range(2000):
+            operacao = gerador.choice(["enfilera", "enfilera", "desenfilera", "rotaciona", "ordena"])
+            if operacao == "enfilera":
+                tarefa = c.Tarefa(f"t{i}", i, gerador.randint(1, 3), 0)
+                lista.enfilera(tarefa)
+                fifo.enfilera(tarefa)
+            elif lista.is_empty():
+                continue
+            elif operacao == "desenfilera":
+                self.assertIs(fifo.desenfilera(), lista.desenfilera())
+            elif operacao == "rotaciona":
+                lista.rotaciona()
+                fifo.rotaciona()
+            else:
+                lista.ordena(c.Criterio.duracao_total)
+                fifo.ordena(c.Criterio.duracao_total)
+            self.assertEqual(fifo.is_empty(), lista.is_empty())
+            if not lista.is_empty():
+                self.assertIs(fifo.proxima(), lista.proxima())
+        self.assertEqual(list(fifo.fila), lista.fila)
+
+    def test_fcfs_e_rr_iguais_aos_da_lista(self):
+        self.assertIsInstance(Escalonador(c.Algoritmo.rr, verboso=False).fila_prontas, c.FilaFifo)
+        for algoritmo, quantum in ((c.Algoritmo.fcfs, 3), (c.Algoritmo.rr, 1), (c.Algoritmo.rr, 2),
+                                   (c.Algoritmo.rr, 3)):
+            for semente in range(15):
+                tarefas = tarefas_com_empates(semente, 20 + 4 * semente)
+                with self.subTest(algoritmo=algoritmo.name, quantum=quantum, semente=semente):
+                    esperado = simula(tarefas, algoritmo, c.FilaProntas(verboso=False), quantum)
+                    obtido = simula(tarefas, algoritmo, quantum=quantum)
+                    self.assertEqual(obtido.id_por_clock, esperado.id_por_clock)
+                    self.assertEqual([(t.id, t.fim_exe) for t in obtido.tarefas_em_ordem()],
+                                     [(t.id, t.fim_exe) for t in esperado.tarefas_em_ordem()])
+
+if __name__ == "__main__":
+    unittest.main()
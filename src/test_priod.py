@@ -0,0 +1,91 @@
+import os
+import random
+import tempfile
+import unittest
+import classes as c
+import simulador
+from escalonador import Escalonador
+
+# Testes do PRIOd com prioridades menores que 1. Executar na pasta src com
+# python -m unittest test_priod (ou python -m pytest test_priod.py).
+
+def referencia_priod(tarefas:list[tuple[str, int, int, int]], fator:int) -> tuple[list, dict]:
+    '''PRIOd como na versão original do escalonador: uma lista reordenada (de forma estável) pela
+    prioridade dinâmica a cada chegada, com envelhecimento max(1, p - fator) das não escolhidas.
+    Retorna o id executado em cada ciclo (None se ocioso) e o fim de cada tarefa.'''
+    pendentes = sorted(tarefas, key=lambda t: t[1])
+    fila:list[list] = []  # [id, restante, dinâmica, original]
+    sequencia:list[str|None] = []
+    fim:dict[str, int] = {}
+    clock = proxima = 0
+    while proxima < len(pendentes) or fila:
+        evento = False
+        while proxima < len(pendentes) and pendentes[proxima][1] <= clock:
+            id, _, duracao, prioridade = pendentes[proxima]
+            fila.append([id, duracao, prioridade, prioridade])
+            proxima += 1
+            evento = True
+        if not fila:
+            sequencia.append(None)
+        else:
+            if evento:
+                fila.sort(key=lambda t: t[2])
+                for tarefa in fila[1:]:
+                    tarefa[2] = max(1, tarefa[2] - fator)
+                fila[0][2] = fila[0][3]
+            fila[0][1] -= 1
+            sequencia.append(fila[0][0])
+            if fila[0][1] == 0:
+                fim[fila.pop(0)[0]] = clock + 1
+        clock += 1
+    return sequencia, fim
+
+def simula_priod(tarefas:list[tuple[str, int, int, int]], fator:int,
+                 num_nucleos:int|None=None) -> c.InfoSaida:
+    '''Simula as tarefas com o PRIOd. Com num_nucleos, usa o caminho de vários núcleos.'''
+    escalonador = Escalonador(c.Algoritmo.priod, verboso=False, fator_envelhecimento=fator)
+    if num_nucleos is not None:
+        escalonador.nucleos = c.Nucleos(num_nucleos)
+    agenda = c.AgendaTarefas(c.Tarefa(id, ingresso, duracao, prioridade)
+                             for id, ingresso, duracao, prioridade in tarefas)
+    return simulador.executa(escalonador, agenda)
+
+def tarefas_aleatorias(semente:int, quantidade:int) -> list[tuple[str, int, int, int]]:
+    '''Tarefas com chegadas agrupadas e prioridades de -2 a 5, metade delas menores que 1.'''
+    gerador = random.Random(semente)
+    tarefas, ingresso = [], 0
+    for i in range(quantidade):
+        ingresso += gerador.choice([0, 0, 1, 1, 2, 5])
+        prioridade = gerador.randint(-2, 5) if gerador.random() < 0.5 else gerador.randint(0, 2)
+        tarefas.append((f"t{i}", ingresso, gerador.randint(1, 6), prioridade))
+    return tarefas
+
+class TestPriodPrioridadeMenorQueUm(unittest.TestCase):
+    def test_prioridade_zero(self):
+        with tempfile.TemporaryDirectory() as pasta:
+            entrada, saida = os.path.join(pasta, "p0.txt"), os.path.join(pasta, "saida.txt")
+            with open(entrada, "w") as arquivo:
+                arquivo.write("a;0;3;0\nb;1;2;1\n")
+            simulador.simula(entrada, c.Algoritmo.priod).gera_saida(saida)
+            with open(saida) as arquivo:
+                self.assertEqual(arquivo.read(), "a;a;a;b;b\na;0;3;3;0\nb;1;5;4;2\n3.5;1.0")
+
+    def test_igual_a_referencia(self):
+        for semente in range(40):
+            tarefas = tarefas_aleatorias(semente, 30 + 5 * semente)
+            for fator in (0, 1, 2):
+                with self.subTest(semente=semente, fator=fator):
+                    sequencia, fim = referencia_priod(tarefas, fator)
+                    info_saida = simula_priod(tarefas, fator)
+                    self.assertEqual(info_saida.id_por_clock, sequencia)
+                    self.assertEqual({t.id: t.fim_exe for t in info_saida.tarefas_em_ordem()}, fim)
+
+    def test_um_nucleo_igual_ao_caminho_original(self):
+        for semente in range(20):
+            tarefas = tarefas_aleatorias(semente, 60)
+            with self.subTest(semente=semente):
+                self.assertEqual(simula_priod(tarefas, 1, num_nucleos=1).id_por_clock,
+                                 simula_priod(tarefas, 1).id_por_clock)
+
+if __name__ == "__main__":
+    unittest.main()
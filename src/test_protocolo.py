@@ -0,0 +1,109 @@
+import io
+import unittest
+import protocolo
+
+# Testes dos quadros e codecs das mensagens trocadas entre Clock, Emissor e Escalonador. Executar
+# na pasta src com python -m unittest test_protocolo (ou python -m pytest test_protocolo.py).
+
+TAREFAS = [{"tipo": "tarefa", "id": "t0", "ingresso": 0, "duracao": 3, "prioridade": 2},
+           {"tipo": "tarefa", "id": "tarefa-ç", "ingresso": 7, "duracao": 1, "prioridade": -4}]
+
+# Uma mensagem de cada tipo enviado pelos processos, com as variações de cada formato binário
+MENSAGENS = [
+    {"tipo": "ciclo", "valor": 0},
+    {"tipo": "ciclo", "valor": 12, "tarefas": TAREFAS, "emissao_finalizada": False},
+    {"tipo": "ciclo", "valor": 13, "tarefas": [], "emissao_finalizada": True},
+    {"tipo": "ack", "origem": "emissor", "ciclo": 12, "tarefas": TAREFAS,
+     "emissao_finalizada": False, "proximo_ingresso": 20},
+    {"tipo": "ack", "origem": "emissor", "ciclo": 13, "tarefas": [],
+     "emissao_finalizada": True, "proximo_ingresso": None},
+    {"tipo": "ack", "origem": "escalonador", "ciclo": 12, "ocioso": False},
+    {"tipo": "ack", "origem": "escalonador", "ciclo": 13, "ocioso": True},
+    {"tipo": "fim_simulacao"},
+    {"tipo": "abortar", "origem": "emissor", "erro": "Linha 3: duração inválida."},
+]
+
+class LeituraEmPedacos(io.RawIOBase):
+    '''Fluxo que entrega os dados em pedaços de poucos bytes, como uma conexão que recebe um quadro
+    aos poucos.'''
+    def __init__(self, dados:bytes, pedaco:int=3) -> None:
+        self.dados, self.posicao, self.pedaco = dados, 0, pedaco
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, destino) -> int:
+        parte = self.dados[self.posicao:self.posicao + min(self.pedaco, len(destino))]
+        destino[:len(parte)] = parte
+        self.posicao += len(parte)
+        return len(parte)
+
+def le_mensagens(fluxo) -> list[dict]:
+    '''Lê e decodifica os quadros do fluxo até o fim da conexão.'''
+    mensagens = []
+    while (quadro := protocolo.le_quadro(fluxo)) is not None:
+        mensagens.append(protocolo.decodifica_quadro(*quadro))
+    return mensagens
+
+class TestProtocolo(unittest.TestCase):
+    def setUp(self):
+        self.codec_anterior = protocolo.codec_ativo
+
+    def tearDown(self):
+        protocolo.codec_ativo = self.codec_anterior
+
+    def test_ida_e_volta_de_cada_mensagem(self):
+        for nome in protocolo.CODECS:
+            protocolo.define_codec(nome)
+            for mensagem in MENSAGENS:
+                with self.subTest(codec=nome, mensagem=mensagem):
+                    fluxo = io.BytesIO(protocolo.codifica_quadro(mensagem))
+                    self.assertEqual(le_mensagens(fluxo), [mensagem])
+
+    def test_binario_so_nas_mensagens_de_ciclo(self):
+        protocolo.define_codec("binario")
+        for mensagem in MENSAGENS:
+            with self.subTest(mensagem=mensagem):
+                _, codec_id = protocolo.CABECALHO.unpack_from(protocolo.codifica_quadro(mensagem))
+                esperado = protocolo.CodecBinario.ID if mensagem["tipo"] in ("ciclo", "ack") \
+                    else protocolo.CodecJSON.ID
+                self.assertEqual(codec_id, esperado)
+
+    def test_valores_fora_do_formato_binario_seguem_em_json(self):
+        protocolo.define_codec("binario")
+        for mensagem in ({"tipo": "ciclo", "valor": 1 << 70},
+                         {"tipo": "ciclo", "valor": 1, "tarefas": [{**TAREFAS[0], "extra": 1}],
+                          "emissao_finalizada": False}):
+            with self.subTest(mensagem=mensagem):
+                quadro = protocolo.codifica_quadro(mensagem)
+                self.assertEqual(protocolo.CABECALHO.unpack_from(quadro)[1], protocolo.CodecJSON.ID)
+                self.assertEqual(le_mensagens(io.BytesIO(quadro)), [mensagem])
+
+    def test_varios_quadros_recebidos_aos_pedacos(self):
+        protocolo.define_codec("binario")
+        dados = b"".join(protocolo.codifica_quadro(mensagem) for mensagem in MENSAGENS)
+        for pedaco in (1, 3, 64):
+            with self.subTest(pedaco=pedaco):
+                fluxo = io.BufferedReader(LeituraEmPedacos(dados, pedaco))
+                self.assertEqual(le_mensagens(fluxo), MENSAGENS)
+
+    def test_fim_da_conexao(self):
+        quadro = protocolo.codifica_quadro(MENSAGENS[1])
+        self.assertIsNone(protocolo.le_quadro(io.BytesIO(b"")))
+        for corte in (1, protocolo.CABECALHO.size, len(quadro) - 1):
+            with self.subTest(corte=corte):
+                self.assertIsNone(protocolo.le_quadro(io.BytesIO(quadro[:corte])))
+
+    def test_conteudo_invalido(self):
+        protocolo.define_codec("binario")
+        _, conteudo = protocolo.le_quadro(io.BytesIO(protocolo.codifica_quadro(MENSAGENS[1]))) # type: ignore
+        for codec_id, invalido in ((protocolo.CodecBinario.ID, conteudo[:-5]),
+                                   (protocolo.CodecBinario.ID, bytes([99]) + conteudo[1:]),
+                                   (protocolo.CodecJSON.ID, b"{"),
+                                   (42, conteudo)):
+            with self.subTest(codec_id=codec_id, invalido=invalido):
+                with self.assertRaises(ValueError):
+                    protocolo.decodifica_quadro(codec_id, invalido)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,44 @@
+import os
+import tempfile
+import unittest
+import classes as c
+import varredura
+
+# Testes da varredura com entradas inválidas. Executar na pasta src com
+# python -m unittest test_varredura (ou python -m pytest test_varredura.py).
+
+class TestVarreduraComFalhas(unittest.TestCase):
+    def test_pontos_com_erro_nao_interrompem_a_varredura(self):
+        with tempfile.TemporaryDirectory() as pasta:
+            conteudos = {"valida.txt": "a;0;3;1\nb;1;2;2\n", "vazia.txt": "",
+                         "malformada.txt": "a;0;3;1\nb;1\n"}
+            entradas = {}
+            for nome, conteudo in conteudos.items():
+                entradas[nome] = os.path.join(pasta, nome)
+                with open(entradas[nome], "w") as arquivo:
+                    arquivo.write(conteudo)
+
+            linhas = varredura.varre(list(entradas.values()), c.Algoritmo.rr, [1, 2], processos=2)
+
+        self.assertEqual(len(linhas), 6)
+        for linha in linhas:
+            with self.subTest(entrada=linha["entrada"], valor=linha["valor"]):
+                if linha["entrada"] == entradas["valida.txt"]:
+                    self.assertEqual(linha["erro"], "")
+                    self.assertEqual(linha["tarefas"], 2)
+                elif linha["entrada"] == entradas["vazia.txt"]:
+                    self.assertEqual(linha["erro"], "Nenhuma tarefa foi concluída.")
+                else:
+                    self.assertIn("Linha 2", linha["erro"])
+        # Nenhum valor foi avaliado em todas as entradas
+        self.assertEqual(varredura.melhor_valor(linhas, "espera_medio"), (None, {}))
+
+    def test_melhor_valor_ignora_valores_com_falha(self):
+        linhas = [{"valor": 1, "erro": "", "espera_medio": 1.0},
+                  {"valor": 1, "erro": "falhou"},
+                  {"valor": 2, "erro": "", "espera_medio": 3.0},
+                  {"valor": 2, "erro": "", "espera_medio": 5.0}]
+        self.assertEqual(varredura.melhor_valor(linhas, "espera_medio"), (2, {2: 4.0}))
+
+if __name__ == "__main__":
+    unittest.main()
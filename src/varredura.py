@@ -0,0 +1,183 @@
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import cache
+import classes as c
+import lote
+import simulador
+from escalonador import algoritmo_valido, parametros_validos
+
+USO = ("python varredura.py <arquivos_entrada...> --algoritmo {rr,priod} --valores V1,V2,... "
+       "[--metrica METRICA] [--processos N] [--cache DIR] [--sem-cache] [--json CAMINHO]")
+
+# Parâmetro de cada algoritmo que pode ser variado, com o nome do argumento de simulador.simula
+PARAMETROS = {c.Algoritmo.rr: "quantum", c.Algoritmo.priod: "fator_envelhecimento"}
+
+# Métricas de lote.resume que podem ser usadas para escolher o melhor valor. True indica que um
+# valor maior é melhor.
+METRICAS = {"turnaround_medio": False, "espera_medio": False, "resposta_medio": False,
+            "ciclos": False, "utilizacao": True}
+
+def avalia(entrada:str, algoritmo:c.Algoritmo, valor:int,
+           resultados:cache.CacheResultados|None=None, chave:str|None=None) -> dict:
+    '''Simula a entrada com o algoritmo e o valor de parâmetro informados e retorna o resumo da
+    execução (ver lote.resume). Erros da simulação, inclusive uma entrada sem nenhuma tarefa, são
+    retornados no campo "erro", como em lote.executa, para não interromper a varredura. Com um
+    cache de resultados, o arquivo de saída e o resumo são guardados nele com a chave informada.'''
+    try:
+        info_saida = simulador.simula(entrada, algoritmo, **{PARAMETROS[algoritmo]: valor})
+    except (OSError, ValueError) as erro:
+        return {"erro": str(erro)}
+    if info_saida.num_concluidas == 0:
+        # Mesmo erro de InfoSaida.gera_saida, que o lote encontra ao gravar o arquivo de saída
+        return {"erro": "Nenhuma tarefa foi concluída."}
+    resumo = lote.resume(info_saida)
+    if resultados is not None and chave is not None:
+        resultados.guarda_saida(chave, info_saida)
+        resultados.guarda_json(chave, "resumo.json", resumo)
+    return resumo
+
+def varre(entradas:list[str], algoritmo:c.Algoritmo, valores:list[int],
+          resultados:cache.CacheResultados|None=None, processos:int|None=None) -> list[dict]:
+    '''Avalia todos os pares de valor e entrada, calculando em paralelo, em um pool de processos,
+    apenas os que não estão no cache de resultados. Retorna uma linha por par, na ordem da grade, com
+    o erro da simulação no campo "erro" (vazio se ela foi concluída).'''
+    pares = [(valor, entrada) for valor in valores for entrada in entradas]
+    resumos:dict[tuple[int, str], dict] = {}
+    chaves:dict[tuple[int, str], str|None] = dict.fromkeys(pares)
+    if resultados is not None:
+        hashes:dict[str, str|None] = {}
+        for entrada in entradas:
+            try:
+                hashes[entrada] = cache.hash_arquivo(entrada)
+            except OSError:  # o erro é registrado ao simular os pontos da entrada
+                hashes[entrada] = None
+        parametro = PARAMETROS[algoritmo]
+        for valor, entrada in pares:
+            if hashes[entrada] is None:
+                continue
+            chave = resultados.chave(entrada, algoritmo, hash_entrada=hashes[entrada],
+                                     **{parametro: valor})
+            chaves[(valor, entrada)] = chave
+            if resultados.busca(chave, "resumo.json"):
+                resumos[(valor, entrada)] = resultados.le_json(chave, "resumo.json")
+    pendentes = [par for par in pares if par not in resumos]
+    print(f"[Varredura] {len(pares)} pontos, {len(pares) - len(pendentes)} já calculados.")
+
+    if pendentes:
+        if resultados is not None:
+            # Como no lote: o tamanho do cache é medido antes do pool e verificado de novo ao final
+            resultados.limita()
+        with ProcessPoolExecutor(max_workers=processos) as pool:
+            futuros = {pool.submit(avalia, entrada, algoritmo, valor, resultados,
+                                   chaves[(valor, entrada)]): (valor, entrada)
+                       for valor, entrada in pendentes}
+            for futuro in as_completed(futuros):
+                valor, entrada = futuros[futuro]
+                resumos[(valor, entrada)] = resumo = futuro.result()
+                situacao = f"erro: {resumo['erro']}" if resumo.get("erro") else "concluído"
+                print(f"[Varredura] {entrada} / {PARAMETROS[algoritmo]}={valor}: {situacao}")
+        if resultados is not None:
+            resultados.limita()
+
+    return [{"entrada": entrada, "valor": valor, "erro": "", **resumos[(valor, entrada)]}
+            for valor, entrada in pares]
+
+def melhor_valor(linhas:list[dict], metrica:str) -> tuple[int|None, dict[int, float]]:
+    '''Calcula a média da métrica entre as entradas para cada valor e retorna o melhor valor (o
+    primeiro da grade, em caso de empate) junto com as médias. Os valores com algum ponto que
+    falhou ficam de fora, já que a média deles não cobriria todas as entradas; se todos falharam,
+    o melhor valor é None.'''
+    somas:dict[int, list[float]] = {}
+    falhas = {linha["valor"] for linha in linhas if linha["erro"]}
+    for linha in linhas:
+        if linha["valor"] not in falhas:
+            somas.setdefault(linha["valor"], []).append(linha[metrica])
+    medias = {valor: sum(lista) / len(lista) for valor, lista in somas.items()}
+    if not medias:
+        return None, medias
+    sinal = -1 if METRICAS[metrica] else 1
+    melhor = min(medias, key=lambda valor: sinal * medias[valor])
+    return melhor, medias
+
+def main():
+    parser = argparse.ArgumentParser(usage=USO)
+    parser.add_argument("entradas", nargs="*", help="arquivos de entrada com as tarefas")
+    parser.add_argument("--algoritmo", choices=[a.name for a in PARAMETROS],
+                        help="rr varia o quantum; priod varia o fator de envelhecimento")
+    parser.add_argument("--valores", help="valores do parâmetro separados por vírgula")
+    parser.add_argument("--metrica", choices=list(METRICAS), default="espera_medio",
+                        help="métrica usada para escolher o melhor valor (padrão: espera_medio)")
+    parser.add_argument("--processos", type=int,
+                        help="número de processos simultâneos (padrão: número de núcleos)")
+    parser.add_argument("--cache", default=cache.RAIZ_PADRAO,
+                        help="pasta do cache de resultados (padrão: ~/.cache/escalonamento ou a "
+                             "variável de ambiente ESCALONAMENTO_CACHE)")
+    parser.add_argument("--sem-cache", action="store_true",
+                        help="calcula todos os pontos, sem consultar nem alimentar o cache")
+    parser.add_argument("--json", help="caminho para gravar todas as linhas e o melhor valor")
+    args = parser.parse_args()
+
+    if not args.entradas or args.algoritmo is None or args.valores is None:
+        print(f"Uso: {USO}")
+        sys.exit(1)
+
+    for entrada in args.entradas:
+        if not os.path.isfile(entrada):
+            print(f"Erro: Arquivo de entrada '{entrada}' não encontrado.")
+            sys.exit(1)
+
+    algoritmo = algoritmo_valido(args.algoritmo)
+    try:
+        valores = list(dict.fromkeys(int(valor) for valor in args.valores.split(",")))
+    except ValueError:
+        valores = []
+    if not valores:
+        print("Erro: Os valores devem ser inteiros separados por vírgula.")
+        sys.exit(1)
+    try:
+        for valor in valores:
+            parametros_validos(**{PARAMETROS[algoritmo]: valor})
+    except ValueError as erro:
+        print(f"Erro: {erro}")
+        sys.exit(1)
+
+    if args.processos is not None and args.processos < 1:
+        print("Erro: O número de processos deve ser um inteiro positivo.")
+        sys.exit(1)
+
+    inicio = time.perf_counter()
+    resultados = None if args.sem_cache else cache.CacheResultados(args.cache)
+    linhas = varre(args.entradas, algoritmo, valores, resultados, args.processos)
+    melhor, medias = melhor_valor(linhas, args.metrica)
+
+    parametro = PARAMETROS[algoritmo]
+    print(f"\n{parametro:>20}{args.metrica:>20}")
+    for valor in valores:
+        if valor not in medias:
+            print(f"{valor:>20}{'erro':>20}")
+            continue
+        print(f"{valor:>20}{medias[valor]:>20.2f}" + ("  <- melhor" if valor == melhor else ""))
+    falhas = [linha for linha in linhas if linha["erro"]]
+    if falhas:
+        print(f"\n[Varredura] {len(falhas)} pontos falharam:")
+        for linha in falhas:
+            print(f"  {linha['entrada']} / {parametro}={linha['valor']}: {linha['erro']}")
+    if melhor is None:
+        print(f"\nErro: Nenhum valor de {parametro} foi avaliado em todas as entradas.")
+    else:
+        print(f"\n[Varredura] Melhor {parametro} para {algoritmo.name} por {args.metrica}: {melhor} "
+              f"({time.perf_counter() - inicio:.2f} s)")
+
+    if args.json is not None:
+        with open(args.json, "w") as arquivo:
+            json.dump({"algoritmo": algoritmo.name, "parametro": parametro, "metrica": args.metrica,
+                       "melhor": melhor, "medias": medias, "linhas": linhas}, arquivo, indent=2)
+    if melhor is None:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()